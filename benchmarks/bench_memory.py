@@ -0,0 +1,95 @@
+"""Measures the memory held by CKKS ciphertexts and keys in each storage form.
+
+Run with:
+    python -m benchmarks.bench_memory --min-log-degree 10 --max-log-degree 14
+"""
+import argparse
+import random
+import sys
+
+import numpy as np
+
+from ckks.parameters import CKKSParameters
+from util.crypto.ciphertext import Ciphertext
+from util.crypto.public_key import PublicKey
+from util.crypto.rotation_key import RotationKey
+from util.polynomial import Polynomial
+
+def deep_sizeof(obj, seen=None) -> int:
+    """Returns the bytes held by an object and everything it references.
+
+    Shared objects are counted once, and contexts are skipped since they are
+    shared by every ciphertext and key.
+    """
+    seen = set() if seen is None else seen
+    if id(obj) in seen or type(obj).__name__.endswith('Context'):
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, np.ndarray) and obj.base is not None:
+        size += deep_sizeof(obj.base, seen)
+    elif isinstance(obj, dict):
+        size += sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set)):
+        size += sum(deep_sizeof(v, seen) for v in obj)
+    if hasattr(obj, '__dict__'):
+        size += deep_sizeof(vars(obj), seen)
+    for name in getattr(type(obj), '__slots__', ()):
+        if hasattr(obj, name):
+            size += deep_sizeof(getattr(obj, name), seen)
+    return size
+
+def random_poly(poly_degree: int, modulus: int) -> Polynomial:
+    return Polynomial(poly_degree, [random.randrange(modulus) for _ in range(poly_degree)])
+
+def measure(poly_degree: int, ciph_bits: int, big_bits: int, prime_size: int) -> dict:
+    """Measures the bytes of one ciphertext, public key and rotation key.
+
+    The objects hold uniformly random polynomials of the right moduli, which
+    occupy as much memory as real ones without running key generation.
+
+    Returns:
+        Dict mapping each object name to a dict of sizes per storage form.
+    """
+    params = CKKSParameters(poly_degree, 1 << ciph_bits, 1 << big_bits, 1 << 30, prime_size=prime_size)
+    ciph_modulus = params.ciph_modulus
+    big_modulus = params.big_modulus
+    key_modulus = big_modulus ** 2
+
+    ciphertext = Ciphertext(random_poly(poly_degree, ciph_modulus), random_poly(poly_degree, ciph_modulus),
+                            params.scaling_factor, ciph_modulus)
+    public_key = PublicKey(random_poly(poly_degree, big_modulus), random_poly(poly_degree, big_modulus))
+    rotation_key = RotationKey(1, PublicKey(random_poly(poly_degree, key_modulus),
+                                            random_poly(poly_degree, key_modulus)))
+
+    results = {
+        'ciphertext': {'list': deep_sizeof(ciphertext), 'packed': deep_sizeof(ciphertext.pack())},
+        'public key': {'list': deep_sizeof(public_key), 'packed': deep_sizeof(public_key.pack(big_modulus))},
+        'rotation key': {'list': deep_sizeof(rotation_key),
+                         'packed': deep_sizeof(rotation_key.pack(key_modulus))},
+    }
+    if params.crt_context:
+        # Keys cache their NTT form over the CRT primes for fast products.
+        results['public key']['ntt'] = deep_sizeof(public_key.to_ntt(params.crt_context))
+        results['rotation key']['ntt'] = deep_sizeof(rotation_key.key.to_ntt(params.crt_context))
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--min-log-degree', type=int, default=10)
+    parser.add_argument('--max-log-degree', type=int, default=14)
+    parser.add_argument('--ciph-bits', type=int, default=600)
+    parser.add_argument('--big-bits', type=int, default=1200)
+    parser.add_argument('--prime-size', type=int, default=59)
+    args = parser.parse_args()
+
+    print('%8s %14s %14s %14s %14s %8s' % ('degree', 'object', 'list', 'packed', 'ntt cache', 'ratio'))
+    for log_degree in range(args.min_log_degree, args.max_log_degree + 1):
+        results = measure(1 << log_degree, args.ciph_bits, args.big_bits, args.prime_size)
+        for name, sizes in results.items():
+            ntt = '%13.2fM' % (sizes['ntt'] / 2**20) if 'ntt' in sizes else '%14s' % '-'
+            print('%8d %14s %13.2fM %13.2fM %s %7.2fx' % (1 << log_degree, name, sizes['list'] / 2**20,
+                                                        sizes['packed'] / 2**20, ntt, sizes['list'] / sizes['packed']))
+
+if __name__ == '__main__':
+    main()
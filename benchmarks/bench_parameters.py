@@ -0,0 +1,52 @@
+"""Benchmarks parameter construction time for CKKS.
+
+Run with:
+    python -m benchmarks.bench_parameters --min-log-degree 10 --max-log-degree 16
+"""
+import argparse
+import time
+
+from ckks.parameters import CKKSParameters
+from util.math.context_registry import registry
+
+def time_parameters(poly_degree: int, ciph_bits: int, big_bits: int, prime_size: int) -> dict:
+    """Times a cold construction of CKKSParameters and its prime search.
+
+    Args:
+        poly_degree (int): Polynomial ring degree.
+        ciph_bits (int): Size of the ciphertext modulus in bits.
+        big_bits (int): Size of the big modulus in bits.
+        prime_size (int): Minimum number of bits in CRT primes.
+
+    Returns:
+        Dict with the number of primes and the timings in seconds.
+    """
+    registry.clear()
+    start = time.perf_counter()
+    params = CKKSParameters(poly_degree, 1 << ciph_bits, 1 << big_bits, 1 << 30, prime_size=prime_size)
+    total = time.perf_counter() - start
+
+    crt = params.crt_context
+    assert crt is not None
+    start = time.perf_counter()
+    crt.generate_primes(len(crt.primes), prime_size, mod=2 * poly_degree)
+    primes = time.perf_counter() - start
+    registry.clear()
+    return {'num_primes': len(crt.primes), 'primes': primes, 'total': total}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--min-log-degree', type=int, default=10)
+    parser.add_argument('--max-log-degree', type=int, default=16)
+    parser.add_argument('--ciph-bits', type=int, default=600)
+    parser.add_argument('--big-bits', type=int, default=1200)
+    parser.add_argument('--prime-size', type=int, default=59)
+    args = parser.parse_args()
+
+    print('%8s %8s %12s %12s' % ('degree', 'primes', 'prime search', 'total'))
+    for log_degree in range(args.min_log_degree, args.max_log_degree + 1):
+        result = time_parameters(1 << log_degree, args.ciph_bits, args.big_bits, args.prime_size)
+        print('%8d %8d %11.3fs %11.3fs' % (1 << log_degree, result['num_primes'], result['primes'], result['total']))
+
+if __name__ == '__main__':
+    main()
@@ -1,13 +1,13 @@
 from typing import List
 from util.crypto.plaintext import Plaintext
-from util.math.ntt import NTTContext
+from util.math.context_registry import get_ntt_context
 from util.polynomial import Polynomial
 
 class BatchEncoder:
     def __init__(self, params):
         self.degree = params.poly_degree
         self.plain_modulus = params.plain_modulus
-        self.ntt = NTTContext(params.poly_degree, params.plain_modulus)
+        self.ntt = get_ntt_context(params.poly_degree, params.plain_modulus)
         
     def encode(self, values: List[int]) -> Plaintext:
         assert len(values) == self.degree, 'Invalid number of values'
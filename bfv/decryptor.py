@@ -18,10 +18,10 @@ class BFVDecryptor:
 
     def decrypt(self, ciphertext: Ciphertext, c2: Optional[Polynomial] = None) -> Plaintext:
         (c0, c1) = (ciphertext.c0, ciphertext.c1)
-        intermed_message = c0.add(c1.multiply(self.secret_key.s, self.ciph_modulus), self.ciph_modulus)
+        intermed_message = c1.multiply_add(self.secret_key.s, c0, self.ciph_modulus)
         if c2:
             secret_key_squared = self.secret_key.s.multiply(self.secret_key.s, self.ciph_modulus)        
-            intermed_message = intermed_message.add(c2.multiply(secret_key_squared, self.ciph_modulus), self.ciph_modulus)            
+            intermed_message.iadd(c2.multiply(secret_key_squared, self.ciph_modulus), self.ciph_modulus)            
         
         intermed_message = intermed_message.scalar_multiply(1 / self.scaling_factor)
         intermed_message = intermed_message.round()
@@ -2,6 +2,7 @@ from bfv.parameters import BFVParameters
 from util.crypto.ciphertext import Ciphertext
 from util.crypto.plaintext import Plaintext
 from util.crypto.public_key import PublicKey
+from util.crypto.zero_pool import ZeroEncryptionPool
 from util.polynomial import Polynomial
 from util.random_sampling import sample_triangle
 
@@ -11,19 +12,41 @@ class BFVEncryptor:
         self.coeff_modulus = params.ciph_modulus
         self.public_key = public_key
         self.scaling_factor = int(params.scaling_factor)        
+        self.zero_pool = None
         
     def encrypt(self, message: Plaintext) -> Ciphertext:
+        """Encrypts a plaintext as an encryption of zero plus the scaled message.
+
+        With a zero pool, the encryption of zero is precomputed.
+        """
+        zero = self.zero_pool.take() if self.zero_pool is not None else self.encrypt_zero()
+        scaled_message = message.poly.scalar_multiply(self.scaling_factor, self.coeff_modulus)
+        return Ciphertext(zero.c0.add_reduce(scaled_message, self.coeff_modulus), zero.c1)
+
+    def start_zero_pool(self, low_watermark: int = 4, high_watermark: int = 16,
+                        num_workers: int = 1) -> ZeroEncryptionPool:
+        """Starts background threads that keep encryptions of zero ready for encrypt.
+        """
+        self.stop_zero_pool()
+        self.zero_pool = ZeroEncryptionPool(self.encrypt_zero, low_watermark, high_watermark, num_workers)
+        return self.zero_pool
+
+    def stop_zero_pool(self):
+        if self.zero_pool is not None:
+            self.zero_pool.close()
+            self.zero_pool = None
+
+    def encrypt_zero(self) -> Ciphertext:
+        """Encrypts zero with the public key.
+        """
         p0 = self.public_key.p0
         p1 = self.public_key.p1
-        scaled_message = message.poly.scalar_multiply(self.scaling_factor, self.coeff_modulus)
         random_vec = Polynomial(self.poly_degree, sample_triangle(self.poly_degree))
         error1 = Polynomial(self.poly_degree, sample_triangle(self.poly_degree))
         error1 = Polynomial(self.poly_degree, [0] * self.poly_degree)
         error2 = Polynomial(self.poly_degree, sample_triangle(self.poly_degree))
         error2 = Polynomial(self.poly_degree, [0] * self.poly_degree)
-        c0 = error1 \
-            .add(p0.multiply(random_vec, self.coeff_modulus), self.coeff_modulus) \
-            .add(scaled_message, self.coeff_modulus)
+        c0 = error1.add(p0.multiply(random_vec, self.coeff_modulus), self.coeff_modulus)
         c1 = error2.add(p1.multiply(random_vec, self.coeff_modulus), self.coeff_modulus)
         
         return Ciphertext(c0, c1)
@@ -1,6 +1,11 @@
+from typing import Optional
+
+import numpy as np
+
 from bfv.relin_key import BFVRelinKey
 from bfv.parameters import BFVParameters
 from util.crypto.ciphertext import Ciphertext
+from util.math.modular import mul_shoup, reduce_once, shoup_column
 from util.polynomial import Polynomial
 
 class BFVEvaluator:
@@ -8,13 +13,59 @@ class BFVEvaluator:
         self.plain_modulus = params.plain_modulus
         self.coeff_modulus = params.ciph_modulus
         self.scaling_factor = params.scaling_factor
+        self.crt_context = params.crt_context
+        if self.crt_context:
+            self.precompute_scale_and_round()
+
+    def precompute_scale_and_round(self):
+        """Perform precomputations for scale_and_round.
+
+        A tensored coefficient c satisfies |p * c| <= p * d * q^2 / 2, so adding
+        offset * q with offset = p * d * q // 2 + 1 makes p * c + q // 2 non-negative
+        without changing it modulo q. The auxiliary basis is large enough to
+        hold the shifted value exactly.
+        """
+        crt = self.crt_context
+        (q, p) = (self.coeff_modulus, self.plain_modulus)
+        assert all(q % prime != 0 for prime in crt.primes), "Auxiliary primes must be coprime to q"
+        self.round_offset = p * crt.poly_degree * q // 2 + 1
+        self.round_shift = np.array([(q // 2 + self.round_offset * q) % prime for prime in crt.primes],
+                                    dtype=np.uint64).reshape(-1, 1)
+        self.q_inverse, self.q_inverse_shoup = shoup_column([pow(q, -1, prime) for prime in crt.primes],
+                                                            crt.primes)
+
+    def scale_and_round(self, residues: np.ndarray) -> Polynomial:
+        """Computes round(p * c / q) (mod q) from the residues of an integer polynomial c.
+
+        With y = p * c + q // 2 + offset * q, the result is (y - (y mod q)) / q - offset.
+        Both y mod q and the final reduction come from exact base conversion, so
+        no big integer or floating-point value is formed.
+
+        Args:
+            residues (np.ndarray): Residues of c in the auxiliary basis.
+
+        Returns:
+            A Polynomial with coefficients in [0, q).
+        """
+        crt = self.crt_context
+        y = crt.rns_add(crt.rns_scalar_multiply(residues, self.plain_modulus), self.round_shift)
+        y_mod_q = crt.base_convert(y, self.coeff_modulus)
+        scaled = crt.rns_subtract(y, y_mod_q % crt.primes_u64)
+        scaled = mul_shoup(scaled, self.q_inverse, self.q_inverse_shoup, crt.primes_u64)
+        q = np.uint64(self.coeff_modulus)
+        offset = np.uint64(self.round_offset % self.coeff_modulus)
+        coeffs = reduce_once(crt.base_convert(scaled, self.coeff_modulus) + (q - offset), q)
+        return Polynomial(crt.poly_degree, coeffs.tolist())
 
     def add(self, a: Ciphertext, b: Ciphertext) -> Ciphertext:
-        new_c0 = a.c0.add(b.c0, coeff_modulus=self.coeff_modulus)
-        new_c1 = a.c1.add(b.c1, coeff_modulus=self.coeff_modulus)
+        new_c0 = a.c0.add_reduce(b.c0, self.coeff_modulus)
+        new_c1 = a.c1.add_reduce(b.c1, self.coeff_modulus)
         return Ciphertext(new_c0, new_c1)
     
     def multiply(self, a: Ciphertext, b: Ciphertext, relin_key: BFVRelinKey) -> Ciphertext:
+        if self.crt_context:
+            return self.relinealize(relin_key, *self.tensor(a, b))
+
         new_c0 = a.c0.fft_multiply(b.c0) \
             .scalar_multiply(1 / self.scaling_factor) \
             .round().mod(self.coeff_modulus)
@@ -27,6 +78,41 @@ class BFVEvaluator:
             .round().mod(self.coeff_modulus)
         
         return self.relinealize(relin_key, new_c0, new_c1, new_c2)
+
+    def square(self, a: Ciphertext, relin_key: BFVRelinKey) -> Ciphertext:
+        """Squares a ciphertext, transforming each of its two components once.
+        """
+        if self.crt_context:
+            return self.relinealize(relin_key, *self.tensor(a))
+
+        new_c0 = a.c0.fft_multiply(a.c0) \
+            .scalar_multiply(1 / self.scaling_factor) \
+            .round().mod(self.coeff_modulus)
+        cross = a.c0.fft_multiply(a.c1)
+        new_c1 = cross.add(cross) \
+            .scalar_multiply(1 / self.scaling_factor) \
+            .round().mod(self.coeff_modulus)
+        new_c2 = a.c1.fft_multiply(a.c1) \
+            .scalar_multiply(1 / self.scaling_factor) \
+            .round().mod(self.coeff_modulus)
+
+        return self.relinealize(relin_key, new_c0, new_c1, new_c2)
+
+    def tensor(self, a: Ciphertext, b: Optional[Ciphertext] = None):
+        """Computes round(p/q * (a ⊗ b)) (mod q) in the auxiliary RNS basis.
+
+        Inputs are centered modulo q and tensored exactly with NTTs over the
+        auxiliary primes, with the Karatsuba identity for the middle term; each
+        component is then scaled with scale_and_round. If b is None, computes
+        round(p/q * (a ⊗ a)) from two transforms.
+
+        Returns:
+            Tuple (c0, c1, c2) of Polynomials with coefficients in [0, q).
+        """
+        (a0, a1) = [c.mod_small(self.coeff_modulus).coeffs for c in (a.c0, a.c1)]
+        second = None if b is None else tuple(c.mod_small(self.coeff_modulus).coeffs for c in (b.c0, b.c1))
+        # The products live in the scratch arrays of the context, so each is scaled right away.
+        return tuple(self.scale_and_round(c) for c in self.crt_context.tensor((a0, a1), second))
     
     def relinealize(self, relin_key: BFVRelinKey, c0: Polynomial, c1: Polynomial, c2: Polynomial) -> Ciphertext:
         (keys, base) = (relin_key.keys, relin_key.base)
@@ -37,8 +123,8 @@ class BFVEvaluator:
         new_c1 = c1
 
         for i in range(num_levels):
-            new_c0 = new_c0.add(keys[i][0].multiply(c2_decomposed[i], self.coeff_modulus), self.coeff_modulus)
-            new_c1 = new_c1.add(keys[i][1].multiply(c2_decomposed[i], self.coeff_modulus), self.coeff_modulus)
+            new_c0 = keys[i][0].multiply_add(c2_decomposed[i], new_c0, self.coeff_modulus)
+            new_c1 = keys[i][1].multiply_add(c2_decomposed[i], new_c1, self.coeff_modulus)
 
         return Ciphertext(new_c0, new_c1)
 
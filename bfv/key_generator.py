@@ -21,10 +21,7 @@ class BFVKeyGenerator:
         pk_error = Polynomial(params.poly_degree, sample_triangle(params.poly_degree))
         
         p0 = pk_error.add(
-            pk_coeff.multiply(
-                self.secret_key.s,
-                params.ciph_modulus
-            ),
+            self.secret_key.multiply(pk_coeff, params.ciph_modulus),
             params.ciph_modulus
         ).scalar_multiply(-1, params.ciph_modulus)
         p1 = pk_coeff
@@ -36,12 +33,12 @@ class BFVKeyGenerator:
         
         keys: List[tuple] = [(0, 0)] * num_levels
         power = 1
-        sk_squared = self.secret_key.s.multiply(self.secret_key.s, params.ciph_modulus)
+        sk_squared = self.secret_key.multiply(self.secret_key.s, params.ciph_modulus)
         
         for i in range(num_levels):
             k1 = Polynomial(params.poly_degree, sample_uniform(0, params.ciph_modulus, params.poly_degree))
             error = Polynomial(params.poly_degree, sample_triangle(params.poly_degree))
-            k0 = self.secret_key.s.multiply(k1, params.ciph_modulus).add(
+            k0 = self.secret_key.multiply(k1, params.ciph_modulus).add(
                     error, params.ciph_modulus).scalar_multiply(-1).add(
                         sk_squared.scalar_multiply(power), params.ciph_modulus).mod(params.ciph_modulus)
                 
@@ -1,11 +1,22 @@
 import math
 
+from util.math.crt import CRTContext
+from util.math.modular import MAX_MODULUS_BITS
+
 class BFVParameters:
-    def __init__(self, poly_degree: int, plain_modulus: int, ciph_modulus):
+    def __init__(self, poly_degree: int, plain_modulus: int, ciph_modulus, prime_size=59):
         self.poly_degree = poly_degree # d
         self.plain_modulus = plain_modulus # p
         self.ciph_modulus = ciph_modulus # q
         self.scaling_factor = ciph_modulus / plain_modulus # Δ = q/p
+        self.crt_context = None
+
+        # Auxiliary RNS basis for exact ciphertext multiplication. Its product
+        # must exceed p * d * q^2, the size of p times a tensored coefficient.
+        is_power_of_two = poly_degree & (poly_degree - 1) == 0
+        if prime_size and is_power_of_two and ciph_modulus.bit_length() <= MAX_MODULUS_BITS:
+            num_primes = 1 + ((plain_modulus * poly_degree * ciph_modulus ** 2).bit_length() + 2) // prime_size
+            self.crt_context = CRTContext(num_primes, prime_size, poly_degree)
         
     def print_parameters(self):
         """Prints parameters.
@@ -13,4 +24,5 @@ class BFVParameters:
         print("Encryption parameters")
         print("\t polynomial degree: %d" %(self.poly_degree))
         print("\t plaintext modulus: %d" % (self.plain_modulus))
-        print("\t ciphertext modulus size: %d bits" % (int(math.log(self.ciph_modulus, 2))))
\ No newline at end of file
+        print("\t ciphertext modulus size: %d bits" % (int(math.log(self.ciph_modulus, 2))))
+        print("\t RNS multiplication: %s" % ("Yes" if self.crt_context else "No"))
\ No newline at end of file
@@ -3,7 +3,9 @@ from ckks.parameters import CKKSParameters
 from util.crypto.ciphertext import Ciphertext
 from util.crypto.plaintext import Plaintext
 from util.crypto.secret_key import SecretKey
+from util.ntt_polynomial import NTTPolynomial
 from util.polynomial import Polynomial
+from util.rns_polynomial import RNSPolynomial
 
 class CKKSDecryptor:
     def __init__(self, params: CKKSParameters, secret_key: SecretKey):
@@ -15,16 +17,34 @@ class CKKSDecryptor:
         assert ciphertext.modulus is not None, "Ciphertext modulus is not provided"
         assert ciphertext.scaling_factor is not None, "Ciphertext scaling factor is not provided"
         
+        if not self.crt_context:
+            return self.decrypt_without_crt(ciphertext, c2)
+
+        (c0, c1) = (ciphertext.c0, ciphertext.c1)
+
+        # m = c1 * s + c0, with c1 * s (+ c2 * s^2) accumulated in NTT form
+        # and c0 added in RNS form, so the message is reconstructed only once.
+        sk = self.secret_key.to_ntt(self.crt_context)
+        m_ntt = NTTPolynomial.from_polynomial(c1, self.crt_context).multiply(sk)
+        if c2:
+            c2_ntt = NTTPolynomial.from_polynomial(c2, self.crt_context)
+            m_ntt = m_ntt.add(c2_ntt.multiply(sk).multiply(sk))
+        m = RNSPolynomial.from_ntt(m_ntt) \
+            .add(RNSPolynomial.from_polynomial(c0, self.crt_context)) \
+            .to_polynomial()
+            
+        m = m.mod_small(ciphertext.modulus)
+        return Plaintext(m, ciphertext.scaling_factor)
+
+    def decrypt_without_crt(self, ciphertext: Ciphertext, c2: Optional[Polynomial] = None):
         (c0, c1) = (ciphertext.c0, ciphertext.c1)
         
         # m = c1 * s + c0
-        m = c1.multiply(self.secret_key.s, ciphertext.modulus, crt=self.crt_context) \
-            .add(c0, ciphertext.modulus)
+        m = c1.multiply(self.secret_key.s, ciphertext.modulus).iadd(c0)
             
         if c2:
             sk_squared = self.secret_key.s.multiply(self.secret_key.s, ciphertext.modulus)
-            c2_m = c2.multiply(sk_squared, ciphertext.modulus, crt=self.crt_context)
-            m = m.add(c2_m, ciphertext.modulus)
+            m.iadd(c2.multiply(sk_squared, ciphertext.modulus))
             
-        m = m.mod_small(ciphertext.modulus)
+        m.ireduce(ciphertext.modulus, centered=True)
         return Plaintext(m, ciphertext.scaling_factor)
\ No newline at end of file
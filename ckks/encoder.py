@@ -1,13 +1,13 @@
 from typing import List
 from ckks.parameters import CKKSParameters
 from util.crypto.plaintext import Plaintext
-from util.math.ntt import FFTContext
+from util.math.context_registry import get_fft_context
 from util.polynomial import Polynomial
 
 class CKKSEncoder:
     def __init__(self, params: CKKSParameters):
         self.degree = params.poly_degree
-        self.fft = FFTContext(self.degree * 2)
+        self.fft = get_fft_context(self.degree * 2)
         
     def encode(self, values: List[float], scaling_factor: float) -> Plaintext:
         num_values = len(values)
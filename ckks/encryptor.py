@@ -4,7 +4,10 @@ from util.crypto.ciphertext import Ciphertext
 from util.crypto.plaintext import Plaintext
 from util.crypto.public_key import PublicKey
 from util.crypto.secret_key import SecretKey
+from util.crypto.zero_pool import ZeroEncryptionPool
+from util.ntt_polynomial import NTTPolynomial
 from util.polynomial import Polynomial
+from util.rns_polynomial import RNSPolynomial
 from util.random_sampling import sample_triangle
 
 class CKKSEncryptor:
@@ -15,43 +18,107 @@ class CKKSEncryptor:
         self.crt_context = params.crt_context
         self.public_key = public_key
         self.secret_key = secret_key
+        self.zero_pool = None
         
     def encrypt_with_sk(self, plaintext: Plaintext) -> Ciphertext:
         assert self.secret_key is not None, "Secret key is not provided"
         
-        sk = self.secret_key.s
         r = Polynomial(self.poly_degree, sample_triangle(self.poly_degree))
-        e = Polynomial(self.poly_degree, sample_triangle(self.poly_degree))
-        # c0 = s*r + e + m
-        c0 = sk.multiply(r, self.coeff_modulus, crt=self.crt_context) \
-            .add(e, self.coeff_modulus) \
-            .add(plaintext.poly, self.coeff_modulus) \
-            .mod_small(self.coeff_modulus)
+        if self.crt_context:
+            # c0 = s*r + e + m, summed in RNS form before a single reconstruction
+            r_ntt = NTTPolynomial.from_polynomial(r, self.crt_context)
+            sk_r = RNSPolynomial.from_ntt(self.secret_key.to_ntt(self.crt_context).multiply(r_ntt))
+            e = RNSPolynomial(self.crt_context, sample_triangle(self.poly_degree, crt=self.crt_context))
+            c0 = sk_r \
+                .add(e) \
+                .add(RNSPolynomial.from_polynomial(plaintext.poly, self.crt_context)) \
+                .to_polynomial() \
+                .mod_small(self.coeff_modulus)
+        else:
+            # c0 = s*r + e + m
+            e = Polynomial(self.poly_degree, sample_triangle(self.poly_degree))
+            c0 = self.secret_key.s.multiply(r, self.coeff_modulus) \
+                .iadd(e) \
+                .add_reduce(plaintext.poly, self.coeff_modulus, centered=True)
         # c1 = -r
-        c1 = r.scalar_multiply(-1, self.coeff_modulus).mod_small(self.coeff_modulus)
+        c1 = r.scalar_multiply(-1, self.coeff_modulus).ireduce(self.coeff_modulus, centered=True)
         return Ciphertext(c0, c1, plaintext.scaling_factor, self.coeff_modulus)
     
     def encrypt(self, plaintext: Plaintext) -> Ciphertext:
-        p0 = self.public_key.p0
-        p1 = self.public_key.p1
-        
-        r = Polynomial(self.poly_degree, sample_triangle(self.poly_degree))
-        e1 = Polynomial(self.poly_degree, sample_triangle(self.poly_degree))
-        e2 = Polynomial(self.poly_degree, sample_triangle(self.poly_degree))
-        # c0 = p0 * r + e1 + m
-        c0 = p0.multiply(r, self.coeff_modulus, crt=self.crt_context) \
-            .add(e1, self.coeff_modulus) \
-            .add(plaintext.poly, self.coeff_modulus) \
-            .mod_small(self.coeff_modulus)
-        # c1 = p1 * r + e2
-        c1 = p1.multiply(r, self.coeff_modulus, crt=self.crt_context) \
-            .add(e2, self.coeff_modulus) \
-            .mod_small(self.coeff_modulus)
+        """Encrypts a plaintext with the public key.
+
+        With a zero pool, this only adds the plaintext to a precomputed
+        encryption of zero.
+        """
+        modulus = self.coeff_modulus
+        if self.zero_pool is not None:
+            zero = self.zero_pool.take()
+            if zero.modulus == modulus:
+                c0 = zero.c0.add_reduce(plaintext.poly, modulus, centered=True)
+                return Ciphertext(c0, zero.c1, plaintext.scaling_factor, modulus)
+            # Encryptions of zero from before raise_modulus are dropped.
+            self.zero_pool.discard(zero)
+        return self.encrypt_with_pk(plaintext, modulus)
+
+    def encrypt_zero(self) -> Ciphertext:
+        """Encrypts zero with the public key, as stocked by a zero pool.
+        """
+        return self.encrypt_with_pk(Plaintext(Polynomial(self.poly_degree, [0] * self.poly_degree)))
+
+    def start_zero_pool(self, low_watermark: int = 4, high_watermark: int = 16,
+                        num_workers: int = 1) -> ZeroEncryptionPool:
+        """Starts background threads that keep encryptions of zero ready for encrypt.
+        """
+        self.stop_zero_pool()
+        self.zero_pool = ZeroEncryptionPool(self.encrypt_zero, low_watermark, high_watermark, num_workers)
+        return self.zero_pool
+
+    def stop_zero_pool(self):
+        if self.zero_pool is not None:
+            self.zero_pool.close()
+            self.zero_pool = None
+
+    def encrypt_with_pk(self, plaintext: Plaintext, modulus: Optional[int] = None) -> Ciphertext:
+        """Encrypts a plaintext with the public key, modulo the current coefficient modulus by default.
+
+        The modulus is read once, so a ciphertext encrypted by a zero pool
+        worker while raise_modulus runs is reduced and labelled consistently.
+        """
+        modulus = modulus or self.coeff_modulus
+        if self.crt_context:
+            # The public key is kept in NTT form, so r is the only forward transform.
+            # Randomness is sampled directly in RNS form, and noise and message
+            # are added in RNS form, so each component is reconstructed exactly once.
+            crt = self.crt_context
+            (r, e1, e2) = [RNSPolynomial(crt, sample_triangle(self.poly_degree, crt=crt)) for _ in range(3)]
+            p0, p1 = self.public_key.to_ntt(crt)
+            r_ntt = r.to_ntt()
+            # c0 = p0 * r + e1 + m
+            c0 = RNSPolynomial.from_ntt(p0.multiply(r_ntt)) \
+                .add(e1) \
+                .add(RNSPolynomial.from_polynomial(plaintext.poly, self.crt_context)) \
+                .to_polynomial() \
+                .mod_small(modulus)
+            # c1 = p1 * r + e2
+            c1 = RNSPolynomial.from_ntt(p1.multiply(r_ntt)) \
+                .add(e2) \
+                .to_polynomial() \
+                .mod_small(modulus)
+        else:
+            (r, e1, e2) = [Polynomial(self.poly_degree, sample_triangle(self.poly_degree)) for _ in range(3)]
+            # c0 = p0 * r + e1 + m
+            c0 = self.public_key.p0.multiply(r, modulus) \
+                .iadd(e1) \
+                .add_reduce(plaintext.poly, modulus, centered=True)
+            # c1 = p1 * r + e2
+            c1 = self.public_key.p1.multiply_add(r, e2, modulus, centered=True)
             
-        return Ciphertext(c0, c1, plaintext.scaling_factor, self.coeff_modulus)
+        return Ciphertext(c0, c1, plaintext.scaling_factor, modulus)
     
     def raise_modulus(self, new_modulus: int):
         """Rescales scheme to have a new modulus.
         Raises ciphertext modulus.
         """
-        self.coeff_modulus = new_modulus
\ No newline at end of file
+        self.coeff_modulus = new_modulus
+        if self.zero_pool is not None:
+            self.zero_pool.clear()
\ No newline at end of file
@@ -1,9 +1,17 @@
+from typing import Dict, Iterable, Optional, Union
+
 from ckks.parameters import CKKSParameters
+from ckks.switching_key import CKKSSwitchingKey
 from util.crypto.ciphertext import Ciphertext
 from util.crypto.plaintext import Plaintext
 from util.crypto.public_key import PublicKey
+from util.crypto.rotation_key import RotationKey
+from util.math.galois import conjugation_element, galois_element
+from util.ntt_polynomial import NTTPolynomial
 from util.polynomial import Polynomial
 
+SwitchingKey = Union[PublicKey, CKKSSwitchingKey]
+
 class CKKSEvaluator:
     def __init__(self, params: CKKSParameters):
         self.poly_degree = params.poly_degree
@@ -11,52 +19,220 @@ class CKKSEvaluator:
         self.scaling_factor = params.scaling_factor
         self.bootstrapping = None
         self.crt_context = params.crt_context
+        self.num_digits = params.num_digits
+        self.digit_base = params.digit_base
+        self.special_modulus = params.special_modulus
+        self.key_switch_crt_context = params.key_switch_crt_context
         
     def add(self, ct1: Ciphertext, ct2: Ciphertext) -> Ciphertext:
         assert ct1.modulus == ct2.modulus, "Ciphertext modulus are not same"
         assert ct1.scaling_factor == ct2.scaling_factor, "Ciphertext scaling factor are not same"
         modulus = ct1.modulus
-        c0 = ct1.c0.add(ct2.c0, modulus).mod_small(modulus)
-        c1 = ct1.c1.add(ct2.c1, modulus).mod_small(modulus)
+        c0 = ct1.c0.add_reduce(ct2.c0, modulus, centered=True)
+        c1 = ct1.c1.add_reduce(ct2.c1, modulus, centered=True)
         return Ciphertext(c0, c1, ct1.scaling_factor, modulus)
     
     def add_plain(self, ct: Ciphertext, pt: Plaintext) -> Ciphertext:
         assert ct.scaling_factor == pt.scaling_factor, "Ciphertext and Plaintext scaling factor are not same"
         modulus = ct.modulus
-        c0 = ct.c0.add(pt.poly, modulus).mod_small(modulus)
+        c0 = ct.c0.add_reduce(pt.poly, modulus, centered=True)
         return Ciphertext(c0, ct.c1, ct.scaling_factor, modulus)
     
-    def multiply(self, ct1: Ciphertext, ct2: Ciphertext, relin_key: PublicKey) -> Ciphertext:
+    def multiply(self, ct1: Ciphertext, ct2: Ciphertext, relin_key: SwitchingKey) -> Ciphertext:
         assert ct1.modulus == ct2.modulus, "Ciphertext modulus are not same"
-        modulus = ct1.modulus
-        
-        # c0 = c0_1 * c0_2
-        c0 = ct1.c0.multiply(ct2.c0, modulus, crt=self.crt_context).mod_small(modulus)
-        # c1 = c0_1 * c1_2 + c1_1 * c0_2
-        c1 = ct1.c0.multiply(ct2.c1, modulus, crt=self.crt_context) \
-            .add(ct1.c1.multiply(ct2.c0, modulus, crt=self.crt_context), modulus) \
-            .mod_small(modulus)
-        # c2 = c1_1 * c1_2
-        c2 = ct1.c1.multiply(ct2.c1, modulus, crt=self.crt_context).mod_small(modulus)
-        
+        (c0, c1, c2) = self.tensor(ct1, ct2)
         return self.relinearize(
             relin_key, c0, c1, c2,
             new_scaling_factor=(ct1.scaling_factor * ct2.scaling_factor),
-            modulus=modulus
+            modulus=ct1.modulus
         )
-        
-    def relinearize(self, relin_key: PublicKey, c0: Polynomial, c1: Polynomial, c2: Polynomial, new_scaling_factor: float, modulus: int) -> Ciphertext:
-        # c0' = (p0 * c2)/big_modulus + c0
-        new_c0 = relin_key.p0.multiply(c2, modulus * self.big_modulus, crt=self.crt_context) \
-            .mod_small(modulus * self.big_modulus) \
-            .divide(self.big_modulus) \
-            .add(c0, modulus) \
-            .mod_small(modulus)
-        # c1' = (p1 * c2)/big_modulus + c1
-        new_c1 = relin_key.p1.multiply(c2, modulus * self.big_modulus, crt=self.crt_context) \
-            .mod_small(modulus * self.big_modulus) \
-            .divide(self.big_modulus) \
-            .add(c1, modulus) \
-            .mod_small(modulus)
-            
-        return Ciphertext(new_c0, new_c1, new_scaling_factor, modulus)
\ No newline at end of file
+
+    def square(self, ct: Ciphertext, relin_key: SwitchingKey) -> Ciphertext:
+        """Squares a ciphertext, transforming each of its two components once.
+        """
+        (c0, c1, c2) = self.tensor(ct)
+        return self.relinearize(relin_key, c0, c1, c2, new_scaling_factor=ct.scaling_factor ** 2,
+                                modulus=ct.modulus)
+
+    def tensor(self, ct1: Ciphertext, ct2: Optional[Ciphertext] = None):
+        """Computes the tensor product of two ciphertexts, or the square of ct1 if ct2 is None.
+
+        The middle term c0_1 * c1_2 + c1_1 * c0_2 comes from the Karatsuba
+        identity, so three polynomial products are computed instead of four.
+
+        Returns:
+            Tuple (c0, c1, c2) of Polynomials with coefficients centered modulo
+            the ciphertext modulus.
+        """
+        modulus = ct1.modulus
+        if self.crt_context:
+            # Each input is transformed once, into the scratch arrays of the context.
+            second = None if ct2 is None else (ct2.c0.coeffs, ct2.c1.coeffs)
+            tensored = self.crt_context.tensor((ct1.c0.coeffs, ct1.c1.coeffs), second)
+            return tuple(Polynomial(ct1.c0.degree, self.crt_context.from_rns(c, centered=True))
+                         .ireduce(modulus, centered=True) for c in tensored)
+
+        (a0, a1) = (ct1.c0, ct1.c1)
+        if ct2 is None:
+            # c1 = 2 * c0 * c1
+            c1 = a0.multiply(a1, modulus).imul_scalar(2, modulus)
+            (c0, c2) = (a0.multiply(a0, modulus), a1.multiply(a1, modulus))
+        else:
+            (b0, b1) = (ct2.c0, ct2.c1)
+            (c0, c2) = (a0.multiply(b0, modulus), a1.multiply(b1, modulus))
+            # c1 = (c0_1 + c1_1) * (c0_2 + c1_2) - c0 - c2
+            c1 = a0.add(a1).multiply(b0.add(b1), modulus).isub(c0).isub(c2)
+        return tuple(c.ireduce(modulus, centered=True) for c in (c0, c1, c2))
+
+    def relinearize(self, relin_key: SwitchingKey, c0: Polynomial, c1: Polynomial, c2: Polynomial, new_scaling_factor: float, modulus: int) -> Ciphertext:
+        return self.switch_key(relin_key, c2, c0, c1, new_scaling_factor, modulus)
+
+    def switch_key(self, key: SwitchingKey, c: Polynomial, c0: Polynomial, c1: Optional[Polynomial],
+                   scaling_factor: float, modulus: int, hoisted=None) -> Ciphertext:
+        """Computes (c0, c1) + round((key.p0 * c, key.p1 * c) / P) modulo modulus.
+
+        With a PublicKey, P is big_modulus. With a CKKSSwitchingKey, c is
+        split into balanced digits c_j and (key.p0 * c, key.p1 * c) stands for
+        the sum of the products of each c_j with the key of digit j, divided
+        by the special modulus P.
+
+        Args:
+            key (PublicKey or CKKSSwitchingKey): Switching key.
+            c (Polynomial): Component decrypting under the old key.
+            c0 (Polynomial): First component of the result before key switching.
+            c1 (Polynomial): Second component, or None for zero.
+            scaling_factor (float): Scaling factor of the result.
+            modulus (int): Ciphertext modulus.
+            hoisted: hoist(c, modulus), if already computed.
+
+        Returns:
+            A Ciphertext decrypting under the key encrypted in the switching key.
+        """
+        if hoisted is None:
+            hoisted = self.hoist(c, modulus)
+        if isinstance(key, CKKSSwitchingKey):
+            divisor = self.special_modulus
+            (p0_c, p1_c) = self.digit_products(key, hoisted, modulus)
+        elif self.crt_context:
+            # The switching key stays in NTT form; c is transformed once for both products.
+            divisor = self.big_modulus
+            (p0, p1) = key.to_ntt(self.crt_context)
+            p0_c = p0.multiply(hoisted).to_polynomial()
+            p1_c = p1.multiply(hoisted).to_polynomial()
+        else:
+            divisor = self.big_modulus
+            p0_c = key.p0.multiply(hoisted, modulus * divisor)
+            p1_c = key.p1.multiply(hoisted, modulus * divisor)
+        # c0' = (p0 * c)/P + c0
+        new_c0 = p0_c.divide_round_reduce(divisor, modulus, addend=c0, center_modulus=modulus * divisor)
+        # c1' = (p1 * c)/P + c1
+        new_c1 = p1_c.divide_round_reduce(divisor, modulus, addend=c1, center_modulus=modulus * divisor)
+
+        return Ciphertext(new_c0, new_c1, scaling_factor, modulus)
+
+    def hoist(self, c: Polynomial, modulus: int):
+        """Computes the part of key switching that only depends on c, for switch_key.
+
+        With hybrid key switching, these are the balanced digits of c centered
+        modulo the ciphertext modulus, only as many as the modulus needs.
+        Polynomials are transformed to NTT form when there is a CRT context
+        for key switching. Since automorphisms permute coefficients up to
+        sign, and NTT values without sign, the result of hoisting c can be
+        rotated with hoisted_automorphism instead of hoisting a rotation of c.
+
+        Returns:
+            A Polynomial or NTTPolynomial, or a list of them for hybrid key
+            switching.
+        """
+        if self.num_digits:
+            base_bits = self.digit_base.bit_length() - 1
+            num_digits = min(self.num_digits, -(-(modulus.bit_length() + 1) // base_bits))
+            digits = c.mod_small(modulus).signed_decompose(self.digit_base, num_digits)
+            if self.key_switch_crt_context:
+                return [NTTPolynomial.from_polynomial(d, self.key_switch_crt_context) for d in digits]
+            return digits
+        if self.crt_context:
+            return NTTPolynomial.from_polynomial(c, self.crt_context)
+        return c
+
+    def hoisted_automorphism(self, hoisted, galois_elt: int):
+        """Applies m(X) -> m(X^k) to the result of hoist.
+        """
+        if isinstance(hoisted, list):
+            return [h.automorphism(galois_elt) for h in hoisted]
+        return hoisted.automorphism(galois_elt)
+
+    def digit_products(self, key: CKKSSwitchingKey, digits, modulus: int):
+        """Computes the sums over j of the products of digit c_j with the key of digit j.
+
+        With a CRT context for key switching, the products are accumulated in
+        NTT form, so only two inverse transforms are needed for all digits.
+
+        Returns:
+            Tuple of two Polynomials, exact, or modulo P * modulus without CRT context.
+        """
+        crt = self.key_switch_crt_context
+        if crt:
+            (p0, p1) = key.to_ntt(crt)
+            sums = []
+            for keys in (p0, p1):
+                total = crt.rns_multiply(keys[0], digits[0].values)
+                for j in range(1, len(digits)):
+                    total = crt.rns_add(total, crt.rns_multiply(keys[j], digits[j].values))
+                sums.append(NTTPolynomial(crt, total).to_polynomial())
+            return tuple(sums)
+
+        mod = self.special_modulus * modulus
+        sums = []
+        for name in ('p0', 'p1'):
+            total = Polynomial(self.poly_degree, [0] * self.poly_degree)
+            for j, digit in enumerate(digits):
+                total = total.add(getattr(key.keys[j], name).multiply(digit, mod), mod)
+            sums.append(total)
+        return tuple(sums)
+
+    def rotate(self, ct: Ciphertext, rotation: int, rot_key: RotationKey) -> Ciphertext:
+        """Rotates the slots of a ciphertext to the left by rotation.
+
+        Applies the automorphism x -> x^(5^r) to both components and switches
+        the key of the result from s(x^(5^r)) back to s.
+        """
+        return self.rotate_many(ct, [rotation], {rotation: rot_key})[rotation]
+
+    def conjugate(self, ct: Ciphertext, conj_key: SwitchingKey) -> Ciphertext:
+        """Conjugates the slots of a ciphertext, with the key from generate_conj_key.
+        """
+        galois_elt = conjugation_element(self.poly_degree)
+        hoisted = self.hoisted_automorphism(self.hoist(ct.c1, ct.modulus), galois_elt)
+        return self.switch_key(conj_key, None, ct.c0.automorphism(galois_elt), None,
+                               ct.scaling_factor, ct.modulus, hoisted=hoisted)
+
+    def rotate_many(self, ct: Ciphertext, rotations: Iterable[int],
+                    rot_keys: Dict[int, RotationKey]) -> Dict[int, Ciphertext]:
+        """Rotates a ciphertext by several steps, sharing the work on c1 between them.
+
+        c1 is hoisted once: decomposed into digits for hybrid key switching,
+        and transformed to NTT form with a CRT context. The automorphism of
+        each rotation is then a permutation of the hoisted values, so only the
+        products with the key and their inverse transforms are computed per
+        rotation.
+
+        Args:
+            ct (Ciphertext): Ciphertext to rotate.
+            rotations (iterable): Rotations to apply.
+            rot_keys (dict): Map from rotations to their keys, as returned by
+                CKKSKeyGenerator.generate_rot_keys.
+
+        Returns:
+            Dict mapping each rotation to the rotated ciphertext.
+        """
+        hoisted = self.hoist(ct.c1, ct.modulus)
+        rotated = {}
+        for rotation in rotations:
+            rot_key = rot_keys[rotation]
+            assert rot_key.rotation == rotation, 'Rotation key is for rotation %d' % rot_key.rotation
+            galois_elt = galois_element(rotation, self.poly_degree)
+            rotated[rotation] = self.switch_key(rot_key.key, None, ct.c0.automorphism(galois_elt), None,
+                                                ct.scaling_factor, ct.modulus,
+                                                hoisted=self.hoisted_automorphism(hoisted, galois_elt))
+        return rotated
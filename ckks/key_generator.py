@@ -1,17 +1,46 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Optional
+
 from ckks.parameters import CKKSParameters
+from ckks.switching_key import CKKSSwitchingKey
 from util.crypto.public_key import PublicKey
 from util.crypto.rotation_key import RotationKey
 from util.crypto.secret_key import SecretKey
 from util.polynomial import Polynomial
 from util.random_sampling import sample_hamming_weight_vector, sample_triangle, sample_uniform
 
+# Key generator of a rotation key worker process, set by init_rot_key_worker.
+_worker_generator = None
+
+def init_rot_key_worker(params: CKKSParameters, secret_key: SecretKey):
+    global _worker_generator
+    _worker_generator = CKKSKeyGenerator.from_secret_key(params, secret_key)
+
+def generate_packed_rot_key(rotation: int) -> RotationKey:
+    """Generates a rotation key in a worker process, packed to be sent back cheaply.
+    """
+    key = _worker_generator.generate_rot_key(rotation)
+    return key.pack(_worker_generator.params.switching_key_modulus)
+
 class CKKSKeyGenerator:
     def __init__(self, params: CKKSParameters):
         self.params = params
         self.generate_secret_key(params)
         self.generate_public_key(params)
         self.generate_relin_key(params)
-        
+
+    @classmethod
+    def from_secret_key(cls, params: CKKSParameters, secret_key: SecretKey):
+        """Returns a generator of further switching keys for an existing secret key.
+
+        No public or relinearization key is generated.
+        """
+        generator = cls.__new__(cls)
+        generator.params = params
+        generator.secret_key = secret_key
+        return generator
+
     def generate_secret_key(self, params: CKKSParameters):
         """Generates CKKS Secret key.
         s = (s_0, s_1, ..., s_n-1) where s_i ~ U(0, 1)
@@ -24,7 +53,7 @@ class CKKSKeyGenerator:
         pk_coeff = Polynomial(params.poly_degree, sample_uniform(0, mod, params.poly_degree))
         pk_error = Polynomial(params.poly_degree, sample_triangle(params.poly_degree))
         # p0 = -a * s + e
-        p0 = pk_coeff.multiply(self.secret_key.s, mod) \
+        p0 = self.secret_key.multiply(pk_coeff, mod) \
             .scalar_multiply(-1, mod) \
             .add(pk_error, mod)
         # p1 = a
@@ -32,6 +61,8 @@ class CKKSKeyGenerator:
         self.public_key = PublicKey(p0, p1)
         
     def generate_switching_key(self, new_key: Polynomial):
+        if self.params.num_digits:
+            return self.generate_hybrid_switching_key(new_key)
         mod = self.params.big_modulus
         mod_squared = mod ** 2
         
@@ -40,16 +71,35 @@ class CKKSKeyGenerator:
         swk_error = Polynomial(self.params.poly_degree, sample_triangle(self.params.poly_degree))
         
         # (-coeff * s) + e + (new_key * mod)
-        sw0 = swk_coeff.multiply(self.secret_key.s, mod_squared) \
+        sw0 = self.secret_key.multiply(swk_coeff, mod_squared) \
             .scalar_multiply(-1, mod_squared) \
             .add(swk_error, mod_squared) \
             .add(new_key.scalar_multiply(mod, mod_squared), mod_squared)
         sw1 = swk_coeff
         return PublicKey(sw0, sw1)
         
+    def generate_hybrid_switching_key(self, new_key: Polynomial) -> CKKSSwitchingKey:
+        """Generates a switching key for hybrid key switching, one key per digit.
+        Key j = (-a_j * s + e_j + P * B^j * new_key, a_j) mod P * Q, with a_j ~ U(0, P * Q)
+        """
+        params = self.params
+        mod = params.switching_key_modulus
+        keys = []
+        factor = params.special_modulus
+        for _ in range(params.num_digits):
+            coeff = Polynomial(params.poly_degree, sample_uniform(0, mod, params.poly_degree))
+            error = Polynomial(params.poly_degree, sample_triangle(params.poly_degree))
+            k0 = self.secret_key.multiply(coeff, mod) \
+                .scalar_multiply(-1, mod) \
+                .add(error, mod) \
+                .add(new_key.scalar_multiply(factor, mod), mod)
+            keys.append(PublicKey(k0, coeff))
+            factor = factor * params.digit_base % mod
+        return CKKSSwitchingKey(params.digit_base, mod, keys)
+
     def generate_relin_key(self, params: CKKSParameters):
         # s^2 % big_modulus
-        sk_squared = self.secret_key.s.multiply(self.secret_key.s, params.big_modulus)
+        sk_squared = self.secret_key.multiply(self.secret_key.s, params.big_modulus)
         self.relin_key = self.generate_switching_key(sk_squared)
         
     def generate_rot_key(self, rotation: int):
@@ -57,6 +107,32 @@ class CKKSKeyGenerator:
         new_key = self.secret_key.s.rotate(rotation)
         rk = self.generate_switching_key(new_key)
         return RotationKey(rotation, rk)
+
+    def generate_rot_keys(self, rotations: Iterable[int], num_workers: Optional[int] = None) -> Dict[int, RotationKey]:
+        """Generates the rotation keys of many rotations in parallel processes.
+
+        Every worker gets the parameters and the secret key, along with its
+        cached NTT form, once when it starts; keys come back packed.
+
+        Args:
+            rotations (iterable): Rotations to generate keys for.
+            num_workers (int): Number of worker processes, by default one per
+                CPU. With one worker, keys are generated in this process.
+
+        Returns:
+            Dict mapping each rotation to its RotationKey.
+        """
+        rotations = list(dict.fromkeys(rotations))
+        num_workers = min(num_workers or os.cpu_count() or 1, len(rotations))
+        if num_workers <= 1:
+            return {rotation: self.generate_rot_key(rotation) for rotation in rotations}
+        # Transform s once here, for forked workers to inherit its NTT form.
+        crt = self.secret_key.multiply_crt(self.params.switching_key_modulus)
+        if crt:
+            self.secret_key.to_ntt(crt)
+        with ProcessPoolExecutor(num_workers, initializer=init_rot_key_worker,
+                                 initargs=(self.params, self.secret_key)) as executor:
+            return {key.rotation: key.unpack() for key in executor.map(generate_packed_rot_key, rotations)}
         
     def generate_conj_key(self):
         # Generate K_{-1}(s).
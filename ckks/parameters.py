@@ -3,7 +3,7 @@ import math
 from util.math.crt import CRTContext
 
 class CKKSParameters:
-    def __init__(self, poly_degree: int, ciph_modulus: int, big_modulus: int, scaling_factor: float, taylor_iterations=6, prime_size=59):
+    def __init__(self, poly_degree: int, ciph_modulus: int, big_modulus: int, scaling_factor: float, taylor_iterations=6, prime_size=59, num_digits=None):
         self.poly_degree = poly_degree # d
         self.ciph_modulus = ciph_modulus # p
         self.big_modulus = big_modulus # q: large modulus used for bootstrapping
@@ -17,6 +17,26 @@ class CKKSParameters:
             num_primes = 1 + int((1 + math.log(poly_degree, 2) + 4 * math.log(big_modulus, 2) \
                 / prime_size))
             self.crt_context = CRTContext(num_primes, prime_size, poly_degree)
+
+        # Hybrid key switching: ciphertexts are split into num_digits (dnum)
+        # balanced digits in base B, with B^dnum >= 2 * big_modulus, and the
+        # keys live modulo P * big_modulus for a special modulus P = B.
+        # Without digits, switching keys live modulo big_modulus^2.
+        self.num_digits = num_digits
+        self.digit_base = None
+        self.special_modulus = None
+        self.switching_key_modulus = big_modulus ** 2
+        self.key_switch_crt_context = None
+        if num_digits:
+            digit_bits = -(-(big_modulus.bit_length() + 1) // num_digits)
+            self.digit_base = 1 << digit_bits
+            self.special_modulus = 1 << digit_bits
+            self.switching_key_modulus = self.special_modulus * big_modulus
+            if prime_size:
+                # Sum of dnum products of digits of at most B/2 with keys centered modulo P * Q.
+                bound = num_digits * poly_degree * (self.digit_base // 2) * (self.switching_key_modulus // 2)
+                num_primes = 1 + (bound.bit_length() + 1) // prime_size
+                self.key_switch_crt_context = CRTContext(num_primes, prime_size, poly_degree)
             
     def print_parameters(self):
         """Prints parameters.
@@ -31,4 +51,6 @@ class CKKSParameters:
             rns = "Yes"
         else:
             rns = "No"
-        print("\t RNS: %s" % (rns))
\ No newline at end of file
+        print("\t RNS: %s" % (rns))
+        if self.num_digits:
+            print("\t Key switching digits: %d" % (self.num_digits))
\ No newline at end of file
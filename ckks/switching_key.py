@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from util.crypto.public_key import PublicKey
+from util.math.crt import CRTContext
+from util.packed_polynomial import unpack
+
+class CKKSSwitchingKey:
+    """A key for hybrid key switching, with one switching key per digit.
+
+    Key j encrypts P * B^j * s' modulo P * Q under s, where B is the digit
+    base, P the special modulus and Q the big modulus.
+    """
+    __slots__ = ('base', 'modulus', 'keys', 'ntt_forms')
+
+    def __init__(self, base: int, modulus: int, keys: List[PublicKey]):
+        """Initializes a hybrid switching key.
+        base: Digit base B
+        modulus: Modulus P * Q of the keys
+        keys: Switching key of each digit
+        """
+        self.base = base
+        self.modulus = modulus
+        self.keys = keys
+        self.ntt_forms = {}
+
+    def to_ntt(self, crt: CRTContext) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns the NTT forms over crt of the p0 and of the p1 of every digit key.
+
+        Keys are centered modulo P * Q before the transform. The transforms
+        are computed once per CRT context and reused afterwards.
+
+        Returns:
+            Tuple of two arrays of shape (num_digits, num_primes, poly_degree).
+        """
+        if crt not in self.ntt_forms:
+            self.ntt_forms[crt] = tuple(
+                np.array([crt.ntt_fwd(unpack(getattr(key, name)).mod_small(self.modulus).coeffs)
+                          for key in self.keys])
+                for name in ('p0', 'p1'))
+        return self.ntt_forms[crt]
+
+    def pack(self, modulus: Optional[int] = None) -> CKKSSwitchingKey:
+        """Returns a copy with every digit key packed modulo P * Q.
+        Cached NTT forms are not copied.
+        """
+        return CKKSSwitchingKey(self.base, self.modulus, [key.pack(self.modulus) for key in self.keys])
+
+    def unpack(self) -> CKKSSwitchingKey:
+        return CKKSSwitchingKey(self.base, self.modulus, [key.unpack() for key in self.keys])
+
+    def __str__(self):
+        return 'Base: %d\n%s' % (self.base, '\n'.join(str(key) for key in self.keys))
@@ -0,0 +1,8 @@
+"""Test configuration shared by all test modules."""
+import os
+import tempfile
+
+# Keep auto-tuner calibrations out of the user's home directory. Set before
+# util.multiply_tuner is imported, which reads it when creating the tuner.
+_tuning_directory = tempfile.TemporaryDirectory()
+os.environ.setdefault('FHE_PY_TUNING_CACHE', os.path.join(_tuning_directory.name, 'multiply_tuning.json'))
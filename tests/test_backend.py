@@ -0,0 +1,132 @@
+"""Tests for backend.py, checking the numpy backend against the reference one."""
+import unittest
+import numpy as np
+from util.math.backend import BACKENDS, get_backend, use_backend
+from util.math.context_registry import get_fft_context, get_ntt_context
+from util.math.crt import CRTContext
+from util.math.ntt import FFTContext, NTTContext, NumpyFFTContext, NumpyNTTContext
+from util.polynomial import Polynomial
+from hypothesis import given
+from hypothesis.strategies import floats, integers, lists, one_of
+
+DEGREE = 16
+coeff_lists = one_of(
+    lists(integers(min_value=-(1 << 61) + 1, max_value=(1 << 61) - 1), min_size=DEGREE, max_size=DEGREE),
+    lists(integers(min_value=-(1 << 100), max_value=1 << 100), min_size=DEGREE, max_size=DEGREE),
+)
+moduli = one_of(integers(min_value=2, max_value=(1 << 62) - 1), integers(min_value=2, max_value=1 << 100))
+
+class TestBackend(unittest.TestCase):
+    def setUp(self):
+        self.reference = BACKENDS['reference']
+        self.numpy = BACKENDS['numpy']
+
+    def assert_same(self, method, *args):
+        expected = getattr(self.reference, method)(*args)
+        result = getattr(self.numpy, method)(*args)
+        self.assertEqual(result, expected)
+        self.assertTrue(all(type(r) == type(e) for r, e in zip(result, expected)))
+
+    @given(coeff_lists, coeff_lists, moduli)
+    def test_add_subtract(self, a, b, modulus):
+        for method in ('add', 'subtract'):
+            self.assert_same(method, a, b)
+            self.assert_same(method, a, b, modulus)
+
+    @given(coeff_lists, integers(min_value=-(1 << 80), max_value=1 << 80), moduli)
+    def test_scalar_multiply(self, a, scalar, modulus):
+        self.assert_same('scalar_multiply', a, scalar)
+        self.assert_same('scalar_multiply', a, scalar, modulus)
+        self.assert_same('scalar_multiply', a, 1 / (abs(scalar) + 1))
+
+    @given(coeff_lists, integers(min_value=1, max_value=1 << 80), moduli)
+    def test_divide_and_reduce(self, a, divisor, modulus):
+        self.assert_same('divide', a, divisor)
+        self.assert_same('divide', a, -divisor, modulus)
+        self.assert_same('mod', a, modulus)
+        self.assert_same('mod_small', a, modulus)
+
+    @given(coeff_lists, coeff_lists, moduli)
+    def test_add_reduce(self, a, b, modulus):
+        self.assert_same('add_reduce', a, b, modulus)
+        self.assert_same('add_reduce', a, b, modulus, True)
+
+    @given(coeff_lists, coeff_lists, integers(min_value=1, max_value=80), integers(min_value=1, max_value=80),
+           integers(min_value=1, max_value=1 << 40), integers(min_value=1, max_value=3))
+    def test_divide_round_reduce(self, a, b, divisor_bits, modulus_bits, odd, multiple):
+        for (divisor, modulus) in ((1 << divisor_bits, 1 << modulus_bits), (odd, (1 << modulus_bits) + odd)):
+            for center_modulus in (None, modulus * divisor, multiple * modulus * divisor, modulus * divisor + 1):
+                self.assert_same('divide_round_reduce', a, divisor, modulus, b, center_modulus)
+                self.assert_same('divide_round_reduce', a, divisor, modulus, None, center_modulus)
+
+    @given(coeff_lists, integers(min_value=1, max_value=200))
+    def test_power_of_two_moduli(self, a, bits):
+        self.assert_same('mod', a, 1 << bits)
+        self.assert_same('mod_small', a, 1 << bits)
+        self.assert_same('add_reduce', a, a, 1 << bits, True)
+
+    @given(lists(floats(min_value=-1e18, max_value=1e18), min_size=DEGREE, max_size=DEGREE),
+           integers(min_value=1, max_value=80))
+    def test_float_coefficients(self, a, bits):
+        for modulus in (1 << bits, (1 << bits) + 1):
+            self.assert_same('mod', a, modulus)
+            self.assert_same('mod_small', a, modulus)
+            self.assert_same('add_reduce', a, a, modulus, True)
+            self.assert_same('divide_round_reduce', a, 1 << bits, modulus, None, None)
+        self.assertEqual(Polynomial(4, [1.5, 2.0, -3.25, 4.0]).mod(1 << 20).coeffs, [1.5, 2.0, (1 << 20) - 3.25, 4.0])
+
+    def test_mixed_coefficients(self):
+        self.assertIsNone(self.numpy.int64_array([1, 2.5, 3, 4]))
+        self.assertIsNone(self.numpy.int64_array([1, 1 << 64, 3, 4]))
+        for a in ([1, 2.5, 3, 4], [1, 1 << 64, -3, 4]):
+            for modulus in (97, 1 << 20):
+                self.assert_same('mod', a, modulus)
+                self.assert_same('mod_small', a, modulus)
+                self.assert_same('add', a, a, modulus)
+                self.assert_same('scalar_multiply', a, 3, modulus)
+        self.assertEqual(Polynomial(4, [1, 2.5, 3, 4]).mod(97).coeffs, [1, 2.5, 3, 4])
+
+    @given(lists(floats(min_value=-1e18, max_value=1e18), min_size=DEGREE, max_size=DEGREE))
+    def test_round_and_floor(self, a):
+        self.assert_same('round', a)
+        self.assert_same('floor', a)
+        self.assert_same('round', [complex(c, 1.5) for c in a])
+        self.assert_same('round', [c + 0.5 for c in range(-DEGREE // 2, DEGREE // 2)])
+
+    def test_contexts(self):
+        prime = CRTContext(1, 30, DEGREE).primes[0]
+        self.assertIs(get_backend(), self.numpy)
+        self.assertIsInstance(get_ntt_context(DEGREE, prime), NumpyNTTContext)
+        self.assertIsInstance(get_fft_context(4 * DEGREE), NumpyFFTContext)
+        with use_backend('reference'):
+            self.assertIs(get_backend(), self.reference)
+            self.assertNotIsInstance(get_ntt_context(DEGREE, prime), NumpyNTTContext)
+            self.assertNotIsInstance(get_fft_context(4 * DEGREE), NumpyFFTContext)
+            self.assertFalse(CRTContext(2, 30, DEGREE).vectorized)
+        self.assertIs(get_backend(), self.numpy)
+
+    def test_fft_matches_reference(self):
+        rng = np.random.default_rng(7)
+        for fft_length in (8, 64, 256):
+            reference = FFTContext(fft_length)
+            fft = NumpyFFTContext(fft_length)
+            for num_coeffs in (1, 2, fft_length // 4):
+                coeffs = (rng.standard_normal(num_coeffs) + 1j * rng.standard_normal(num_coeffs)).tolist()
+                for method in ('fft_fwd', 'fft_inv', 'embedding', 'embedding_inv'):
+                    expected = getattr(reference, method)(coeffs)
+                    np.testing.assert_allclose(getattr(fft, method)(coeffs), expected, atol=1e-12)
+
+    @given(lists(integers(min_value=-(1 << 100), max_value=1 << 100), min_size=DEGREE, max_size=DEGREE),
+           lists(integers(min_value=-(1 << 100), max_value=1 << 100), min_size=DEGREE, max_size=DEGREE))
+    def test_crt_multiply_matches_reference(self, a, b):
+        (a, b) = (Polynomial(DEGREE, a), Polynomial(DEGREE, b))
+        expected = a.multiply(b, crt=CRTContext(5, 59, DEGREE)).coeffs
+        with use_backend('reference'):
+            crt = CRTContext(5, 59, DEGREE)
+            self.assertIsInstance(crt.ntts[0], NTTContext)
+            self.assertEqual(a.multiply(b, crt=crt).coeffs, expected)
+            self.assertEqual(crt.from_rns(crt.to_rns(a.coeffs), centered=True), a.coeffs)
+            self.assertEqual(a.multiply(b).coeffs, expected)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+"""Tests for context_registry.py."""
+import threading
+import types
+import unittest
+from util.math.context_registry import ContextRegistry
+from util.math.crt import CRTContext
+from util.math.ntt import NumpyNTTContext
+
+class TestContextRegistry(unittest.TestCase):
+    def setUp(self):
+        self.registry = ContextRegistry()
+        self.prime = CRTContext(1, 30, 16).primes[0]
+
+    def test_ntt_context_is_shared(self):
+        ntt1 = self.registry.get_ntt_context(16, self.prime)
+        ntt2 = self.registry.get_ntt_context(16, self.prime)
+        self.assertIs(ntt1, ntt2)
+        self.assertIsInstance(ntt1, NumpyNTTContext)
+        self.assertEqual(self.registry.stats(), {'hits': 1, 'misses': 1, 'size': 1})
+
+    def test_fft_context_is_shared(self):
+        fft1 = self.registry.get_fft_context(64)
+        fft2 = self.registry.get_fft_context(64)
+        self.assertIs(fft1, fft2)
+        self.assertIsNot(fft1, self.registry.get_fft_context(128))
+        self.assertEqual(self.registry.stats(), {'hits': 1, 'misses': 2, 'size': 2})
+
+    def test_contexts_are_frozen(self):
+        ntt = self.registry.get_ntt_context(16, self.prime)
+        self.assertIsInstance(ntt.roots_of_unity, tuple)
+        self.assertFalse(ntt.rou_u64.flags.writeable)
+        coeffs = list(range(16))
+        self.assertEqual(ntt.negacyclic_inv(ntt.negacyclic_fwd(coeffs)), coeffs)
+        fft = self.registry.get_fft_context(64)
+        self.assertIsInstance(fft.roots_of_unity, tuple)
+
+    def test_evict(self):
+        ntt = self.registry.get_ntt_context(16, self.prime)
+        self.assertTrue(self.registry.evict_ntt_context(16, self.prime))
+        self.assertFalse(self.registry.evict_ntt_context(16, self.prime))
+        self.assertIsNot(ntt, self.registry.get_ntt_context(16, self.prime))
+        self.registry.get_fft_context(32)
+        self.assertTrue(self.registry.evict_fft_context(32))
+        self.registry.clear()
+        self.assertEqual(self.registry.stats(), {'hits': 0, 'misses': 0, 'size': 0})
+
+    def test_threads_share_one_context(self):
+        results = []
+        def lookup():
+            results.append(self.registry.get_ntt_context(16, self.prime))
+        threads = [threading.Thread(target=lookup) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertTrue(all(r is results[0] for r in results))
+        self.assertEqual(self.registry.stats()['misses'], 1)
+
+    def test_build_runs_outside_lock(self):
+        started = threading.Event()
+        release = threading.Event()
+        def slow_factory():
+            started.set()
+            self.assertTrue(release.wait(10))
+            return types.SimpleNamespace()
+        results = []
+        def lookup():
+            results.append(self.registry.get('slow', slow_factory))
+        threads = [threading.Thread(target=lookup) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        self.assertTrue(started.wait(10))
+        # Other keys are served while the slow context is being built.
+        ntt = self.registry.get_ntt_context(16, self.prime)
+        self.assertIs(ntt, self.registry.get_ntt_context(16, self.prime))
+        release.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(results), 4)
+        self.assertTrue(all(r is results[0] for r in results))
+        self.assertEqual(self.registry.stats()['misses'], 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,11 @@
 """Tests for crt.py."""
 import os
 import unittest
+import numpy as np
 from util.math.crt import CRTContext
+from util.polynomial import Polynomial
+from hypothesis import given
+from hypothesis.strategies import lists, integers
 
 TEST_DIRECTORY = os.path.dirname(__file__)
 
@@ -24,5 +28,51 @@ class TestCRT(unittest.TestCase):
         reverse = self.crt.reconstruct(vals)
         self.assertEqual(original, reverse)
 
+    @given(lists(integers(min_value=0), min_size=1, max_size=16))
+    def test_reconstruct_batch(self, values):
+        crt = CRTContext(5, 59, 16)
+        values = [v % crt.modulus for v in values]
+        residues = np.array([crt.crt(v) for v in values], dtype=np.uint64).T
+        self.assertEqual(crt.reconstruct_batch(residues), values)
+        half = crt.modulus // 2
+        centered = [v - crt.modulus if v > half else v for v in values]
+        self.assertEqual(crt.reconstruct_batch(residues, centered=True), centered)
+
+    @given(lists(integers(min_value=0), min_size=1, max_size=16), integers(min_value=2, max_value=(1 << 62) - 1))
+    def test_base_convert(self, values, modulus):
+        crt = CRTContext(3, 59, 16)
+        values = [v % crt.modulus for v in values]
+        residues = np.array([crt.crt(v) for v in values], dtype=np.uint64).T
+        self.assertEqual(crt.base_convert(residues, modulus).tolist(), [v % modulus for v in values])
+
+    def test_reconstruct_batch_matches_reconstruct(self):
+        values = [0, 1, 178, self.crt.modulus // 2, self.crt.modulus // 2 + 1, self.crt.modulus - 1]
+        residues = np.array([self.crt.crt(v) for v in values], dtype=np.uint64).T
+        self.assertEqual(self.crt.reconstruct_batch(residues),
+                         [self.crt.reconstruct(self.crt.crt(v)) for v in values])
+        self.assertEqual(self.crt.reconstruct_batch(residues, centered=True)[-3:],
+                         [self.crt.modulus // 2, -(self.crt.modulus // 2), -1])
+
+    def test_tensor(self):
+        crt = CRTContext(3, 59, 16)
+        rng = np.random.default_rng(3)
+        (a0, a1, b0, b1) = [Polynomial(16, [int(c) for c in rng.integers(-(1 << 40), 1 << 40, 16)]) for _ in range(4)]
+        expected = [a0.multiply(b0), a0.multiply(b1).add(a1.multiply(b0)), a1.multiply(b1)]
+        tensored = crt.tensor((a0.coeffs, a1.coeffs), (b0.coeffs, b1.coeffs))
+        self.assertEqual([crt.from_rns(c, centered=True) for c in tensored], [p.coeffs for p in expected])
+        # Later calls reuse the same scratch arrays.
+        self.assertIs(crt.tensor((b0.coeffs, b1.coeffs), (a0.coeffs, a1.coeffs)), tensored)
+        self.assertEqual(crt.from_rns(tensored[1], centered=True), expected[1].coeffs)
+
+    def test_rns_automorphism(self):
+        crt = CRTContext(3, 59, 16)
+        rng = np.random.default_rng(5)
+        poly = Polynomial(16, [int(c) for c in rng.integers(-(1 << 60), 1 << 60, 16)])
+        residues = crt.to_rns(poly.coeffs)
+        for rotation in range(4):
+            rotated = crt.rns_automorphism(residues, pow(5, rotation, 32))
+            self.assertEqual(crt.from_rns(rotated, centered=True), poly.rotate(rotation).coeffs)
+        self.assertEqual(crt.from_rns(crt.rns_automorphism(residues, 31), centered=True), poly.conjugate().coeffs)
+
 if __name__ == '__main__':
     res = unittest.main(verbosity=3, exit=False)
\ No newline at end of file
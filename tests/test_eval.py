@@ -1,4 +1,6 @@
 from datetime import timedelta
+import itertools
+import random
 import unittest
 from bfv.decryptor import BFVDecryptor
 from bfv.encryptor import BFVEncryptor
@@ -7,6 +9,7 @@ from bfv.key_generator import BFVKeyGenerator
 from bfv.parameters import BFVParameters
 from bfv.relin_key import BFVRelinKey
 from ckks.decryptor import CKKSDecryptor
+from ckks.encoder import CKKSEncoder
 from ckks.encryptor import CKKSEncryptor
 from ckks.evaluator import CKKSEvaluator
 from ckks.key_generator import CKKSKeyGenerator
@@ -102,6 +105,36 @@ class TestBFVEvaluator(unittest.TestCase):
         print(f"{m1} * {m2} = {decrypted.poly} (answer: {answer})")
         self.assertEqual(str(decrypted.poly), str(answer))
 
+    @given(
+        lists(integers(min_value=0, max_value=0x3fffffff000000), min_size=64, max_size=64),
+        lists(integers(min_value=0, max_value=0x3fffffff000000), min_size=64, max_size=64),
+    )
+    def test_rns_tensor_is_exact(self, m1, m2):
+        degree = 64
+        plain_modulus = 256
+        ciph_modulus = 0x3fffffff000001
+
+        params = BFVParameters(degree, plain_modulus, ciph_modulus)
+        evaluator = BFVEvaluator(params)
+        a = Ciphertext(Polynomial(degree, m1), Polynomial(degree, m2))
+        b = Ciphertext(Polynomial(degree, m2[::-1]), Polynomial(degree, m1[::-1]))
+        (a0, a1, b0, b1) = [c.mod_small(ciph_modulus) for c in (a.c0, a.c1, b.c0, b.c1)]
+        products = (a0.simple_multiply(b0), a0.simple_multiply(b1).add(a1.simple_multiply(b0)), a1.simple_multiply(b1))
+        for result, product in zip(evaluator.tensor(a, b), products):
+            expected = [((plain_modulus * c + ciph_modulus // 2) // ciph_modulus) % ciph_modulus for c in product.coeffs]
+            self.assertEqual(result.coeffs, expected)
+
+    @given(
+        lists(integers(min_value=0, max_value=0x3fffffff000000), min_size=64, max_size=64),
+        lists(integers(min_value=0, max_value=0x3fffffff000000), min_size=64, max_size=64),
+    )
+    def test_rns_square_is_exact(self, m1, m2):
+        degree = 64
+        params = BFVParameters(degree, 256, 0x3fffffff000001)
+        evaluator = BFVEvaluator(params)
+        a = Ciphertext(Polynomial(degree, m1), Polynomial(degree, m2))
+        self.assertEqual([c.coeffs for c in evaluator.tensor(a)], [c.coeffs for c in evaluator.tensor(a, a)])
+
 class TestCKKSEvaluator(unittest.TestCase):
     def setUp(self):
         self.params = BFVParameters(5, 60, 73)
@@ -163,5 +196,48 @@ class TestCKKSEvaluator(unittest.TestCase):
         print(f"{m1} * {m2} = {decrypted.poly} (answer: {answer})")
         self.assertEqual(str(decrypted.poly), str(answer))
 
+    def test_tensor_and_square(self):
+        degree = 16
+        modulus = 1 << 600
+        rng = random.Random(19)
+        (a0, a1, b0, b1) = [Polynomial(degree, [rng.randrange(modulus) for _ in range(degree)]) for _ in range(4)]
+        ct1 = Ciphertext(a0, a1, 1 << 30, modulus)
+        ct2 = Ciphertext(b0, b1, 1 << 30, modulus)
+        expected = [a0.simple_multiply(b0), a0.simple_multiply(b1).add(a1.simple_multiply(b0)), a1.simple_multiply(b1)]
+        expected = [c.mod_small(modulus).coeffs for c in expected]
+        for prime_size in (59, None):
+            params = CKKSParameters(degree, modulus, 1 << 1200, 1 << 30, prime_size=prime_size)
+            evaluator = CKKSEvaluator(params)
+            self.assertEqual([c.coeffs for c in evaluator.tensor(ct1, ct2)], expected)
+            self.assertEqual([c.coeffs for c in evaluator.tensor(ct1)], [c.coeffs for c in evaluator.tensor(ct1, ct1)])
+
+    def test_rotate_conjugate_and_relinearize(self):
+        degree = 16
+        rng = random.Random(23)
+        message = [complex(rng.random(), rng.random()) for _ in range(degree // 2)]
+        for (prime_size, num_digits) in itertools.product((59, None), (None, 3)):
+            params = CKKSParameters(degree, 1 << 600, 1 << 1200, 1 << 30, prime_size=prime_size,
+                                    num_digits=num_digits)
+            key_generator = CKKSKeyGenerator(params)
+            encoder = CKKSEncoder(params)
+            encryptor = CKKSEncryptor(params, key_generator.public_key)
+            decryptor = CKKSDecryptor(params, key_generator.secret_key)
+            evaluator = CKKSEvaluator(params)
+            ct = encryptor.encrypt(encoder.encode(message, 1 << 30))
+
+            def check(ciphertext, expected):
+                decoded = encoder.decode(decryptor.decrypt(ciphertext))
+                self.assertTrue(all(abs(d - e) < 1e-4 for d, e in zip(decoded, expected)))
+
+            rotations = [1, 3, 7]
+            rot_keys = key_generator.generate_rot_keys(rotations, num_workers=1)
+            rotated = evaluator.rotate_many(ct, rotations, rot_keys)
+            for rotation in rotations:
+                single = evaluator.rotate(ct, rotation, rot_keys[rotation])
+                self.assertEqual(str(rotated[rotation]), str(single))
+                check(single, message[rotation:] + message[:rotation])
+            check(evaluator.conjugate(ct, key_generator.generate_conj_key()), [m.conjugate() for m in message])
+            check(evaluator.square(ct, key_generator.relin_key), [m * m for m in message])
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
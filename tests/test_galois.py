@@ -0,0 +1,62 @@
+"""Tests for galois.py."""
+import unittest
+import numpy as np
+from util.math.context_registry import get_ntt_context
+from util.math.crt import CRTContext
+from util.math.galois import conjugation_element, galois_element, get_galois_tables
+from util.ntt_polynomial import NTTPolynomial
+from util.polynomial import Polynomial
+from hypothesis import given
+from hypothesis.strategies import lists, integers
+
+class TestGalois(unittest.TestCase):
+    def setUp(self):
+        self.degree = 16
+        self.crt = CRTContext(3, 59, self.degree)
+
+    def naive_automorphism(self, coeffs, galois_elt):
+        result = [0] * self.degree
+        for i, c in enumerate(coeffs):
+            index = i * galois_elt % (2 * self.degree)
+            if index < self.degree:
+                result[index] = c
+            else:
+                result[index - self.degree] = -c
+        return result
+
+    @given(lists(integers(min_value=-(1 << 100), max_value=1 << 100), min_size=16, max_size=16),
+           integers(min_value=0, max_value=15))
+    def test_automorphism(self, coeffs, k):
+        galois_elt = 2 * k + 1
+        poly = Polynomial(self.degree, coeffs)
+        expected = self.naive_automorphism(coeffs, galois_elt)
+        self.assertEqual(poly.automorphism(galois_elt).coeffs, expected)
+        residues = self.crt.to_rns(coeffs)
+        self.assertEqual(self.crt.from_rns(self.crt.rns_automorphism(residues, galois_elt), centered=True), expected)
+        ntt_form = NTTPolynomial.from_polynomial(poly, self.crt)
+        self.assertEqual(ntt_form.automorphism(galois_elt).to_polynomial().coeffs, expected)
+
+    def test_rotation_elements(self):
+        poly = Polynomial(self.degree, list(range(self.degree)))
+        self.assertEqual(poly.rotate(3).coeffs, self.naive_automorphism(poly.coeffs, 5 ** 3))
+        self.assertEqual(poly.rotate(3).rotate(-3).coeffs, poly.coeffs)
+        self.assertEqual(poly.conjugate().coeffs, self.naive_automorphism(poly.coeffs, conjugation_element(self.degree)))
+        self.assertEqual(galois_element(self.degree // 2, self.degree), 1)
+
+    def test_tables_are_shared(self):
+        tables = get_galois_tables(self.degree, 5)
+        self.assertIs(get_galois_tables(self.degree, 5 + 2 * self.degree), tables)
+        self.assertFalse(tables.ntt_index.flags.writeable)
+        self.assertEqual(sorted(tables.ntt_index.tolist()), list(range(self.degree)))
+
+    def test_ntt_permutation(self):
+        ntt = get_ntt_context(self.degree, self.crt.primes[0])
+        values = np.arange(self.degree, dtype=np.uint64)
+        tables = get_galois_tables(self.degree, 7)
+        expected = self.naive_automorphism(values.tolist(), 7)
+        transformed = ntt.negacyclic_fwd_array(values)
+        result = ntt.negacyclic_inv_array(tables.apply_ntt(transformed))
+        self.assertEqual(result.tolist(), [c % self.crt.primes[0] for c in expected])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+"""Tests for key_generator.py."""
+import unittest
+from unittest import mock
+from ckks.key_generator import CKKSKeyGenerator
+from ckks.parameters import CKKSParameters
+from util.crypto.secret_key import SecretKey
+from util.polynomial import Polynomial
+from util.random_sampling import sample_hamming_weight_vector, sample_uniform
+from hypothesis import given, settings
+from hypothesis.strategies import integers
+
+class TestKeyGenerator(unittest.TestCase):
+    def setUp(self):
+        self.degree = 16
+        self.big_modulus = 1 << 1200
+        self.params = CKKSParameters(self.degree, 1 << 600, self.big_modulus, 1 << 30, prime_size=None)
+
+    @settings(deadline=None)
+    @given(integers(min_value=2, max_value=1 << 2400), integers(min_value=0, max_value=16))
+    def test_secret_key_multiply(self, modulus, weight):
+        secret_key = SecretKey(Polynomial(self.degree, sample_hamming_weight_vector(self.degree, weight)))
+        poly = Polynomial(self.degree, sample_uniform(0, modulus, self.degree))
+        expected = secret_key.s.simple_multiply(poly, modulus).mod(modulus).coeffs
+        with mock.patch('util.crypto.secret_key.SECRET_NTT_MIN_DEGREE', self.degree):
+            self.assertIsNotNone(secret_key.multiply_crt(modulus))
+            self.assertEqual(secret_key.multiply(poly, modulus).coeffs, expected)
+        self.assertIsNone(secret_key.multiply_crt(modulus))
+        self.assertEqual(secret_key.multiply(poly, modulus).coeffs, expected)
+
+    def check_rot_key(self, secret_key, rot_key):
+        # sw0 + sw1 * s = e + big_modulus * rotate(s) (mod big_modulus^2), with a ternary error e.
+        mod_squared = self.big_modulus ** 2
+        key = rot_key.key.unpack()
+        error = key.p0.add(key.p1.simple_multiply(secret_key.s, mod_squared), mod_squared) \
+            .subtract(secret_key.s.rotate(rot_key.rotation).scalar_multiply(self.big_modulus), mod_squared) \
+            .mod_small(mod_squared)
+        self.assertTrue(all(abs(c) <= 1 for c in error.coeffs))
+
+    def test_generate_rot_keys(self):
+        with mock.patch('util.crypto.secret_key.SECRET_NTT_MIN_DEGREE', self.degree):
+            key_generator = CKKSKeyGenerator(self.params)
+            for num_workers in (1, 2):
+                rot_keys = key_generator.generate_rot_keys([1, 2, 5, 2], num_workers=num_workers)
+                self.assertEqual(sorted(rot_keys), [1, 2, 5])
+                for rotation, rot_key in rot_keys.items():
+                    self.assertEqual(rot_key.rotation, rotation)
+                    self.check_rot_key(key_generator.secret_key, rot_key)
+        worker_generator = CKKSKeyGenerator.from_secret_key(self.params, key_generator.secret_key)
+        self.check_rot_key(key_generator.secret_key, worker_generator.generate_rot_key(3))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+"""Tests for multiply_tuner.py."""
+import json
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+from util.math.crt import CRTContext
+from util.multiply_tuner import MultiplyTuner, autotune_enabled
+from util.polynomial import Polynomial
+from util.random_sampling import sample_triangle, sample_uniform
+
+class TestMultiplyTuner(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache_path = os.path.join(self.directory.name, 'tuning.json')
+        self.degree = 64
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_strategies_agree(self):
+        prime = CRTContext(1, 40, self.degree).primes[0]
+        dense = Polynomial(self.degree, sample_uniform(0, prime, self.degree))
+        sparse = Polynomial(self.degree, sample_triangle(self.degree))
+        expected = dense.simple_multiply(sparse, prime).coeffs
+        for strategy in ('schoolbook', 'ternary', 'ntt', 'aux_ntt', 'kronecker', 'fft'):
+            self.assertEqual(dense.multiply(sparse, prime, strategy=strategy).coeffs, expected, strategy)
+
+    def test_product_kind(self):
+        tuner = MultiplyTuner(self.cache_path)
+        prime = CRTContext(1, 40, self.degree).primes[0]
+        dense = Polynomial(self.degree, sample_uniform(0, prime, self.degree))
+        sparse = Polynomial(self.degree, [1] + [0] * (self.degree - 1))
+        key, strategies = tuner.product_kind(dense, sparse, prime)
+        self.assertEqual(key, '64/64/mod/ternary/prime')
+        self.assertEqual(set(strategies), {'schoolbook', 'ternary', 'ntt', 'aux_ntt', 'kronecker', 'fft'})
+        key, strategies = tuner.product_kind(dense, dense, None)
+        self.assertEqual(key, '64/64/int/dense/any')
+        self.assertEqual(set(strategies), {'schoolbook', 'kronecker', 'fft'})
+
+    def test_table_is_cached(self):
+        tuner = MultiplyTuner(self.cache_path)
+        poly = Polynomial(self.degree, sample_uniform(0, 50000, self.degree))
+        strategy = tuner.choose(poly, poly, 50000)
+        with open(self.cache_path) as f:
+            self.assertEqual(json.load(f)['entries'], {'64/16/mod/dense/any': strategy})
+        self.assertEqual(MultiplyTuner(self.cache_path).choose(poly, poly, 50000), strategy)
+
+        with open(self.cache_path, 'w') as f:
+            json.dump({'version': 1, 'entries': {'64/16/mod/dense/any': 'fft'}}, f)
+        self.assertEqual(MultiplyTuner(self.cache_path).choose(poly, poly, 50000), 'fft')
+        tuner.clear()
+        self.assertEqual(MultiplyTuner(self.cache_path).load(), {})
+
+    def test_calibration_runs_outside_lock(self):
+        tuner = MultiplyTuner(self.cache_path)
+        poly = Polynomial(self.degree, sample_uniform(0, 50000, self.degree))
+        acquired = []
+
+        def calibrate(*args):
+            # Another thread can use the tuner while this one calibrates.
+            thread = threading.Thread(target=lambda: acquired.append(tuner.lock.acquire(timeout=5)) or tuner.lock.release())
+            thread.start()
+            thread.join()
+            return 'kronecker'
+
+        with mock.patch.object(tuner, 'calibrate', side_effect=calibrate):
+            self.assertEqual(tuner.choose(poly, poly, 50000), 'kronecker')
+        self.assertEqual(acquired, [True])
+
+    def test_autotune_is_opt_in(self):
+        with mock.patch.dict(os.environ):
+            os.environ.pop('FHE_PY_AUTOTUNE', None)
+            self.assertFalse(autotune_enabled())
+            os.environ['FHE_PY_AUTOTUNE'] = '1'
+            self.assertTrue(autotune_enabled())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+"""Tests for ntt.py."""
+import unittest
+from util.math.crt import CRTContext
+from util.math.ntt import NTTContext, NumpyNTTContext
+from hypothesis import given, settings
+from hypothesis.strategies import lists, integers
+
+class TestNumpyNTT(unittest.TestCase):
+    def setUp(self):
+        self.poly_degree = 64
+        self.crt = CRTContext(2, 59, self.poly_degree)
+        self.reference = [NTTContext(self.poly_degree, p) for p in self.crt.primes]
+
+    def test_crt_uses_numpy_engine(self):
+        for ntt in self.crt.ntts:
+            self.assertIsInstance(ntt, NumpyNTTContext)
+
+    @given(lists(integers(min_value=-(1 << 120), max_value=1 << 120), min_size=64, max_size=64))
+    def test_ftt_fwd_matches_reference(self, coeffs):
+        for ntt, reference in zip(self.crt.ntts, self.reference):
+            self.assertEqual(ntt.ftt_fwd(coeffs), reference.ftt_fwd(coeffs))
+
+    @given(lists(integers(min_value=0, max_value=(1 << 118)), min_size=64, max_size=64))
+    def test_ftt_inv_matches_reference(self, values):
+        for ntt, reference in zip(self.crt.ntts, self.reference):
+            self.assertEqual(ntt.ftt_inv(values), reference.ftt_inv(values))
+
+    @settings(max_examples=20)
+    @given(lists(integers(min_value=-10000, max_value=10000), min_size=64, max_size=64))
+    def test_round_trip(self, coeffs):
+        for ntt in self.crt.ntts:
+            prime = ntt.coeff_modulus
+            self.assertEqual(ntt.ftt_inv(ntt.ftt_fwd(coeffs)), [c % prime for c in coeffs])
+
+class TestNegacyclicNTT(unittest.TestCase):
+    def setUp(self):
+        self.poly_degree = 32
+        self.crt = CRTContext(2, 59, self.poly_degree)
+        self.reference = [NTTContext(self.poly_degree, p) for p in self.crt.primes]
+
+    def test_evaluation_points(self):
+        ntt = self.reference[0]
+        prime = ntt.coeff_modulus
+        coeffs = list(range(1, self.poly_degree + 1))
+        values = ntt.negacyclic_fwd(coeffs)
+        psi = ntt.roots_of_unity[1]
+        for i in range(self.poly_degree):
+            point = pow(psi, 2 * ntt.reversed_bits[i] + 1, prime)
+            expected = sum(c * pow(point, j, prime) for j, c in enumerate(coeffs)) % prime
+            self.assertEqual(values[i], expected)
+
+    @given(
+        lists(integers(min_value=-(1 << 100), max_value=1 << 100), min_size=32, max_size=32),
+        lists(integers(min_value=-(1 << 100), max_value=1 << 100), min_size=32, max_size=32)
+    )
+    def test_multiply_matches_ftt(self, coeffs1, coeffs2):
+        for ntt, reference in zip(self.crt.ntts, self.reference):
+            a = reference.ftt_fwd(coeffs1)
+            b = reference.ftt_fwd(coeffs2)
+            expected = reference.ftt_inv([a[i] * b[i] for i in range(self.poly_degree)])
+            self.assertEqual(reference.negacyclic_multiply(coeffs1, coeffs2), expected)
+            self.assertEqual(ntt.negacyclic_multiply(coeffs1, coeffs2), expected)
+
+    @given(lists(integers(min_value=-(1 << 100), max_value=1 << 100), min_size=32, max_size=32))
+    def test_numpy_matches_reference(self, coeffs):
+        for ntt, reference in zip(self.crt.ntts, self.reference):
+            values = reference.negacyclic_fwd(coeffs)
+            self.assertEqual(ntt.negacyclic_fwd(coeffs), values)
+            self.assertEqual(ntt.negacyclic_inv(values), reference.negacyclic_inv(values))
+            self.assertEqual(reference.negacyclic_inv(values), [c % ntt.coeff_modulus for c in coeffs])
+
+    @given(lists(integers(min_value=-(1 << 100), max_value=1 << 100), min_size=32, max_size=32))
+    def test_four_step_matches_merged(self, coeffs):
+        for ntt in self.crt.ntts:
+            four_step = NumpyNTTContext(self.poly_degree, ntt.coeff_modulus,
+                                        root_of_unity=ntt.roots_of_unity[1], four_step=True)
+            self.assertEqual(four_step.four_step_shape, (4, 8))
+            values = ntt.negacyclic_fwd(coeffs)
+            self.assertEqual(four_step.negacyclic_fwd(coeffs), values)
+            self.assertEqual(four_step.negacyclic_inv(values), ntt.negacyclic_inv(values))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,41 @@
+"""Tests for ntt_polynomial.py."""
+import unittest
+from util.crypto.public_key import PublicKey
+from util.crypto.secret_key import SecretKey
+from util.math.crt import CRTContext
+from util.ntt_polynomial import NTTPolynomial
+from util.polynomial import Polynomial
+from hypothesis import given
+from hypothesis.strategies import lists, integers
+
+class TestNTTPolynomial(unittest.TestCase):
+    def setUp(self):
+        self.poly_degree = 16
+        self.crt = CRTContext(3, 59, self.poly_degree)
+
+    @given(lists(integers(min_value=-(1 << 150), max_value=1 << 150), min_size=16, max_size=16))
+    def test_round_trip(self, coeffs):
+        poly = NTTPolynomial.from_polynomial(Polynomial(self.poly_degree, coeffs), self.crt)
+        self.assertEqual(poly.to_polynomial().coeffs, coeffs)
+
+    @given(
+        lists(integers(min_value=-(1 << 60), max_value=1 << 60), min_size=16, max_size=16),
+        lists(integers(min_value=-(1 << 60), max_value=1 << 60), min_size=16, max_size=16),
+        lists(integers(min_value=-(1 << 60), max_value=1 << 60), min_size=16, max_size=16)
+    )
+    def test_arithmetic(self, coeffs1, coeffs2, coeffs3):
+        (poly1, poly2, poly3) = [Polynomial(self.poly_degree, c) for c in (coeffs1, coeffs2, coeffs3)]
+        (a, b, c) = [NTTPolynomial.from_polynomial(p, self.crt) for p in (poly1, poly2, poly3)]
+        expected = poly1.simple_multiply(poly2).add(poly3).subtract(poly1)
+        self.assertEqual(a.multiply(b).add(c).subtract(a).to_polynomial().coeffs, expected.coeffs)
+
+    def test_keys_cache_ntt_form(self):
+        poly = Polynomial(self.poly_degree, list(range(self.poly_degree)))
+        public_key = PublicKey(poly, poly)
+        self.assertIs(public_key.to_ntt(self.crt), public_key.to_ntt(self.crt))
+        secret_key = SecretKey(poly)
+        self.assertIs(secret_key.to_ntt(self.crt), secret_key.to_ntt(self.crt))
+        self.assertEqual(secret_key.to_ntt(self.crt).to_polynomial().coeffs, poly.coeffs)
+
+if __name__ == '__main__':
+    unittest.main()
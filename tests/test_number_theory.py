@@ -0,0 +1,34 @@
+"""Tests for number_theory.py."""
+import unittest
+import sympy
+from util.math import number_theory as nbtheory
+from hypothesis import given
+from hypothesis.strategies import integers
+
+class TestNumberTheory(unittest.TestCase):
+    def test_is_prime_small(self):
+        for number in range(2000):
+            self.assertEqual(nbtheory.is_prime(number), sympy.isprime(number), number)
+
+    @given(integers(min_value=1 << 40, max_value=1 << 64))
+    def test_is_prime_64_bit(self, number):
+        self.assertEqual(nbtheory.is_prime(number), sympy.isprime(number))
+
+    def test_is_prime_strong_pseudoprimes(self):
+        # Strong pseudoprimes to several small bases.
+        for number in [3215031751, 2152302898747, 3474749660383, 341550071728321, 3825123056546413051]:
+            self.assertFalse(nbtheory.is_prime(number))
+
+    def test_root_of_unity(self):
+        for order, modulus in [(16, 17), (512, 7681), (2048, 1152921504606877697), (6, 7)]:
+            root = nbtheory.root_of_unity(order, modulus)
+            self.assertEqual(pow(root, order, modulus), 1)
+            for factor in nbtheory.prime_factors(order):
+                self.assertNotEqual(pow(root, order // factor, modulus), 1)
+
+    def test_root_of_unity_invalid_order(self):
+        with self.assertRaises(ValueError):
+            nbtheory.root_of_unity(16, 19)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+"""Tests for packed_polynomial.py."""
+import unittest
+from util.crypto.ciphertext import Ciphertext
+from util.crypto.public_key import PublicKey
+from util.crypto.rotation_key import RotationKey
+from util.packed_polynomial import PackedPolynomial
+from util.polynomial import Polynomial
+from hypothesis import given
+from hypothesis.strategies import lists, integers
+
+class TestPackedPolynomial(unittest.TestCase):
+    def setUp(self):
+        self.poly_degree = 16
+
+    @given(lists(integers(min_value=-(1 << 200), max_value=1 << 200), min_size=16, max_size=16),
+           integers(min_value=2, max_value=1 << 130))
+    def test_round_trip(self, coeffs, modulus):
+        poly = Polynomial(self.poly_degree, coeffs)
+        packed = PackedPolynomial.from_polynomial(poly, modulus)
+        self.assertEqual(packed.nbytes, self.poly_degree * packed.width)
+        self.assertEqual(packed.to_polynomial().coeffs, poly.mod(modulus).coeffs)
+        self.assertEqual(packed.to_polynomial(centered=True).coeffs, poly.mod_small(modulus).coeffs)
+
+    def test_width(self):
+        self.assertEqual(PackedPolynomial.packed_width(2), 1)
+        self.assertEqual(PackedPolynomial.packed_width(1 << 64), 8)
+        self.assertEqual(PackedPolynomial.packed_width((1 << 64) + 1), 9)
+
+    def test_containers(self):
+        modulus = 1 << 100
+        c0 = Polynomial(self.poly_degree, list(range(-8, 8)))
+        c1 = Polynomial(self.poly_degree, [3 ** i for i in range(self.poly_degree)])
+        ciphertext = Ciphertext(c0, c1, 1 << 30, modulus)
+        packed = ciphertext.pack()
+        self.assertIsInstance(packed.c0, PackedPolynomial)
+        self.assertEqual(packed.unpack().c0.coeffs, c0.mod(modulus).coeffs)
+        self.assertEqual(packed.unpack().c1.coeffs, c1.coeffs)
+        self.assertEqual(packed.scaling_factor, 1 << 30)
+
+        key = RotationKey(3, PublicKey(c0, c1)).pack(modulus)
+        self.assertEqual(key.rotation, 3)
+        self.assertEqual(key.unpack().key.p0.coeffs, c0.mod(modulus).coeffs)
+
+        for obj in (ciphertext, packed, key, key.key, c0, packed.c0):
+            self.assertFalse(hasattr(obj, '__dict__'))
+
+if __name__ == '__main__':
+    unittest.main()
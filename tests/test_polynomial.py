@@ -25,6 +25,34 @@ class TestPolynomial(unittest.TestCase):
         poly_diff = self.poly1.subtract(self.poly2, self.coeff_modulus)
         self.assertEqual(poly_diff.coeffs, [59, 59, 0, 2, 57])
 
+    def test_in_place(self):
+        poly = Polynomial(self.degree, list(self.poly1.coeffs))
+        coeffs = poly.coeffs
+        self.assertIs(poly.iadd(self.poly2, self.coeff_modulus), poly)
+        self.assertEqual(poly.coeffs, [1, 3, 8, 8, 1])
+        poly.isub(self.poly2, self.coeff_modulus).imul_scalar(2)
+        self.assertEqual(poly.coeffs, [0, 2, 8, 10, 118])
+        poly.ireduce(self.coeff_modulus, centered=True)
+        self.assertEqual(poly.coeffs, [0, 2, 8, 10, -2])
+        self.assertIs(poly.coeffs, coeffs)
+
+    @given(lists(integers(min_value=-(1 << 200), max_value=1 << 200), min_size=8, max_size=8),
+           lists(integers(min_value=-(1 << 200), max_value=1 << 200), min_size=8, max_size=8),
+           integers(min_value=2, max_value=1 << 120), integers(min_value=1, max_value=1 << 80))
+    def test_fused(self, coeffs1, coeffs2, coeff_modulus, divisor):
+        (poly1, poly2) = (Polynomial(8, coeffs1), Polynomial(8, coeffs2))
+        self.assertEqual(poly1.add_reduce(poly2, coeff_modulus).coeffs, poly1.add(poly2, coeff_modulus).coeffs)
+        self.assertEqual(poly1.add_reduce(poly2, coeff_modulus, centered=True).coeffs,
+                         poly1.add(poly2, coeff_modulus).mod_small(coeff_modulus).coeffs)
+        self.assertEqual(poly1.multiply_add(poly2, poly1, coeff_modulus).coeffs,
+                         poly1.multiply(poly2, coeff_modulus).add(poly1, coeff_modulus).coeffs)
+        center_modulus = coeff_modulus * divisor
+        self.assertEqual(poly1.divide_round_reduce(divisor, coeff_modulus, poly2, center_modulus).coeffs,
+                         poly1.mod_small(center_modulus).divide(divisor).add(poly2, coeff_modulus)
+                         .mod_small(coeff_modulus).coeffs)
+        self.assertEqual(poly1.divide_round_reduce(divisor, coeff_modulus).coeffs,
+                         poly1.divide(divisor).mod_small(coeff_modulus).coeffs)
+
     def test_multiply(self):
         poly1 = Polynomial(4, [0, 1, 4, 5])
         poly2 = Polynomial(4, [1, 2, 4, 3])
@@ -94,6 +122,42 @@ class TestPolynomial(unittest.TestCase):
             f"Error: The simple multiplication result is incorrect!!!: {coeffs1} * {coeffs2} = {result.coeffs} != {expected_coeffs}"
         )
 
+    @given(
+        lists(integers(min_value=-(1 << 70), max_value=1 << 70), min_size=128, max_size=128),
+        lists(integers(min_value=-(1 << 70), max_value=1 << 70), min_size=128, max_size=128),
+        integers(min_value=2, max_value=1 << 64)
+    )
+    def test_aux_multiply(self, coeffs1, coeffs2, coeff_modulus):
+        poly1 = Polynomial(128, coeffs1)
+        poly2 = Polynomial(128, coeffs2)
+        self.assertEqual(poly1.aux_multiply(poly2, coeff_modulus).coeffs,
+                         poly1.simple_multiply(poly2, coeff_modulus).coeffs)
+
+    @given(
+        lists(integers(min_value=-(1 << 70), max_value=1 << 70), min_size=24, max_size=24),
+        lists(integers(min_value=-(1 << 70), max_value=1 << 70), min_size=24, max_size=24),
+        integers(min_value=2, max_value=1 << 200)
+    )
+    def test_kronecker_multiply(self, coeffs1, coeffs2, coeff_modulus):
+        poly1 = Polynomial(24, coeffs1)
+        poly2 = Polynomial(24, coeffs2)
+        self.assertTrue(poly1.supports_kronecker_multiply(poly2))
+        self.assertEqual(poly1.multiply(poly2, coeff_modulus).coeffs,
+                         poly1.simple_multiply(poly2, coeff_modulus).coeffs)
+        self.assertEqual(poly1.kronecker_multiply(poly2).coeffs, poly1.simple_multiply(poly2).coeffs)
+
+    @given(
+        lists(integers(min_value=-(1 << 130), max_value=1 << 130), min_size=40, max_size=40),
+        lists(integers(min_value=-(1 << 130), max_value=1 << 130), min_size=40, max_size=40),
+        integers(min_value=2, max_value=1 << 64)
+    )
+    def test_exact_fft_multiply(self, coeffs1, coeffs2, coeff_modulus):
+        poly1 = Polynomial(40, coeffs1)
+        poly2 = Polynomial(40, coeffs2)
+        self.assertEqual(poly1.exact_fft_multiply(poly2).coeffs, poly1.simple_multiply(poly2).coeffs)
+        self.assertEqual(poly1.exact_fft_multiply(poly2, coeff_modulus).coeffs,
+                         poly1.simple_multiply(poly2, coeff_modulus).coeffs)
+
     def test_base_decompose(self):
         base = ceil(sqrt(self.coeff_modulus))
         num_levels = floor(log(self.coeff_modulus, base)) + 1
@@ -101,6 +165,14 @@ class TestPolynomial(unittest.TestCase):
         self.assertEqual(poly_decomposed[0].coeffs, [0, 1, 4, 5, 3])
         self.assertEqual(poly_decomposed[1].coeffs, [0, 0, 0, 0, 7])
         
+    @given(lists(integers(min_value=-(1 << 99), max_value=(1 << 99) - 1), min_size=5, max_size=5))
+    def test_signed_decompose(self, coeffs):
+        base = 1 << 40
+        digits = Polynomial(self.degree, coeffs).signed_decompose(base, 3)
+        self.assertTrue(all(-base // 2 <= c < base // 2 for d in digits for c in d.coeffs))
+        self.assertEqual([sum(d.coeffs[i] * base ** j for j, d in enumerate(digits)) for i in range(self.degree)],
+                         coeffs)
+
     def test_rotate(self):
         poly1 = Polynomial(4, [0, 1, 4, 59])
         poly_rot = poly1.rotate(3)
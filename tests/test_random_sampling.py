@@ -0,0 +1,63 @@
+"""Tests for random_sampling.py."""
+import unittest
+import numpy as np
+from util.math.crt import CRTContext
+from util.random_sampling import RandomSource, gaussian_cdt, sample_discrete_gaussian, \
+    sample_hamming_weight_vector, sample_triangle, sample_uniform, sample_uniform_rns, uniform_array
+from hypothesis import given
+from hypothesis.strategies import integers
+
+NUM_SAMPLES = 1 << 14
+
+class TestRandomSampling(unittest.TestCase):
+    def test_seeded_source_is_reproducible(self):
+        self.assertEqual(sample_uniform(0, 1000, 64, RandomSource(b'seed')),
+                         sample_uniform(0, 1000, 64, RandomSource(b'seed')))
+        self.assertNotEqual(sample_uniform(0, 1000, 64, RandomSource(b'seed')),
+                            sample_uniform(0, 1000, 64, RandomSource(b'other')))
+
+    @given(integers(min_value=-(1 << 80), max_value=1 << 80), integers(min_value=1, max_value=1 << 2400))
+    def test_uniform_range(self, low, width):
+        samples = sample_uniform(low, low + width, 64)
+        self.assertEqual(len(samples), 64)
+        self.assertTrue(all(type(s) == int and low <= s < low + width for s in samples))
+
+    def test_uniform_distribution(self):
+        for bound in (3, 1 << 40, (1 << 64) - 1):
+            samples = uniform_array(bound, NUM_SAMPLES)
+            self.assertTrue((samples < np.uint64(bound)).all())
+            self.assertAlmostEqual(float(samples.mean()) / (bound - 1), 0.5, delta=0.02)
+        bits = np.array(sample_uniform(0, (1 << 130) + 1, NUM_SAMPLES), dtype=object)
+        self.assertAlmostEqual(float(bits.mean()) / (1 << 130), 0.5, delta=0.02)
+
+    def test_small_distributions(self):
+        triangle = np.array(sample_triangle(NUM_SAMPLES))
+        self.assertEqual(set(triangle.tolist()), {-1, 0, 1})
+        self.assertAlmostEqual((triangle == 0).mean(), 0.5, delta=0.02)
+        self.assertAlmostEqual((triangle == 1).mean(), 0.25, delta=0.02)
+
+        hamming = np.array(sample_hamming_weight_vector(256, 64))
+        self.assertEqual(np.count_nonzero(hamming), 64)
+        self.assertTrue(set(hamming.tolist()) <= {-1, 0, 1})
+
+        gaussian = np.array(sample_discrete_gaussian(NUM_SAMPLES, sigma=3.2))
+        self.assertAlmostEqual(gaussian.mean(), 0, delta=0.1)
+        self.assertAlmostEqual(gaussian.std(), 3.2, delta=0.1)
+        (table, tail) = gaussian_cdt(3.2)
+        self.assertEqual(len(table), 2 * tail + 1)
+        self.assertTrue((np.diff(table.astype(np.float64)) >= 0).all())
+
+    def test_rns_form(self):
+        crt = CRTContext(3, 59, 64)
+        for sampler, args in ((sample_triangle, (64,)), (sample_hamming_weight_vector, (64, 16)),
+                              (sample_discrete_gaussian, (64,))):
+            samples = sampler(*args, source=RandomSource(b'rns'))
+            residues = sampler(*args, source=RandomSource(b'rns'), crt=crt)
+            self.assertEqual(residues.shape, (3, 64))
+            self.assertEqual(crt.from_rns(residues, centered=True), samples)
+        residues = sample_uniform_rns(crt, 64)
+        self.assertEqual(residues.shape, (3, 64))
+        self.assertTrue((residues < crt.primes_u64).all())
+
+if __name__ == '__main__':
+    unittest.main()
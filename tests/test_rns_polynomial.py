@@ -0,0 +1,48 @@
+"""Tests for rns_polynomial.py."""
+import unittest
+from util.math.crt import CRTContext
+from util.ntt_polynomial import NTTPolynomial
+from util.polynomial import Polynomial
+from util.rns_polynomial import RNSPolynomial
+from hypothesis import given
+from hypothesis.strategies import lists, integers
+
+class TestRNSPolynomial(unittest.TestCase):
+    def setUp(self):
+        self.poly_degree = 16
+        self.crt = CRTContext(3, 59, self.poly_degree)
+
+    @given(lists(integers(min_value=-(1 << 170), max_value=1 << 170), min_size=16, max_size=16))
+    def test_to_rns(self, coeffs):
+        residues = self.crt.to_rns(coeffs)
+        for i, prime in enumerate(self.crt.primes):
+            self.assertEqual(residues[i].tolist(), [c % prime for c in coeffs])
+
+    @given(lists(integers(min_value=-(1 << 150), max_value=1 << 150), min_size=16, max_size=16))
+    def test_round_trip(self, coeffs):
+        poly = RNSPolynomial.from_polynomial(Polynomial(self.poly_degree, coeffs), self.crt)
+        self.assertEqual(poly.to_polynomial().coeffs, coeffs)
+        self.assertEqual(RNSPolynomial.from_ntt(poly.to_ntt()).to_polynomial().coeffs, coeffs)
+
+    @given(
+        lists(integers(min_value=-(1 << 60), max_value=1 << 60), min_size=16, max_size=16),
+        lists(integers(min_value=-(1 << 60), max_value=1 << 60), min_size=16, max_size=16),
+        lists(integers(min_value=-(1 << 60), max_value=1 << 60), min_size=16, max_size=16),
+        integers(min_value=-(1 << 40), max_value=1 << 40)
+    )
+    def test_arithmetic(self, coeffs1, coeffs2, coeffs3, scalar):
+        (poly1, poly2, poly3) = [Polynomial(self.poly_degree, c) for c in (coeffs1, coeffs2, coeffs3)]
+        (a, b, c) = [RNSPolynomial.from_polynomial(p, self.crt) for p in (poly1, poly2, poly3)]
+        expected = poly1.simple_multiply(poly2).add(poly3.scalar_multiply(scalar)).subtract(poly1)
+        result = a.multiply(b).add(c.scalar_multiply(scalar)).subtract(a)
+        self.assertEqual(result.to_polynomial().coeffs, expected.coeffs)
+        self.assertEqual(a.negate().to_polynomial().coeffs, [-x for x in coeffs1])
+
+    def test_matches_ntt_form(self):
+        poly = Polynomial(self.poly_degree, list(range(-8, 8)))
+        rns = RNSPolynomial.from_polynomial(poly, self.crt)
+        ntt = NTTPolynomial.from_polynomial(poly, self.crt)
+        self.assertEqual(rns.to_ntt().values.tolist(), ntt.values.tolist())
+
+if __name__ == '__main__':
+    unittest.main()
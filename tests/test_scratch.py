@@ -0,0 +1,60 @@
+"""Tests for scratch.py."""
+import pickle
+import threading
+import tracemalloc
+import unittest
+import numpy as np
+from util.math.crt import CRTContext
+from util.math.scratch import ScratchPool
+from util.polynomial import Polynomial
+
+class TestScratchPool(unittest.TestCase):
+    def test_reuse(self):
+        pool = ScratchPool()
+        array = pool.get('a', (2, 8))
+        self.assertEqual((array.shape, array.dtype), ((2, 8), np.uint64))
+        self.assertIs(pool.get('a', (2, 8)), array)
+        self.assertIsNot(pool.get('b', (2, 8)), array)
+        self.assertIsNot(pool.get('a', 16), array)
+        self.assertEqual(pool.stats(), {'arrays': 3, 'nbytes': 3 * 128})
+        pool.clear()
+        self.assertEqual(pool.stats()['arrays'], 0)
+
+    def test_threads_get_own_arrays(self):
+        pool = ScratchPool()
+        main = pool.get('a', 8)
+        arrays = []
+        thread = threading.Thread(target=lambda: arrays.append(pool.get('a', 8)))
+        thread.start()
+        thread.join()
+        self.assertIsNot(arrays[0], main)
+        self.assertEqual(pickle.loads(pickle.dumps(pool)).stats()['arrays'], 0)
+
+    def test_memory_stays_flat(self):
+        degree = 1024
+        crt = CRTContext(4, 59, degree)
+        rng = np.random.default_rng(5)
+        (a, b) = [Polynomial(degree, [int(c) for c in rng.integers(-(1 << 60), 1 << 60, degree)]) for _ in range(2)]
+        a.crt_multiply(b, crt)
+        crt.tensor((a.coeffs, b.coeffs), (b.coeffs, a.coeffs))
+        arrays = crt.scratch.stats()['arrays']
+
+        def loop(iterations):
+            tracemalloc.reset_peak()
+            for _ in range(iterations):
+                a.crt_multiply(b, crt)
+                crt.tensor((a.coeffs, b.coeffs), (b.coeffs, a.coeffs))
+            return tracemalloc.get_traced_memory()[1]
+
+        tracemalloc.start()
+        try:
+            single_peak = loop(1)
+            loop_peak = loop(20)
+        finally:
+            tracemalloc.stop()
+        self.assertEqual(crt.scratch.stats()['arrays'], arrays)
+        # The loop peaks no higher than a single iteration, give or take noise.
+        self.assertLess(loop_peak, single_peak + (1 << 18))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+"""Tests for ternary_polynomial.py."""
+import unittest
+from util.polynomial import Polynomial
+from util.ternary_polynomial import TernaryPolynomial
+from hypothesis import given
+from hypothesis.strategies import lists, integers, sampled_from
+
+class TestTernaryPolynomial(unittest.TestCase):
+    def test_from_polynomial(self):
+        poly = Polynomial(4, [1, 0, -1, 1])
+        ternary = TernaryPolynomial.from_polynomial(poly)
+        self.assertEqual(ternary.plus, [0, 3])
+        self.assertEqual(ternary.minus, [2])
+        self.assertEqual(ternary.hamming_weight, 3)
+        self.assertEqual(ternary.to_polynomial().coeffs, poly.coeffs)
+        self.assertFalse(TernaryPolynomial.is_ternary(Polynomial(2, [2, 0])))
+        with self.assertRaises(ValueError):
+            TernaryPolynomial.from_polynomial(Polynomial(2, [2, 0]))
+
+    @given(
+        lists(integers(min_value=-(1 << 70), max_value=1 << 70), min_size=32, max_size=32),
+        lists(sampled_from([-1, 0, 1]), min_size=32, max_size=32),
+        sampled_from([None, 73, 50000, 0x3fffffff000001, (1 << 61) - 1, 1 << 200])
+    )
+    def test_multiply(self, coeffs, ternary_coeffs, coeff_modulus):
+        dense = Polynomial(32, coeffs)
+        sparse = Polynomial(32, ternary_coeffs)
+        product = TernaryPolynomial.from_polynomial(sparse).multiply(dense, coeff_modulus)
+        self.assertEqual(product.coeffs, dense.simple_multiply(sparse, coeff_modulus).coeffs)
+
+    @given(
+        lists(integers(min_value=0, max_value=(1 << 120) - 1), min_size=256, max_size=256),
+        lists(sampled_from([-1, 0, 1]), min_size=256, max_size=256)
+    )
+    def test_polynomial_multiply_uses_either_path(self, coeffs, ternary_coeffs):
+        dense = Polynomial(256, coeffs)
+        sparse = Polynomial(256, ternary_coeffs)
+        expected = TernaryPolynomial.from_polynomial(sparse).multiply(dense, 1 << 120)
+        self.assertEqual(dense.multiply(sparse, 1 << 120).coeffs, expected.coeffs)
+        self.assertEqual(sparse.multiply(dense, 1 << 120).coeffs, expected.coeffs)
+        self.assertEqual(dense.aux_multiply(sparse, 1 << 120).coeffs, expected.coeffs)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+"""Tests for zero_pool.py."""
+import itertools
+import threading
+import unittest
+from bfv.decryptor import BFVDecryptor
+from bfv.encryptor import BFVEncryptor
+from bfv.key_generator import BFVKeyGenerator
+from bfv.parameters import BFVParameters
+from ckks.decryptor import CKKSDecryptor
+from ckks.encryptor import CKKSEncryptor
+from ckks.key_generator import CKKSKeyGenerator
+from ckks.parameters import CKKSParameters
+from util.crypto.plaintext import Plaintext
+from util.crypto.zero_pool import ZeroEncryptionPool
+from util.polynomial import Polynomial
+
+class TestZeroEncryptionPool(unittest.TestCase):
+    def setUp(self):
+        self.counter = itertools.count()
+        self.gate = threading.Event()
+        self.gate.set()
+        self.entered = threading.Semaphore(0)
+
+    def encrypt_zero(self):
+        self.entered.release()
+        self.gate.wait()
+        return next(self.counter)
+
+    def test_watermarks(self):
+        with ZeroEncryptionPool(self.encrypt_zero, low_watermark=2, high_watermark=5) as pool:
+            self.assertTrue(pool.wait_until_full(timeout=10))
+            self.assertEqual(pool.size, 5)
+            # Takes down to the low watermark do not trigger a refill.
+            self.gate.clear()
+            taken = [pool.take() for _ in range(3)]
+            self.assertEqual(taken, [0, 1, 2])
+            self.assertEqual(pool.stats()['refills'], 1)
+            pool.take()
+            self.assertEqual(pool.stats()['refills'], 2)
+            self.gate.set()
+            self.assertTrue(pool.wait_until_full(timeout=10))
+            stats = pool.stats()
+            self.assertEqual((stats['size'], stats['produced'], stats['taken'], stats['starved']), (5, 9, 4, 0))
+
+    def test_starvation(self):
+        self.gate.clear()
+        pool = ZeroEncryptionPool(self.encrypt_zero, low_watermark=1, high_watermark=2, num_workers=2)
+        try:
+            results = []
+            thread = threading.Thread(target=lambda: results.append(pool.take()))
+            thread.start()
+            # Both workers and the starved take are blocked in encrypt_zero.
+            for _ in range(3):
+                self.assertTrue(self.entered.acquire(timeout=10))
+            self.gate.set()
+            thread.join()
+            self.assertEqual(len(results), 1)
+            self.assertEqual(pool.stats()['starved'], 1)
+        finally:
+            pool.close()
+        self.assertEqual(pool.workers, [])
+
+    def test_each_zero_is_taken_once(self):
+        with ZeroEncryptionPool(self.encrypt_zero, low_watermark=4, high_watermark=8, num_workers=3) as pool:
+            taken = []
+            threads = [threading.Thread(target=lambda: taken.extend(pool.take() for _ in range(50)))
+                       for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(len(set(taken)), 200)
+
+    def test_encryptors(self):
+        degree = 16
+        params = CKKSParameters(degree, 1 << 600, 1 << 1200, 1 << 30)
+        key_generator = CKKSKeyGenerator(params)
+        encryptor = CKKSEncryptor(params, key_generator.public_key)
+        decryptor = CKKSDecryptor(params, key_generator.secret_key)
+        message = Polynomial(degree, [i << 30 for i in range(degree)])
+        pool = encryptor.start_zero_pool(low_watermark=1, high_watermark=3)
+        try:
+            self.assertTrue(pool.wait_until_full(timeout=60))
+            ciphertext = encryptor.encrypt(Plaintext(message, 1 << 30))
+            self.assertEqual(pool.stats()['taken'], 1)
+        finally:
+            encryptor.stop_zero_pool()
+        decrypted = decryptor.decrypt(ciphertext).poly
+        self.assertTrue(all(abs(d - m) < 1 << 20 for d, m in zip(decrypted.coeffs, message.coeffs)))
+
+        pool = encryptor.start_zero_pool(low_watermark=1, high_watermark=2)
+        try:
+            self.assertTrue(pool.wait_until_full(timeout=60))
+            # A stocked encryption under the old modulus, as left by a raise_modulus
+            # racing with a worker, is discarded and counted.
+            encryptor.coeff_modulus = 1 << 601
+            ciphertext = encryptor.encrypt(Plaintext(message, 1 << 30))
+            self.assertEqual(ciphertext.modulus, 1 << 601)
+            self.assertEqual((pool.stats()['taken'], pool.stats()['discarded']), (1, 1))
+        finally:
+            encryptor.stop_zero_pool()
+        zero = encryptor.encrypt_with_pk(Plaintext(message, 1 << 30), 1 << 600)
+        self.assertEqual(zero.modulus, 1 << 600)
+        self.assertTrue(all(abs(c) <= 1 << 599 for c in zero.c0.coeffs + zero.c1.coeffs))
+
+        params = BFVParameters(degree, 256, 0x3fffffff000001)
+        key_generator = BFVKeyGenerator(params)
+        encryptor = BFVEncryptor(params, key_generator.public_key)
+        decryptor = BFVDecryptor(params, key_generator.secret_key)
+        message = Polynomial(degree, list(range(degree)))
+        pool = encryptor.start_zero_pool(low_watermark=1, high_watermark=3)
+        try:
+            self.assertTrue(pool.wait_until_full(timeout=60))
+            self.assertEqual(str(decryptor.decrypt(encryptor.encrypt(Plaintext(message))).poly), str(message))
+            self.assertEqual(pool.stats()['taken'], 1)
+        finally:
+            encryptor.stop_zero_pool()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,12 @@
+from __future__ import annotations
+
 from typing import Optional
+from util.packed_polynomial import pack, unpack
 from util.polynomial import Polynomial
 
 class Ciphertext:
+    __slots__ = ('c0', 'c1', 'scaling_factor', 'modulus')
+
     def __init__(self, c0: Polynomial, c1: Polynomial, scaling_factor: Optional[float] = None, modulus: Optional[int] = None):
         """Initializes a ciphertext object with two polynomials and scaling factor.
         c0: First element polynomial
@@ -12,6 +17,18 @@ class Ciphertext:
         self.c1 = c1
         self.scaling_factor = scaling_factor
         self.modulus = modulus
+
+    def pack(self, modulus: Optional[int] = None) -> Ciphertext:
+        """Returns a copy with both polynomials stored as PackedPolynomials.
+        modulus: Modulus to pack with, if the ciphertext does not carry one
+        """
+        modulus = self.modulus or modulus
+        return Ciphertext(pack(self.c0, modulus), pack(self.c1, modulus), self.scaling_factor, self.modulus)
+
+    def unpack(self) -> Ciphertext:
+        """Returns a copy with both polynomials unpacked, ready for evaluation.
+        """
+        return Ciphertext(unpack(self.c0), unpack(self.c1), self.scaling_factor, self.modulus)
         
     def __str__(self):
         return 'C0: %s\nC1: %s' %(str(self.c0), str(self.c1))
\ No newline at end of file
@@ -2,6 +2,8 @@ from typing import Optional
 from util.polynomial import Polynomial
 
 class Plaintext:
+    __slots__ = ('poly', 'scaling_factor')
+
     def __init__(self, poly: Polynomial, scaling_factor: Optional[float] = None):
         """Initializes a plaintext object with a polynomial and scaling factor.
         poly: Plaintext Polynomial
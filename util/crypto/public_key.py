@@ -1,6 +1,14 @@
+from __future__ import annotations
+
+from typing import Tuple
+from util.math.crt import CRTContext
+from util.ntt_polynomial import NTTPolynomial
+from util.packed_polynomial import pack, unpack
 from util.polynomial import Polynomial
 
 class PublicKey:
+    __slots__ = ('p0', 'p1', 'ntt_forms')
+
     def __init__(self, p0: Polynomial, p1: Polynomial):
         """Initializes a public key object with two polynomials.
         p0: First element polynomial
@@ -8,6 +16,27 @@ class PublicKey:
         """
         self.p0 = p0
         self.p1 = p1
+        self.ntt_forms = {}
+
+    def to_ntt(self, crt: CRTContext) -> Tuple[NTTPolynomial, NTTPolynomial]:
+        """Returns (p0, p1) in NTT form over crt.
+        The transform is computed once per CRT context and reused afterwards.
+        """
+        if crt not in self.ntt_forms:
+            self.ntt_forms[crt] = (NTTPolynomial.from_polynomial(unpack(self.p0), crt),
+                                   NTTPolynomial.from_polynomial(unpack(self.p1), crt))
+        return self.ntt_forms[crt]
+
+    def pack(self, modulus: int) -> PublicKey:
+        """Returns a copy with both polynomials stored as PackedPolynomials modulo the given modulus.
+        Cached NTT forms are not copied.
+        """
+        return PublicKey(pack(self.p0, modulus), pack(self.p1, modulus))
+
+    def unpack(self) -> PublicKey:
+        """Returns a copy with both polynomials unpacked.
+        """
+        return PublicKey(unpack(self.p0), unpack(self.p1))
         
     def __str__(self):
-        return 'P0: %s\nP1: %s' %(str(self.p0), str(self.p1))
\ No newline at end of file
+        return 'P0: %s\nP1: %s' %(str(self.p0), str(self.p1))
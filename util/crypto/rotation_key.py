@@ -1,10 +1,22 @@
+from __future__ import annotations
+
 from util.crypto.public_key import PublicKey
 
 
 class RotationKey:
+    __slots__ = ('rotation', 'key')
+
     def __init__(self, r: int, key: PublicKey):
         self.rotation = r
         self.key = key
+
+    def pack(self, modulus: int) -> RotationKey:
+        """Returns a copy with the switching key packed modulo the given modulus.
+        """
+        return RotationKey(self.rotation, self.key.pack(modulus))
+
+    def unpack(self) -> RotationKey:
+        return RotationKey(self.rotation, self.key.unpack())
         
     def __str__(self):
         return 'Rotation: %d\n%s' %(self.rotation, str(self.key))
\ No newline at end of file
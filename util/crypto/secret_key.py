@@ -1,9 +1,58 @@
-from util.polynomial import Polynomial
+from util.math.crt import CRTContext, get_crt_context
+from util.ntt_polynomial import NTTPolynomial
+from util.polynomial import AUX_PRIME_SIZE, Polynomial
+
+# From this degree on, products with a ternary secret key are faster in NTT
+# form, with the transform of s cached, than with sparse shift-and-add, which
+# takes time d * h, or with Polynomial.aux_multiply.
+SECRET_NTT_MIN_DEGREE = 8192
 
 
 class SecretKey:
+    __slots__ = ('s', 'ntt_forms', 'hamming_weight')
+
     def __init__(self, s: Polynomial):
         self.s = s
+        self.ntt_forms = {}
+        self.hamming_weight = None
+        if s.is_ternary():
+            self.hamming_weight = sum(1 for c in s.coeffs if c)
+
+    def to_ntt(self, crt: CRTContext) -> NTTPolynomial:
+        """Returns s in NTT form over crt.
+        The transform is computed once per CRT context and reused afterwards.
+        """
+        if crt not in self.ntt_forms:
+            self.ntt_forms[crt] = NTTPolynomial.from_polynomial(self.s, crt)
+        return self.ntt_forms[crt]
+
+    def multiply_crt(self, coeff_modulus: int) -> CRTContext:
+        """Returns the CRT context multiply uses for products modulo coeff_modulus, or None.
+
+        For a ternary s of Hamming weight h and a polynomial centered modulo q,
+        every coefficient of the exact product is at most h * q/2 in absolute
+        value, so about half as many primes as for a product of two dense
+        polynomials suffice.
+        """
+        degree = self.s.degree
+        if self.hamming_weight is None or degree < SECRET_NTT_MIN_DEGREE or degree & (degree - 1):
+            return None
+        bound = max(self.hamming_weight, 1) * (coeff_modulus // 2 + 1)
+        num_primes = (bound.bit_length() + 1) // AUX_PRIME_SIZE + 1
+        return get_crt_context(num_primes, AUX_PRIME_SIZE, degree)
+
+    def multiply(self, poly: Polynomial, coeff_modulus: int) -> Polynomial:
+        """Computes s * poly modulo coeff_modulus, with coefficients in [0, coeff_modulus).
+
+        At large degrees, the product is computed in NTT form over auxiliary
+        primes, with the transform of s computed once and cached. Otherwise,
+        Polynomial.multiply picks the fastest strategy.
+        """
+        crt = self.multiply_crt(coeff_modulus)
+        if crt is None:
+            return self.s.multiply(poly, coeff_modulus)
+        prod = self.to_ntt(crt).multiply(NTTPolynomial.from_polynomial(poly.mod_small(coeff_modulus), crt))
+        return prod.to_polynomial().mod(coeff_modulus)
         
     def __str__(self):
-        return str(self.s)
\ No newline at end of file
+        return str(self.s)
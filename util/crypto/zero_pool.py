@@ -0,0 +1,187 @@
+"""A pool of public-key encryptions of zero, computed ahead of time.
+
+Public-key encryption of m is an encryption of zero plus m: the products of
+the public key with fresh randomness, which dominate its cost, do not depend
+on the message. Background threads keep a stock of encryptions of zero, so
+that encrypt only adds the (scaled) plaintext to one of them.
+
+Each encryption of zero is handed out once, since reusing its randomness
+would leak the difference of two messages.
+"""
+from __future__ import annotations
+
+import collections
+import threading
+import time
+from typing import Callable
+
+from util.crypto.ciphertext import Ciphertext
+
+class ZeroEncryptionPool:
+    """A stock of encryptions of zero refilled by background threads.
+
+    Workers fill the pool up to the high watermark, then sleep until takes
+    bring it below the low watermark. A take from an empty pool is counted as
+    starved and encrypts zero synchronously instead of waiting.
+
+    Attributes:
+        encrypt_zero (callable): Returns a fresh encryption of zero.
+        low_watermark (int): Size below which workers start refilling.
+        high_watermark (int): Size up to which workers refill.
+        num_workers (int): Number of background threads.
+    """
+
+    def __init__(self, encrypt_zero: Callable[[], Ciphertext], low_watermark: int = 4, high_watermark: int = 16,
+                 num_workers: int = 1, start: bool = True):
+        assert 0 <= low_watermark < high_watermark, \
+            'Low watermark %d must be below high watermark %d' % (low_watermark, high_watermark)
+        assert num_workers > 0, 'A zero pool needs at least one worker'
+        self.encrypt_zero = encrypt_zero
+        self.low_watermark = low_watermark
+        self.high_watermark = high_watermark
+        self.num_workers = num_workers
+        self.ciphertexts = collections.deque()
+        self.condition = threading.Condition()
+        # Whether the pool is being refilled, from below the low watermark up to the high one.
+        self.refilling = True
+        self.pending = 0
+        self.closed = False
+        self.workers = []
+        self.produced = 0
+        self.taken = 0
+        self.starved = 0
+        self.discarded = 0
+        self.refills = 1
+        self.produce_seconds = 0.0
+        if start:
+            self.start()
+
+    def start(self):
+        """Starts the worker threads.
+        """
+        with self.condition:
+            if self.workers:
+                return
+            self.closed = False
+            for i in range(self.num_workers):
+                worker = threading.Thread(target=self.run, name='zero-pool-%d' % i, daemon=True)
+                self.workers.append(worker)
+                worker.start()
+
+    def run(self):
+        """Body of a worker thread.
+        """
+        while True:
+            with self.condition:
+                while not self.closed and not (self.refilling and self.size + self.pending < self.high_watermark):
+                    self.condition.wait()
+                if self.closed:
+                    return
+                self.pending += 1
+            start = time.perf_counter()
+            try:
+                ciphertext = self.encrypt_zero()
+            except BaseException:
+                with self.condition:
+                    self.pending -= 1
+                raise
+            elapsed = time.perf_counter() - start
+            with self.condition:
+                self.pending -= 1
+                self.produced += 1
+                self.produce_seconds += elapsed
+                self.ciphertexts.append(ciphertext)
+                if self.size >= self.high_watermark:
+                    self.refilling = False
+                self.condition.notify_all()
+
+    def take(self) -> Ciphertext:
+        """Returns an encryption of zero that no one else will get.
+
+        Never blocks on the workers: if the pool is empty, zero is encrypted
+        in the calling thread.
+        """
+        with self.condition:
+            ciphertext = self.ciphertexts.popleft() if self.ciphertexts else None
+            if ciphertext is None:
+                self.starved += 1
+            else:
+                self.taken += 1
+            if not self.refilling and self.size < self.low_watermark:
+                self.refilling = True
+                self.refills += 1
+                self.condition.notify_all()
+        if ciphertext is None:
+            ciphertext = self.encrypt_zero()
+        return ciphertext
+
+    def discard(self, ciphertext: Ciphertext):
+        """Records that a taken ciphertext was unusable, e.g. stale after a
+        change of modulus, so that the caller encrypted zero synchronously.
+        """
+        with self.condition:
+            self.discarded += 1
+
+    def wait_until_full(self, timeout: float = None) -> bool:
+        """Blocks until the pool reaches the high watermark, for warming it up.
+
+        Returns:
+            Whether the pool is full, False if the timeout expired first.
+        """
+        with self.condition:
+            return self.condition.wait_for(lambda: self.closed or self.size >= self.high_watermark, timeout)
+
+    def clear(self):
+        """Discards every stocked encryption, e.g. after the keys or modulus changed.
+
+        Encryptions in progress are still added when done, so callers should
+        check that taken ciphertexts match their current parameters.
+        """
+        with self.condition:
+            self.ciphertexts.clear()
+            if not self.refilling:
+                self.refilling = True
+                self.refills += 1
+            self.condition.notify_all()
+
+    def close(self):
+        """Stops the worker threads and waits for them to finish.
+        """
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+            workers = self.workers
+            self.workers = []
+        for worker in workers:
+            worker.join()
+
+    def __enter__(self) -> ZeroEncryptionPool:
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def size(self) -> int:
+        return len(self.ciphertexts)
+
+    def stats(self) -> dict:
+        """Returns counters of the pool.
+
+        taken counts takes served from the stock and starved those that found
+        it empty. discarded counts taken ciphertexts the caller could not use
+        and replaced by a synchronous encryption, so (starved + discarded) /
+        (taken + starved) is the share of encryptions that paid the full
+        latency. refills counts the times the pool dropped below the low
+        watermark.
+        """
+        with self.condition:
+            return {
+                'size': self.size,
+                'produced': self.produced,
+                'taken': self.taken,
+                'starved': self.starved,
+                'discarded': self.discarded,
+                'refills': self.refills,
+                'mean_produce_seconds': self.produce_seconds / self.produced if self.produced else 0.0,
+            }
@@ -0,0 +1,336 @@
+"""Arithmetic backends for polynomials and transform contexts.
+
+A backend implements the coefficient-wise arithmetic of Polynomial (addition,
+products by scalars modulo q, reduction and rounding) and builds the NTT and
+FFT contexts handed out by the context registry, which in turn decide how
+CRTContext converts to and from residues. Two backends are provided:
+
+    reference: pure Python loops over lists of integers, as in the original
+        code. It is slow but easy to check, and serves as the ground truth.
+    numpy: the same operations on NumPy arrays, whenever the coefficients fit
+        in machine words, with the vectorized NTT and FFT contexts.
+
+Both give identical results on integer coefficients, so one can be tested
+against the other. The backend is chosen with the FHE_PY_BACKEND environment
+variable (default numpy), or at runtime with set_backend and use_backend.
+"""
+
+import contextlib
+import os
+
+import numpy as np
+
+from util.math.modular import MAX_MODULUS_BITS, mul_shoup
+from util.math.ntt import FFTContext, NTTContext, NumpyFFTContext, NumpyNTTContext
+
+BACKEND_ENV = 'FHE_PY_BACKEND'
+DEFAULT_BACKEND = 'numpy'
+
+# Coefficients below this bound in absolute value take the int64 paths, so
+# that sums and differences of two of them cannot overflow.
+INT64_COEFF_BOUND = 1 << 61
+# Floats below this bound may stem from integers converted to float64 without
+# rounding, so rounding them in NumPy matches rounding in Python.
+FLOAT_EXACT_BOUND = 1 << 53
+
+class ReferenceBackend:
+    """Pure Python arithmetic on lists of coefficients.
+
+    Attributes:
+        name (str): Name of the backend.
+        vectorized (bool): Whether CRTContexts built under this backend use
+            vectorized residue conversions.
+        multiply_strategy (str): Strategy of Polynomial.multiply to use, or
+            None to let the auto-tuner choose.
+    """
+    name = 'reference'
+    vectorized = False
+    multiply_strategy = 'schoolbook'
+
+    def add(self, a, b, modulus=None):
+        new_coeffs = [a[i] + b[i] for i in range(len(a))]
+        if modulus:
+            new_coeffs = [c % modulus for c in new_coeffs]
+        return new_coeffs
+
+    def subtract(self, a, b, modulus=None):
+        return self.add(a, [-x for x in b], modulus)
+
+    def scalar_multiply(self, a, scalar, modulus=None):
+        if modulus:
+            return [(c * scalar) % modulus for c in a]
+        return [c * scalar for c in a]
+
+    def divide(self, a, scalar, modulus=None):
+        new_coeffs = [c // scalar for c in a]
+        if modulus:
+            new_coeffs = [c % modulus for c in new_coeffs]
+        return new_coeffs
+
+    def mod(self, a, modulus):
+        return [c % modulus for c in a]
+
+    def mod_small(self, a, modulus):
+        half = modulus // 2
+        return [c - modulus if c > half else c for c in (c % modulus for c in a)]
+
+    def add_reduce(self, a, b, modulus, centered=False):
+        """Computes a + b (mod q) in one pass, in (-q/2, q/2] if centered, else in [0, q).
+        """
+        if not centered:
+            return [(x + y) % modulus for x, y in zip(a, b)]
+        half = modulus // 2
+        return [c - modulus if c > half else c for c in ((x + y) % modulus for x, y in zip(a, b))]
+
+    def divide_round_reduce(self, a, divisor, modulus, addend=None, center_modulus=None):
+        """Computes floor(a / divisor) + addend (mod q) in one pass, in (-q/2, q/2].
+
+        If center_modulus M is given, a is first centered modulo M, as with
+        mod_small(M).divide(divisor).add(addend, q).mod_small(q).
+        """
+        if center_modulus:
+            center_half = center_modulus // 2
+            a = (c - center_modulus if c > center_half else c for c in (c % center_modulus for c in a))
+        quotients = (c // divisor for c in a)
+        if addend is not None:
+            quotients = (c + x for c, x in zip(quotients, addend))
+        half = modulus // 2
+        return [c - modulus if c > half else c for c in (c % modulus for c in quotients)]
+
+    def round(self, a):
+        if type(a[0]) == complex:
+            return [round(c.real) for c in a]
+        return [round(c) for c in a]
+
+    def floor(self, a):
+        return [int(c) for c in a]
+
+    def ntt_context(self, poly_degree, coeff_modulus):
+        return NTTContext(poly_degree, coeff_modulus)
+
+    def fft_context(self, fft_length):
+        return FFTContext(fft_length)
+
+
+class NumpyBackend(ReferenceBackend):
+    """Vectorized arithmetic on NumPy arrays.
+
+    Integer coefficients below INT64_COEFF_BOUND, and moduli of at most
+    MAX_MODULUS_BITS bits, are processed as int64 arrays; anything else, such as
+    the products of big integers in BFV, falls back to the reference code.
+    Moduli need not be prime or odd. For big integers modulo powers of two, as
+    in CKKS, reductions and divisions become masks and shifts.
+    """
+    name = 'numpy'
+    vectorized = True
+    multiply_strategy = None
+
+    @staticmethod
+    def int64_array(coeffs):
+        """Returns coefficients as an int64 array if they are all small integers, else None.
+
+        The first coefficient is checked for a quick rejection of lists of
+        floats; the dtype NumPy infers for the whole list then rules out
+        lists mixing integers with floats or big integers.
+        """
+        if not len(coeffs) or not isinstance(coeffs[0], (int, np.integer)) or isinstance(coeffs[0], bool):
+            return None
+        values = np.array(coeffs)
+        if values.dtype.kind != 'i':
+            return None
+        values = values.astype(np.int64, copy=False)
+        if values.max() >= INT64_COEFF_BOUND or values.min() <= -INT64_COEFF_BOUND:
+            return None
+        return values
+
+    @staticmethod
+    def is_int_list(values):
+        """Checks whether every value is a Python int, for the mask and shift shortcuts.
+        """
+        return all(type(c) is int for c in values)
+
+    @staticmethod
+    def fits(modulus):
+        return modulus.bit_length() <= MAX_MODULUS_BITS
+
+    @staticmethod
+    def is_power_of_two(modulus):
+        return modulus & (modulus - 1) == 0
+
+    def add(self, a, b, modulus=None):
+        (x, y) = (self.int64_array(a), self.int64_array(b))
+        if x is None or y is None or (modulus and not self.fits(modulus)):
+            return super().add(a, b, modulus)
+        result = x + y
+        if modulus:
+            result %= modulus
+        return result.tolist()
+
+    def subtract(self, a, b, modulus=None):
+        (x, y) = (self.int64_array(a), self.int64_array(b))
+        if x is None or y is None or (modulus and not self.fits(modulus)):
+            return super().subtract(a, b, modulus)
+        result = x - y
+        if modulus:
+            result %= modulus
+        return result.tolist()
+
+    def scalar_multiply(self, a, scalar, modulus=None):
+        x = self.int64_array(a)
+        if x is None:
+            return super().scalar_multiply(a, scalar, modulus)
+        if modulus:
+            if not isinstance(scalar, (int, np.integer)) or not self.fits(modulus):
+                return super().scalar_multiply(a, scalar, modulus)
+            w = int(scalar) % modulus
+            residues = (x % modulus).astype(np.uint64)
+            return mul_shoup(residues, np.uint64(w), np.uint64((w << 64) // modulus), np.uint64(modulus)).tolist()
+        if isinstance(scalar, float):
+            # Matches Python, which converts each integer to the nearest float first.
+            return (x.astype(np.float64) * scalar).tolist()
+        if isinstance(scalar, (int, np.integer)):
+            bound = max(int(x.max()), -int(x.min()), 1)
+            if abs(int(scalar)) < (1 << 63) // bound:
+                return (x * int(scalar)).tolist()
+        return super().scalar_multiply(a, scalar, modulus)
+
+    def divide(self, a, scalar, modulus=None):
+        x = self.int64_array(a)
+        if x is None or not isinstance(scalar, (int, np.integer)) or abs(int(scalar)) >= INT64_COEFF_BOUND \
+                or (modulus and not self.fits(modulus)):
+            return super().divide(a, scalar, modulus)
+        result = x // int(scalar)
+        if modulus:
+            result %= modulus
+        return result.tolist()
+
+    def mod(self, a, modulus):
+        x = self.int64_array(a)
+        if x is None or not self.fits(modulus):
+            if self.is_power_of_two(modulus) and self.is_int_list(a):
+                mask = modulus - 1
+                return [c & mask for c in a]
+            return super().mod(a, modulus)
+        return (x % modulus).tolist()
+
+    def mod_small(self, a, modulus):
+        x = self.int64_array(a)
+        if x is None or not self.fits(modulus):
+            if self.is_power_of_two(modulus) and self.is_int_list(a):
+                (mask, half) = (modulus - 1, modulus // 2)
+                return [c - modulus if c > half else c for c in (c & mask for c in a)]
+            return super().mod_small(a, modulus)
+        result = x % modulus
+        return np.where(result > modulus // 2, result - modulus, result).tolist()
+
+    def add_reduce(self, a, b, modulus, centered=False):
+        (x, y) = (self.int64_array(a), self.int64_array(b))
+        if x is None or y is None or not self.fits(modulus):
+            if self.is_power_of_two(modulus) and self.is_int_list(a) and self.is_int_list(b):
+                mask = modulus - 1
+                sums = ((u + v) & mask for u, v in zip(a, b))
+                if not centered:
+                    return list(sums)
+                half = modulus // 2
+                return [c - modulus if c > half else c for c in sums]
+            return super().add_reduce(a, b, modulus, centered)
+        result = (x + y) % modulus
+        if centered:
+            result = np.where(result > modulus // 2, result - modulus, result)
+        return result.tolist()
+
+    def divide_round_reduce(self, a, divisor, modulus, addend=None, center_modulus=None):
+        """Computes floor(a / divisor) + addend (mod q) like the reference backend.
+
+        Centering modulo a multiple M of q * divisor moves a by a multiple of
+        M, which changes the quotient by a multiple of q, so it is skipped.
+        Divisions and reductions by powers of two become shifts and masks.
+        """
+        if (center_modulus and center_modulus % (modulus * divisor)) or not self.is_int_list(a) \
+                or (addend is not None and not self.is_int_list(addend)):
+            return super().divide_round_reduce(a, divisor, modulus, addend, center_modulus)
+        if self.is_power_of_two(divisor):
+            shift = divisor.bit_length() - 1
+            quotients = (c >> shift for c in a)
+        else:
+            quotients = (c // divisor for c in a)
+        if addend is not None:
+            quotients = (c + x for c, x in zip(quotients, addend))
+        half = modulus // 2
+        if self.is_power_of_two(modulus):
+            mask = modulus - 1
+            return [c - modulus if c > half else c for c in (c & mask for c in quotients)]
+        return [c - modulus if c > half else c for c in (c % modulus for c in quotients)]
+
+    def round(self, a):
+        if type(a[0]) == complex:
+            values = np.array(a, dtype=np.complex128).real
+        elif type(a[0]) == float:
+            values = np.array(a, dtype=np.float64)
+        else:
+            return super().round(a)
+        if not np.all(np.abs(values) < FLOAT_EXACT_BOUND):
+            return super().round(a)
+        # np.rint rounds half to even, like round.
+        return np.rint(values).astype(np.int64).tolist()
+
+    def floor(self, a):
+        if type(a[0]) != float:
+            return super().floor(a)
+        values = np.array(a, dtype=np.float64)
+        if not np.all(np.abs(values) < FLOAT_EXACT_BOUND):
+            return super().floor(a)
+        # Like int(c), this rounds towards zero.
+        return np.trunc(values).astype(np.int64).tolist()
+
+    def ntt_context(self, poly_degree, coeff_modulus):
+        if self.fits(coeff_modulus):
+            return NumpyNTTContext(poly_degree, coeff_modulus)
+        return NTTContext(poly_degree, coeff_modulus)
+
+    def fft_context(self, fft_length):
+        return NumpyFFTContext(fft_length)
+
+
+BACKENDS = {
+    'reference': ReferenceBackend(),
+    'numpy': NumpyBackend(),
+}
+
+_current = None
+
+def get_backend():
+    """Returns the backend in use, initially the one named by FHE_PY_BACKEND.
+    """
+    global _current
+    if _current is None:
+        _current = BACKENDS[os.environ.get(BACKEND_ENV, DEFAULT_BACKEND)]
+    return _current
+
+def set_backend(backend):
+    """Switches the process-wide backend.
+
+    Contexts are cached per backend, so contexts built before the switch are
+    not reused afterwards.
+
+    Args:
+        backend (str or ReferenceBackend): Name of a backend in BACKENDS, or a
+            backend instance.
+
+    Returns:
+        The previous backend.
+    """
+    global _current
+    previous = get_backend()
+    _current = BACKENDS[backend] if isinstance(backend, str) else backend
+    return previous
+
+@contextlib.contextmanager
+def use_backend(backend):
+    """Runs the body of a with statement under the given backend.
+    """
+    previous = set_backend(backend)
+    try:
+        yield get_backend()
+    finally:
+        set_backend(previous)
@@ -6,6 +6,16 @@ def reverse_bits(value: int, width: int):
     binary_val = '{:0{width}b}'.format(value, width=width)
     return int(binary_val[::-1], 2)
 
+def reversed_bits_table(length: int) -> list[int]:
+    """Returns the list whose ith member is i with its log2(length) bits reversed.
+    Built incrementally from rev(i) = rev(i >> 1) >> 1 | (i & 1) << (width - 1).
+    """
+    width = length.bit_length() - 1
+    table = [0] * length
+    for i in range(1, length):
+        table[i] = (table[i >> 1] >> 1) | ((i & 1) << (width - 1))
+    return table
+
 def bit_reverse_vec(values: list[int]):
     """Reverses the order of elements in a list.
     """
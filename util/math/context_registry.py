@@ -0,0 +1,160 @@
+"""A process-wide registry of NTT and FFT contexts.
+
+Building a context precomputes tables of roots of unity, which dominates the
+cost of a single polynomial product at small degrees. The registry builds each
+context once, freezes it so that it can be shared between threads, and hands
+out the same instance to every caller. Contexts are built by the arithmetic
+backend in use (see util.math.backend) and cached per backend.
+"""
+
+import threading
+
+import numpy as np
+
+from util.math.backend import get_backend
+from util.math.ntt import FFTContext, NTTContext
+
+def freeze(value):
+    """Makes precomputed tables read-only.
+
+    Lists become tuples and NumPy arrays are marked non-writeable, recursively.
+
+    Args:
+        value: Table to freeze.
+
+    Returns:
+        The frozen table.
+    """
+    if isinstance(value, np.ndarray):
+        value.setflags(write=False)
+        return value
+    if isinstance(value, (list, tuple)):
+        if value and isinstance(value[0], (np.ndarray, list, tuple, dict)):
+            return tuple(freeze(v) for v in value)
+        # Flat tables of numbers need no recursion.
+        return tuple(value)
+    if isinstance(value, dict):
+        return {k: freeze(v) for k, v in value.items()}
+    return value
+
+def freeze_context(context):
+    """Freezes every precomputed table held by a context in place.
+
+    Args:
+        context: NTTContext or FFTContext.
+
+    Returns:
+        The same context.
+    """
+    for name, value in vars(context).items():
+        setattr(context, name, freeze(value))
+    return context
+
+class ContextRegistry:
+    """A thread-safe cache of NTTContext and FFTContext instances.
+
+    NTT contexts are keyed by backend, degree and modulus, and FFT contexts by
+    backend and FFT length.
+    Other contexts, such as CRTContext, can be cached under their own keys with get.
+
+    Attributes:
+        hits (int): Number of lookups served from the cache.
+        misses (int): Number of lookups that built a new context.
+    """
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.contexts = {}
+        # Locks of the keys whose contexts are being built.
+        self.building = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, factory):
+        """Returns the context stored under key, building it with factory on a miss.
+
+        Contexts are built outside the registry lock, so building a large
+        context only holds up lookups of the same key, which wait for it
+        instead of building their own.
+        """
+        with self.lock:
+            context = self.contexts.get(key)
+            if context is not None:
+                self.hits += 1
+                return context
+            build_lock = self.building.setdefault(key, threading.Lock())
+        with build_lock:
+            with self.lock:
+                context = self.contexts.get(key)
+                if context is not None:
+                    self.hits += 1
+                    return context
+            try:
+                context = freeze_context(factory())
+                with self.lock:
+                    self.misses += 1
+                    # Keep the first instance, should one have been inserted meanwhile.
+                    return self.contexts.setdefault(key, context)
+            finally:
+                with self.lock:
+                    if self.building.get(key) is build_lock:
+                        del self.building[key]
+
+    def get_ntt_context(self, poly_degree: int, coeff_modulus: int) -> NTTContext:
+        """Returns the shared NTTContext for Z_q[x]/(x^d + 1).
+
+        Under the numpy backend, moduli that fit in uint64 arithmetic get the
+        vectorized NumpyNTTContext.
+
+        Args:
+            poly_degree (int): Degree d of the polynomial ring.
+            coeff_modulus (int): Coefficient modulus q.
+        """
+        backend = get_backend()
+        return self.get(('ntt', backend.name, poly_degree, coeff_modulus),
+                        lambda: backend.ntt_context(poly_degree, coeff_modulus))
+
+    def get_fft_context(self, fft_length: int) -> FFTContext:
+        """Returns the shared FFTContext for the given FFT length.
+        """
+        backend = get_backend()
+        return self.get(('fft', backend.name, fft_length), lambda: backend.fft_context(fft_length))
+
+    def evict_ntt_context(self, poly_degree: int, coeff_modulus: int) -> bool:
+        """Drops an NTTContext of the current backend from the cache. Returns whether it was present.
+        """
+        with self.lock:
+            return self.contexts.pop(('ntt', get_backend().name, poly_degree, coeff_modulus), None) is not None
+
+    def evict_fft_context(self, fft_length: int) -> bool:
+        """Drops an FFTContext of the current backend from the cache. Returns whether it was present.
+        """
+        with self.lock:
+            return self.contexts.pop(('fft', get_backend().name, fft_length), None) is not None
+
+    def clear(self):
+        """Drops every cached context and resets the counters.
+        """
+        with self.lock:
+            self.contexts.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        """Returns the hit and miss counts and the number of cached contexts.
+        """
+        with self.lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self.contexts)}
+
+
+registry = ContextRegistry()
+
+def get_ntt_context(poly_degree: int, coeff_modulus: int) -> NTTContext:
+    """Returns the process-wide NTTContext for (poly_degree, coeff_modulus).
+    """
+    return registry.get_ntt_context(poly_degree, coeff_modulus)
+
+def get_fft_context(fft_length: int) -> FFTContext:
+    """Returns the process-wide FFTContext for fft_length.
+    """
+    return registry.get_fft_context(fft_length)
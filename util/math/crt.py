@@ -1,8 +1,14 @@
 """A module to split a large number into its prime factors using the Chinese Remainder Theorem (CRT).
 """
 
+import numpy as np
 import util.math.number_theory as nbtheory
-from util.math.ntt import NTTContext
+from util.math.backend import get_backend
+from util.math.context_registry import get_ntt_context, registry
+from util.math.galois import get_galois_tables
+from util.math.modular import MAX_MODULUS_BITS, check_modulus, moduli_column, mul_mod, mul_shoup, \
+    reduce_once, shoup_column
+from util.math.scratch import ScratchPool
 
 class CRTContext:
 
@@ -14,6 +20,11 @@ class CRTContext:
         poly_degree (int): Polynomial ring degree.
         primes (list): List of primes.
         modulus (int): Large modulus, product of all primes.
+        vectorized (bool): Whether conversions to and from residues run on
+            NumPy arrays. Set under the numpy backend; otherwise they loop
+            over coefficients in Python, as in crt and reconstruct.
+        scratch (ScratchPool): Per-thread arrays of num_primes x poly_degree
+            residues for the temporaries of transforms and tensor products.
     """
 
     def __init__(self, num_primes, prime_size, poly_degree):
@@ -25,6 +36,7 @@ class CRTContext:
             poly_degree (int): Polynomial degree of ring.
         """
         self.poly_degree = poly_degree
+        self.scratch = ScratchPool()
         self.generate_primes(num_primes, prime_size, mod=2*poly_degree)
         self.generate_ntt_contexts()
 
@@ -52,11 +64,18 @@ class CRTContext:
 
     def generate_ntt_contexts(self):
         """Generates NTTContexts for each primes.
+
+        Contexts come from the process-wide registry, so CRTContexts sharing
+        primes share their tables.
         """
-        self.ntts = []
-        for prime in self.primes:
-            ntt = NTTContext(self.poly_degree, prime)
-            self.ntts.append(ntt)
+        self.ntts = [get_ntt_context(self.poly_degree, prime) for prime in self.primes]
+        # Residue arrays need primes that fit in uint64 arithmetic.
+        self.fits_uint64 = all(prime.bit_length() <= MAX_MODULUS_BITS for prime in self.primes)
+        self.vectorized = self.fits_uint64 and get_backend().vectorized
+        if self.fits_uint64:
+            self.primes_u64, self.montgomery = moduli_column(self.primes)
+            self.word_base, self.word_base_shoup = shoup_column([(1 << 32) % p for p in self.primes],
+                                                                self.primes)
 
     def precompute_crt(self):
         """Perform precomputations required for switching representations.
@@ -67,6 +86,32 @@ class CRTContext:
         for i in range(num_primes):
             self.crt_vals[i] = self.modulus // self.primes[i]
             self.crt_inv_vals[i] = nbtheory.mod_inv(self.crt_vals[i], self.primes[i])
+        if self.fits_uint64:
+            self.precompute_garner()
+
+    def precompute_garner(self):
+        """Perform precomputations for Garner's mixed-radix reconstruction.
+
+        With radices P_k = p_0 * ... * p_{k-1}, a value below the modulus is
+        written as v_0 + v_1 * P_1 + ... + v_{L-1} * P_{L-1} with digits v_k < p_k.
+        We store P_k (mod p_i) for every i > k and P_k^-1 (mod p_k), together
+        with their Shoup companions.
+        """
+        num_primes = len(self.primes)
+        radix = np.zeros((num_primes, num_primes), dtype=np.uint64)
+        radix_shoup = np.zeros((num_primes, num_primes), dtype=np.uint64)
+        inverses = [1] * num_primes
+        partial = 1
+        for k in range(num_primes):
+            inverses[k] = nbtheory.mod_inv(partial % self.primes[k], self.primes[k])
+            for i in range(k + 1, num_primes):
+                w = partial % self.primes[i]
+                radix[k, i] = w
+                radix_shoup[k, i] = (w << 64) // self.primes[i]
+            partial *= self.primes[k]
+        self.garner_radix = radix
+        self.garner_radix_shoup = radix_shoup
+        self.garner_inverses, self.garner_inverses_shoup = shoup_column(inverses, self.primes)
 
     def crt(self, value):
         """Transform value to CRT representation.
@@ -92,4 +137,291 @@ class CRTContext:
             regular_rep_val += intermed_val
             regular_rep_val %= self.modulus
 
-        return regular_rep_val
\ No newline at end of file
+        return regular_rep_val
+
+    def to_rns(self, coeffs, out=None):
+        """Reduces integer coefficients modulo every prime at once.
+
+        Small coefficients are reduced directly as int64. Larger ones are split
+        into 32-bit words, and the residues are accumulated with Horner's rule
+        over the words, for all primes and coefficients in one array operation
+        per word. Without vectorization, each coefficient is reduced in Python.
+
+        Args:
+            coeffs (list): Integer coefficients of a polynomial.
+            out (np.ndarray): uint64 array of shape (num_primes, len(coeffs))
+                to write the residues to. A new array if None.
+
+        Returns:
+            Array of shape (num_primes, len(coeffs)) of residues.
+        """
+        assert self.fits_uint64, "RNS form requires primes below 2^62"
+        coeffs = [int(c) for c in coeffs]
+        if out is None:
+            out = np.empty((len(self.primes), len(coeffs)), dtype=np.uint64)
+        if not self.vectorized:
+            out[...] = [[c % p for c in coeffs] for p in self.primes]
+            return out
+        max_bits = max(abs(c).bit_length() for c in coeffs)
+        if max_bits < 63:
+            signed = np.array(coeffs, dtype=np.int64)
+            # Residues are non-negative, so their int64 and uint64 bits agree.
+            np.mod(signed, self.primes_u64.astype(np.int64), out=out.view(np.int64))
+            return out
+
+        num_words = (max_bits + 31) // 32
+        buffer = b''.join(abs(c).to_bytes(4 * num_words, 'little') for c in coeffs)
+        words = np.frombuffer(buffer, dtype='<u4').reshape(len(coeffs), num_words).astype(np.uint64)
+        q = self.primes_u64
+        residues = np.zeros((len(self.primes), len(coeffs)), dtype=np.uint64)
+        for i in range(num_words - 1, -1, -1):
+            residues = mul_shoup(residues, self.word_base, self.word_base_shoup, q)
+            residues = reduce_once(residues + words[:, i] % q, q)
+
+        negative = np.array([c < 0 for c in coeffs])
+        out[...] = np.where(negative, reduce_once(q - residues, q), residues)
+        return out
+
+    def reconstruct_batch(self, residues, centered=False):
+        """Reconstructs many values at once from their CRT representation.
+
+        Uses Garner's algorithm: the mixed-radix digits of every value are
+        computed limb by limb with vectorized modular arithmetic, and each
+        value is assembled from its digits with a single Horner pass over
+        Python integers. No intermediate result is reduced modulo the full
+        modulus.
+
+        Args:
+            residues (np.ndarray): Array of shape (num_primes, n) with the
+                residues of n values modulo each prime.
+            centered (bool): Whether to return values in (-modulus/2, modulus/2],
+                like Polynomial.mod_small, instead of [0, modulus).
+
+        Returns:
+            List of the n reconstructed values.
+        """
+        assert len(residues) == len(self.primes)
+        if not self.vectorized:
+            values = [self.reconstruct(vals) for vals in np.asarray(residues).T.tolist()]
+        else:
+            values = self.garner_digits(residues)
+            result = values[-1].astype(object)
+            for k in range(len(self.primes) - 2, -1, -1):
+                result = result * self.primes[k] + values[k].astype(object)
+            values = result.tolist()
+        if centered:
+            half = self.modulus // 2
+            values = [v - self.modulus if v > half else v for v in values]
+        return values
+
+    def garner_digits(self, residues):
+        """Computes the mixed-radix digits of values given by their residues.
+
+        Args:
+            residues (np.ndarray): Array of shape (num_primes, n) of residues.
+
+        Returns:
+            Array of shape (num_primes, n), where row k holds the digits v_k < p_k.
+        """
+        num_primes = len(self.primes)
+        q = self.primes_u64
+        digits = np.empty_like(residues)
+        # Row i of partial holds v_0 + ... + v_{k-1} * P_{k-1} (mod p_i) before step k.
+        partial = self.scratch.get('garner_partial', residues.shape)
+        partial.fill(0)
+        for k in range(num_primes):
+            diff = reduce_once(residues[k] + (q[k] - partial[k]), q[k])
+            digits[k] = mul_shoup(diff, self.garner_inverses[k], self.garner_inverses_shoup[k], q[k])
+            if k + 1 < num_primes:
+                w = self.garner_radix[k, k + 1:].reshape(-1, 1)
+                w_shoup = self.garner_radix_shoup[k, k + 1:].reshape(-1, 1)
+                term = mul_shoup(digits[k], w, w_shoup, q[k + 1:])
+                partial[k + 1:] = reduce_once(partial[k + 1:] + term, q[k + 1:])
+        return digits
+
+    def base_convert(self, residues, modulus):
+        """Computes values modulo another modulus directly from their residues.
+
+        The conversion is exact: the mixed-radix digits of each value are
+        evaluated modulo the new modulus with Horner's rule, so no big integer
+        is formed.
+
+        Args:
+            residues (np.ndarray): Array of shape (num_primes, n) of residues of
+                values in [0, modulus of the context).
+            modulus (int): Target modulus below 2^62.
+
+        Returns:
+            Array of n residues in [0, modulus).
+        """
+        check_modulus(modulus)
+        digits = self.garner_digits(residues)
+        m = np.uint64(modulus)
+        radices, radices_shoup = shoup_column([p % modulus for p in self.primes], [modulus] * len(self.primes))
+        result = digits[-1] % m
+        for k in range(len(self.primes) - 2, -1, -1):
+            result = mul_shoup(result, radices[k], radices_shoup[k], m)
+            result = reduce_once(result + digits[k] % m, m)
+        return result
+
+    def from_rns(self, residues, centered=False):
+        """Reconstructs integer coefficients from their residues.
+
+        Args:
+            residues (np.ndarray): Array of shape (num_primes, n) of residues.
+            centered (bool): Whether to return coefficients in (-modulus/2, modulus/2].
+
+        Returns:
+            List of coefficients in [0, modulus), or centered if requested.
+        """
+        return self.reconstruct_batch(residues, centered=centered)
+
+    def rns_ntt_fwd(self, residues, out=None):
+        """Runs the negacyclic NTT on every limb of a residue array.
+
+        Each limb is transformed into its row of out, which may be residues
+        itself. A new array if None.
+        """
+        out = np.empty_like(residues) if out is None else out
+        for i, ntt in enumerate(self.ntts):
+            ntt.negacyclic_fwd_array(residues[i], out=out[i])
+        return out
+
+    def rns_ntt_inv(self, values, out=None):
+        """Runs the inverse negacyclic NTT on every limb of a residue array.
+
+        Each limb is transformed into its row of out, which may be values
+        itself. A new array if None.
+        """
+        out = np.empty_like(values) if out is None else out
+        for i, ntt in enumerate(self.ntts):
+            ntt.negacyclic_inv_array(values[i], out=out[i])
+        return out
+
+    def ntt_fwd(self, coeffs, out=None):
+        """Transforms integer coefficients to negacyclic NTT form modulo every prime.
+
+        Args:
+            coeffs (list): Integer coefficients of a polynomial.
+            out (np.ndarray): uint64 array of shape (num_primes, poly_degree)
+                to write the result to. A new array if None.
+
+        Returns:
+            Array of shape (num_primes, poly_degree) with the NTT of the
+            coefficients modulo each prime, in bit-reversed order.
+        """
+        residues = self.to_rns(coeffs, out=out)
+        return self.rns_ntt_fwd(residues, out=residues)
+
+    def ntt_inv(self, values, centered=False):
+        """Transforms NTT-form residues back to integer coefficients.
+
+        Args:
+            values (np.ndarray): Array of shape (num_primes, poly_degree) from ntt_fwd.
+            centered (bool): Whether to return coefficients in (-modulus/2, modulus/2].
+
+        Returns:
+            List of coefficients in [0, modulus), or centered if requested.
+        """
+        residues = self.rns_ntt_inv(values, out=self.scratch.get('ntt_inv', values.shape))
+        return self.from_rns(residues, centered=centered)
+
+    def tensor(self, a, b=None):
+        """Computes the tensor product of two pairs of polynomials with the NTT.
+
+        For a = (a0, a1) and b = (b0, b1), computes a0 * b0, a0 * b1 + a1 * b0
+        and a1 * b1 modulo every prime. Each input is transformed once, and the
+        middle term comes from the Karatsuba identity
+        (a0 + a1) * (b0 + b1) - a0 * b0 - a1 * b1, so only three pointwise
+        products are needed. If b is None, computes a0^2, 2 * a0 * a1 and a1^2
+        from two transforms. All transforms run in place in arrays of the
+        scratch pool.
+
+        Args:
+            a (tuple): Coefficient lists of the first pair.
+            b (tuple): Coefficient lists of the second pair, or None to square a.
+
+        Returns:
+            Array of shape (3, num_primes, poly_degree) with the residues of
+            the three products in coefficient form. It belongs to the scratch
+            pool, so it is only valid until the next call to tensor on the
+            same thread.
+        """
+        shape = (len(self.primes), self.poly_degree)
+        q = self.primes_u64
+        inputs = self.scratch.get('tensor_inputs', (4,) + shape)
+        products = self.scratch.get('tensor_products', (3,) + shape)
+        operands = tuple(a) if b is None else tuple(a) + tuple(b)
+        for i, coeffs in enumerate(operands):
+            self.ntt_fwd(coeffs, out=inputs[i])
+        if b is None:
+            (a0, a1) = inputs[:2]
+            products[0] = self.rns_multiply(a0, a0)
+            products[2] = self.rns_multiply(a1, a1)
+            cross = self.rns_multiply(a0, a1)
+            products[1] = reduce_once(cross + cross, q)
+        else:
+            (a0, a1, b0, b1) = inputs
+            products[0] = self.rns_multiply(a0, b0)
+            products[2] = self.rns_multiply(a1, b1)
+            # rns_multiply takes a first factor in [0, 4q), so a0 + a1 needs no reduction.
+            np.add(a0, a1, out=a0)
+            np.add(b0, b1, out=b0)
+            np.minimum(b0, b0 - q, out=b0)
+            cross = self.rns_multiply(a0, b0)
+            products[1] = self.rns_subtract(cross, self.rns_add(products[0], products[2]))
+        for product in products:
+            self.rns_ntt_inv(product, out=product)
+        return products
+
+    def rns_automorphism(self, residues, galois_elt):
+        """Applies the automorphism x -> x^k of Z[x]/(x^d + 1) to a residue array in coefficient form.
+
+        Uses the cached permutation table of (d, k): one gather and one
+        conditional negation for all limbs at once.
+
+        Args:
+            residues (np.ndarray): Array of shape (num_primes, poly_degree) of residues.
+            galois_elt (int): Odd exponent k.
+
+        Returns:
+            A new array of shape (num_primes, poly_degree).
+        """
+        return get_galois_tables(self.poly_degree, galois_elt).apply_rns(residues, self.primes_u64)
+
+    def rns_add(self, a, b):
+        """Adds two residue arrays limb-wise.
+        """
+        return reduce_once(a + b, self.primes_u64)
+
+    def rns_subtract(self, a, b):
+        """Subtracts two residue arrays limb-wise.
+        """
+        return reduce_once(a + (self.primes_u64 - b), self.primes_u64)
+
+    def rns_negate(self, a):
+        """Negates a residue array limb-wise.
+        """
+        return reduce_once(self.primes_u64 - a, self.primes_u64)
+
+    def rns_multiply(self, a, b):
+        """Multiplies two residue arrays limb-wise.
+        """
+        return mul_mod(a, b, self.primes_u64, self.montgomery)
+
+    def rns_scalar_multiply(self, a, scalar):
+        """Multiplies a residue array by an integer scalar limb-wise.
+        """
+        column, companions = shoup_column([scalar % p for p in self.primes], self.primes)
+        return mul_shoup(a, column, companions, self.primes_u64)
+
+def get_crt_context(num_primes, prime_size, poly_degree) -> CRTContext:
+    """Returns the process-wide CRTContext for the given parameters.
+
+    Args:
+        num_primes (int): Number of primes.
+        prime_size (int): Minimum number of bits in primes.
+        poly_degree (int): Polynomial degree of ring.
+    """
+    return registry.get(('crt', get_backend().name, num_primes, prime_size, poly_degree),
+                        lambda: CRTContext(num_primes, prime_size, poly_degree))
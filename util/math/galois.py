@@ -0,0 +1,96 @@
+"""Automorphisms x -> x^k of the ring Z[x]/(x^d + 1), as cached permutation tables.
+
+For odd k, the automorphism sends coefficient i to position i * k mod 2d,
+negated when it wraps past x^d. On the negacyclic NTT, which holds the
+evaluations at the odd powers psi^e of a primitive 2d-th root of unity, it is
+a plain permutation of the entries, since (a o x^k)(psi^e) = a(psi^(e * k)).
+
+Both maps only depend on d and k, so their gather tables are built once and
+shared through the context registry. Rotating CKKS slots by r uses
+k = 5^r mod 2d, and conjugating them k = 2d - 1.
+"""
+
+import numpy as np
+
+from util.math.bit_operations import reversed_bits_table
+from util.math.context_registry import registry
+from util.math.modular import reduce_once
+
+def galois_element(rotation: int, poly_degree: int) -> int:
+    """Returns the Galois element 5^r mod 2d of a rotation by r slots, for any integer r.
+    """
+    return pow(5, rotation, 2 * poly_degree)
+
+def conjugation_element(poly_degree: int) -> int:
+    """Returns the Galois element 2d - 1 of the conjugation x -> x^-1.
+    """
+    return 2 * poly_degree - 1
+
+class GaloisTables:
+    """Gather tables of the automorphism x -> x^k for one degree and Galois element.
+
+    Attributes:
+        poly_degree (int): Degree d of the ring, a power of two.
+        galois_elt (int): Odd exponent k in [1, 2d).
+        coeff_index (np.ndarray): Coefficient i of the result is coefficient
+            coeff_index[i] of the input, negated if coeff_negate[i] is set.
+        coeff_negate (np.ndarray): Signs of the coefficients of the result.
+        ntt_index (np.ndarray): Entry i of the NTT of the result is entry
+            ntt_index[i] of the NTT of the input, in the bit-reversed order of
+            NTTContext.negacyclic_fwd, where entry i is the evaluation at
+            psi^(2 * rev(i) + 1).
+    """
+
+    def __init__(self, poly_degree: int, galois_elt: int):
+        assert poly_degree & (poly_degree - 1) == 0, 'Degree %d is not a power of two' % poly_degree
+        assert galois_elt % 2 == 1, 'Galois element %d is not odd' % galois_elt
+        self.poly_degree = poly_degree
+        self.galois_elt = galois_elt
+        two_d = 2 * poly_degree
+
+        target = np.arange(poly_degree, dtype=np.int64) * galois_elt % two_d
+        self.coeff_index = np.empty(poly_degree, dtype=np.intp)
+        self.coeff_index[target % poly_degree] = np.arange(poly_degree)
+        self.coeff_negate = np.empty(poly_degree, dtype=bool)
+        self.coeff_negate[target % poly_degree] = target >= poly_degree
+
+        rev = np.array(reversed_bits_table(poly_degree), dtype=np.int64)
+        exponents = (2 * rev + 1) * galois_elt % two_d
+        self.ntt_index = rev[(exponents - 1) // 2].astype(np.intp)
+
+    def apply(self, coeffs: list) -> list:
+        """Applies the automorphism to a list of coefficients of any numeric type.
+        """
+        return [-coeffs[j] if negate else coeffs[j]
+                for j, negate in zip(self.coeff_index.tolist(), self.coeff_negate.tolist())]
+
+    def apply_rns(self, residues: np.ndarray, moduli: np.ndarray) -> np.ndarray:
+        """Applies the automorphism to residues in coefficient form.
+
+        Args:
+            residues (np.ndarray): Array of shape (..., d) of residues.
+            moduli (np.ndarray): uint64 moduli broadcasting against residues,
+                such as CRTContext.primes_u64.
+
+        Returns:
+            A new array of the permuted and sign-corrected residues.
+        """
+        gathered = residues[..., self.coeff_index]
+        return np.where(self.coeff_negate, reduce_once(moduli - gathered, moduli), gathered)
+
+    def apply_ntt(self, values: np.ndarray) -> np.ndarray:
+        """Applies the automorphism to NTT-form values, for any moduli, as one gather.
+
+        Args:
+            values (np.ndarray): Array of shape (..., d) of negacyclic NTT values.
+
+        Returns:
+            A new array of the permuted values.
+        """
+        return values[..., self.ntt_index]
+
+def get_galois_tables(poly_degree: int, galois_elt: int) -> GaloisTables:
+    """Returns the process-wide GaloisTables of x -> x^k in degree d.
+    """
+    galois_elt %= 2 * poly_degree
+    return registry.get(('galois', poly_degree, galois_elt), lambda: GaloisTables(poly_degree, galois_elt))
@@ -0,0 +1,125 @@
+"""A module for exact modular arithmetic on NumPy arrays of uint64 residues.
+
+NumPy has no 64 x 64 -> 128 bit multiplication, so the high word of a product is
+assembled from 32-bit halves. On top of that we provide Shoup multiplication by
+precomputed constants (twiddle factors) and Montgomery multiplication of two
+arbitrary residue vectors. All routines are exact for moduli below 2^62, which
+covers the 59-bit primes generated by CRTContext.
+"""
+
+import numpy as np
+
+MAX_MODULUS_BITS = 62
+
+_MASK32 = np.uint64(0xFFFFFFFF)
+_SHIFT32 = np.uint64(32)
+_WORD = 1 << 64
+
+def check_modulus(modulus: int):
+    """Checks that a modulus is supported by the vectorized routines.
+    """
+    assert 1 < modulus < (1 << MAX_MODULUS_BITS), \
+        "Modulus must be smaller than 2^%d for uint64 arithmetic. q = %d is not." % (MAX_MODULUS_BITS, modulus)
+
+def to_residues(values, modulus: int) -> np.ndarray:
+    """Reduces arbitrary Python integers into a uint64 array of residues in [0, modulus).
+    """
+    return np.array([int(v) % modulus for v in values], dtype=np.uint64)
+
+def mulhi(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Computes the high 64 bits of the 128-bit products a * b.
+    """
+    a0 = a & _MASK32
+    a1 = a >> _SHIFT32
+    b0 = b & _MASK32
+    b1 = b >> _SHIFT32
+    p00 = a0 * b0
+    p01 = a0 * b1
+    p10 = a1 * b0
+    # Cannot overflow: p01 <= (2^32 - 1)^2 and the other two terms are below 2^32.
+    mid = (p00 >> _SHIFT32) + (p10 & _MASK32) + p01
+    return a1 * b1 + (p10 >> _SHIFT32) + (mid >> _SHIFT32)
+
+def reduce_once(a: np.ndarray, modulus) -> np.ndarray:
+    """Maps values in [0, 2q) to [0, q).
+
+    Subtraction wraps around for values below q, so the minimum picks the
+    correctly reduced value without a comparison mask.
+    """
+    return np.minimum(a, a - modulus)
+
+def shoup_precompute(values, modulus: int) -> np.ndarray:
+    """Computes the Shoup companions floor(w * 2^64 / q) of constants w in [0, q).
+    """
+    return np.array([(int(w) << 64) // modulus for w in values], dtype=np.uint64)
+
+def shoup_column(values, moduli):
+    """Returns columns of per-modulus constants w_i < q_i and their Shoup companions.
+
+    The columns broadcast against (len(moduli), n) residue arrays in mul_shoup.
+    """
+    column = np.array(values, dtype=np.uint64).reshape(-1, 1)
+    companions = np.array([(int(w) << 64) // q for w, q in zip(values, moduli)], dtype=np.uint64)
+    return column, companions.reshape(-1, 1)
+
+def mul_shoup_lazy(a: np.ndarray, w: np.ndarray, w_shoup: np.ndarray, modulus) -> np.ndarray:
+    """Computes a * w (mod q) in [0, 2q) for any a below 2^64 and a constant w in [0, q).
+    """
+    quotient = mulhi(a, w_shoup)
+    return a * w - quotient * modulus
+
+def mul_shoup(a: np.ndarray, w: np.ndarray, w_shoup: np.ndarray, modulus) -> np.ndarray:
+    """Computes a * w (mod q) in [0, q) for a constant w with Shoup companion w_shoup.
+    """
+    return reduce_once(mul_shoup_lazy(a, w, w_shoup, modulus), modulus)
+
+def montgomery_constants(modulus: int):
+    """Returns (q^-1 mod 2^64, 2^128 mod q) used by mul_mod.
+    """
+    return np.uint64(pow(modulus, -1, _WORD)), np.uint64((1 << 128) % modulus)
+
+def moduli_column(moduli):
+    """Returns a column of moduli and their Montgomery constants.
+
+    The column broadcasts against (len(moduli), n) residue arrays, so that
+    mul_mod and reduce_once process every limb of an RNS polynomial at once.
+
+    Args:
+        moduli (list): Moduli below 2^62.
+
+    Returns:
+        Tuple (moduli, (inverses, r2 values)) of uint64 column arrays.
+    """
+    column = np.array(moduli, dtype=np.uint64).reshape(-1, 1)
+    inverses = np.array([pow(q, -1, _WORD) for q in moduli], dtype=np.uint64).reshape(-1, 1)
+    r2 = np.array([(1 << 128) % q for q in moduli], dtype=np.uint64).reshape(-1, 1)
+    return column, (inverses, r2)
+
+def montgomery_reduce(hi: np.ndarray, lo: np.ndarray, modulus, modulus_inv) -> np.ndarray:
+    """Computes (hi * 2^64 + lo) * 2^-64 (mod q) in [0, q), given hi < q.
+    """
+    m = lo * modulus_inv
+    u = mulhi(m, modulus)
+    r = hi - u
+    # hi - u lies in (-q, q); add q back where the subtraction wrapped.
+    return np.where(hi < u, r + modulus, r)
+
+def mul_mod(a: np.ndarray, b: np.ndarray, modulus: int, constants=None) -> np.ndarray:
+    """Computes a * b (mod q) in [0, q) for residue arrays a < 4q and b < q.
+
+    Args:
+        a (np.ndarray): First operand.
+        b (np.ndarray): Second operand.
+        modulus (int or np.ndarray): Modulus q below 2^62, or a column of
+            moduli from moduli_column.
+        constants (tuple): Result of montgomery_constants(q), or the constants
+            from moduli_column. Required when modulus is an array.
+
+    Returns:
+        Array of products reduced modulo q.
+    """
+    modulus_inv, r2 = constants if constants is not None else montgomery_constants(modulus)
+    q = np.asarray(modulus, dtype=np.uint64)
+    prod = montgomery_reduce(mulhi(a, b), a * b, q, modulus_inv)
+    # Multiplying by 2^128 (mod q) cancels both factors of 2^-64.
+    return montgomery_reduce(mulhi(prod, r2), prod * r2, q, modulus_inv)
@@ -3,8 +3,12 @@ and Fermat Theoretic Transform (FTT). See https://rijndael.ece.vt.edu/schaum/pdf
 """
 
 from math import log, pi, cos, sin
+import numpy as np
 import util.math.number_theory as nbtheory
-from util.math.bit_operations import bit_reverse_vec, reverse_bits
+from util.math.bit_operations import bit_reverse_vec, reversed_bits_table
+from util.math.modular import check_modulus, montgomery_constants, mul_mod, mul_shoup, mul_shoup_lazy, \
+    reduce_once, shoup_precompute, to_residues
+from util.math.scratch import ScratchPool
 
 class NTTContext:
     """An instance of Number/Fermat Theoretic Transform parameters.
@@ -25,6 +29,10 @@ class NTTContext:
             where w is a root of unity.
         reversed_bits (list): The ith member of the list is the bits of i
             reversed, used in the iterative implementation of NTT.
+        psi_rev (list): Powers of the (2d)-th root of unity psi stored in
+            bit-reversed order, used by the negacyclic transform.
+        psi_inv_rev (list): Powers of psi^(-1) stored in bit-reversed order.
+        poly_degree_inv (int): Inverse of the degree d modulo the coefficient modulus.
     """
 
     def __init__(self, poly_degree, coeff_modulus, root_of_unity=None):
@@ -74,10 +82,13 @@ class NTTContext:
                 (self.roots_of_unity_inv[i - 1] * root_of_unity_inv) % self.coeff_modulus
 
         # Compute precomputed array of reversed bits for iterated NTT.
-        self.reversed_bits = [0] * self.degree
-        width = int(log(self.degree, 2))
-        for i in range(self.degree):
-            self.reversed_bits[i] = reverse_bits(i, width) % self.degree
+        self.reversed_bits = reversed_bits_table(self.degree)
+
+        self.poly_degree_inv = nbtheory.mod_inv(self.degree, self.coeff_modulus)
+
+        # Powers of psi in bit-reversed order for the merged negacyclic transform.
+        self.psi_rev = [self.roots_of_unity[j] for j in self.reversed_bits]
+        self.psi_inv_rev = [self.roots_of_unity_inv[j] for j in self.reversed_bits]
 
     def ntt(self, coeffs, rou):
         """Runs NTT on the given coefficients.
@@ -98,7 +109,7 @@ class NTTContext:
         assert len(rou) == num_coeffs, \
             "Length of the roots of unity is too small. Length is " + len(rou) # type: ignore
 
-        result = bit_reverse_vec(coeffs)
+        result = [coeffs[j] for j in self.reversed_bits]
 
         log_num_coeffs = int(log(num_coeffs, 2))
 
@@ -156,14 +167,505 @@ class NTTContext:
         assert num_coeffs == self.degree, "ntt_inv: input length does not match context degree"
 
         to_scale_down = self.ntt(coeffs=coeffs, rou=self.roots_of_unity_inv)
-        poly_degree_inv = nbtheory.mod_inv(self.degree, self.coeff_modulus)
 
         # We scale down the FTT output given in the FTT paper.
-        result = [(int(to_scale_down[i]) * self.roots_of_unity_inv[i] * poly_degree_inv) \
+        result = [(int(to_scale_down[i]) * self.roots_of_unity_inv[i] * self.poly_degree_inv) \
                   % self.coeff_modulus for i in range(num_coeffs)]
 
         return result
 
+    def negacyclic_fwd(self, coeffs):
+        """Runs the merged negacyclic NTT on the given coefficients.
+
+        The multiplication by powers of psi is folded into Cooley-Tukey butterflies
+        whose twiddles are read from psi_rev, so no separate pre-scaling or
+        bit-reversal pass is needed. The output is in bit-reversed order: entry i
+        is the evaluation at psi^(2 * rev(i) + 1). Only negacyclic_inv and
+        pointwise operations should consume it.
+
+        Args:
+            coeffs (list): List of coefficients to transform. Must be the
+                length of the polynomial degree.
+
+        Returns:
+            List of transformed coefficients in bit-reversed order.
+        """
+        assert len(coeffs) == self.degree, "negacyclic_fwd: input length does not match context degree"
+        q = self.coeff_modulus
+        result = [int(c) % q for c in coeffs]
+
+        gap = self.degree
+        num_blocks = 1
+        while num_blocks < self.degree:
+            gap >>= 1
+            for i in range(num_blocks):
+                psi = self.psi_rev[num_blocks + i]
+                start = 2 * i * gap
+                for j in range(start, start + gap):
+                    omega_factor = (result[j + gap] * psi) % q
+                    result[j + gap] = (result[j] - omega_factor) % q
+                    result[j] = (result[j] + omega_factor) % q
+            num_blocks <<= 1
+
+        return result
+
+    def negacyclic_inv(self, values):
+        """Runs the merged inverse negacyclic NTT on values from negacyclic_fwd.
+
+        Gentleman-Sande butterflies with twiddles from psi_inv_rev undo the
+        forward transform and its psi twist; the result is scaled by the cached
+        inverse of the degree.
+
+        Args:
+            values (list): List of values in bit-reversed order.
+
+        Returns:
+            List of coefficients in [0, q).
+        """
+        assert len(values) == self.degree, "negacyclic_inv: input length does not match context degree"
+        q = self.coeff_modulus
+        result = [int(v) % q for v in values]
+
+        gap = 1
+        num_blocks = self.degree >> 1
+        while num_blocks >= 1:
+            for i in range(num_blocks):
+                psi = self.psi_inv_rev[num_blocks + i]
+                start = 2 * i * gap
+                for j in range(start, start + gap):
+                    even = result[j]
+                    odd = result[j + gap]
+                    result[j] = (even + odd) % q
+                    result[j + gap] = ((even - odd) * psi) % q
+            gap <<= 1
+            num_blocks >>= 1
+
+        return [(v * self.poly_degree_inv) % q for v in result]
+
+    def negacyclic_fwd_array(self, values, out=None):
+        """Runs negacyclic_fwd on a uint64 array of residues, for use in CRTContext.
+        """
+        result = np.array(self.negacyclic_fwd(values.tolist()), dtype=np.uint64)
+        if out is None:
+            return result
+        out[...] = result
+        return out
+
+    def negacyclic_inv_array(self, values, out=None):
+        """Runs negacyclic_inv on a uint64 array of values, for use in CRTContext.
+        """
+        result = np.array(self.negacyclic_inv(values.tolist()), dtype=np.uint64)
+        if out is None:
+            return result
+        out[...] = result
+        return out
+
+    def negacyclic_multiply(self, coeffs1, coeffs2):
+        """Multiplies two polynomials modulo (x^d + 1, q) with the negacyclic NTT.
+
+        Args:
+            coeffs1 (list): Coefficients of the first polynomial.
+            coeffs2 (list): Coefficients of the second polynomial.
+
+        Returns:
+            List of product coefficients in [0, q).
+        """
+        a = self.negacyclic_fwd(coeffs1)
+        b = self.negacyclic_fwd(coeffs2)
+        return self.negacyclic_inv([a[i] * b[i] for i in range(self.degree)])
+
+
+class NumpyNTTContext(NTTContext):
+    """An NTTContext whose transforms run as whole-array NumPy operations.
+
+    Every butterfly stage of the iterated NTT is applied to all blocks at once on
+    uint64 residues, multiplying by twiddle factors with Shoup's method. The
+    outputs of ftt_fwd and ftt_inv are identical to those of NTTContext, so
+    instances are drop-in replacements for coefficient moduli below 2^62.
+
+    The negacyclic transforms keep values lazily reduced in [0, 4q) between
+    stages (Harvey's butterflies) and only fully reduce the final output.
+
+    Attributes:
+        fwd_stages (list): Per-stage (twiddles, Shoup companions) for the forward NTT.
+        inv_stages (list): Per-stage (twiddles, Shoup companions) for the inverse NTT.
+        psi_stages (list): Per-stage bit-reversed psi twiddles and Shoup companions
+            for the forward negacyclic NTT, shaped to broadcast over blocks.
+        psi_inv_stages (list): Same as psi_stages for the inverse negacyclic NTT.
+        four_step_shape (tuple): Shape (rows, cols) of the four-step matrix, or
+            None if the negacyclic transforms use the merged algorithm.
+        scratch (ScratchPool): Per-thread arrays for the temporaries of
+            ftt_fwd and ftt_inv.
+    """
+
+    def __init__(self, poly_degree, coeff_modulus, root_of_unity=None, four_step=False):
+        """Inits NumpyNTTContext.
+
+        Args:
+            poly_degree (int): Degree of the polynomial ring.
+            coeff_modulus (int): Modulus for coefficients, below 2^62.
+            root_of_unity (int): Root of unity to perform the NTT with.
+            four_step (bool): Whether the negacyclic transforms use the
+                four-step algorithm. Under NumPy every stage of the merged
+                algorithm is already one pass over the array, and it measures
+                faster up to d = 2^17, so this is off by default.
+        """
+        check_modulus(coeff_modulus)
+        self.four_step_shape = None
+        self.scratch = ScratchPool()
+        super().__init__(poly_degree, coeff_modulus, root_of_unity)
+        if four_step:
+            self.precompute_four_step()
+
+    def precompute_ntt(self, root_of_unity):
+        """Performs precomputations for the vectorized NTT and inverse NTT.
+
+        Args:
+            root_of_unity (int): Root of unity to perform the NTT with.
+        """
+        super().precompute_ntt(root_of_unity)
+        q = self.coeff_modulus
+        self.modulus_u64 = np.uint64(q)
+        self.bit_reverse_index = np.array(self.reversed_bits, dtype=np.intp)
+
+        self.rou_u64 = np.array(self.roots_of_unity, dtype=np.uint64)
+        self.rou_shoup = shoup_precompute(self.roots_of_unity, q)
+        self.rou_inv_u64 = rou_inv_u64 = np.array(self.roots_of_unity_inv, dtype=np.uint64)
+        self.rou_inv_shoup = rou_inv_shoup = shoup_precompute(self.roots_of_unity_inv, q)
+        scaled_rou_inv = [(w * self.poly_degree_inv) % q for w in self.roots_of_unity_inv]
+        self.scaled_rou_inv_u64 = np.array(scaled_rou_inv, dtype=np.uint64)
+        self.scaled_rou_inv_shoup = shoup_precompute(scaled_rou_inv, q)
+
+        # Every other table is a strided slice or a permutation of the ones above.
+        self.fwd_stages = self.precompute_stages(self.rou_u64, self.rou_shoup)
+        self.inv_stages = self.precompute_stages(rou_inv_u64, rou_inv_shoup)
+
+        self.poly_degree_inv_u64 = np.uint64(self.poly_degree_inv)
+        self.poly_degree_inv_shoup = shoup_precompute([self.poly_degree_inv], q)[0]
+        self.montgomery = montgomery_constants(q)
+        self.psi_stages = self.precompute_psi_stages(self.rou_u64[self.bit_reverse_index],
+                                                     self.rou_shoup[self.bit_reverse_index])
+        self.psi_inv_stages = self.precompute_psi_stages(rou_inv_u64[self.bit_reverse_index],
+                                                         rou_inv_shoup[self.bit_reverse_index])
+
+    def precompute_four_step(self):
+        """Performs precomputations for the four-step negacyclic NTT.
+
+        The degree is split as d = rows * cols with rows the largest power of
+        two not above sqrt(d). The cyclic transforms of length rows and cols run
+        in NumpyNTTContexts of their own, and the twiddle matrices hold
+        w^(k1 * j2) for the row index k1 and column index j2, where w = psi^2.
+        """
+        q = self.coeff_modulus
+        n = self.degree
+        rows = 1 << ((n.bit_length() - 1) // 2)
+        cols = n // rows
+        psi = self.roots_of_unity[1]
+        self.four_step_shape = (rows, cols)
+        self.column_ntt = NumpyNTTContext(rows, q, root_of_unity=pow(psi, cols, q))
+        self.row_ntt = NumpyNTTContext(cols, q, root_of_unity=pow(psi, rows, q))
+
+        # Tables are laid out as (cols, rows), the layout of the column transforms.
+        exponents = 2 * np.outer(np.arange(cols), np.arange(rows)) % (2 * n)
+        self.four_step_twiddles = self.psi_powers(exponents, self.rou_u64, self.rou_shoup)
+        self.four_step_twiddles_inv = self.psi_powers(exponents, self.rou_inv_u64, self.rou_inv_shoup)
+        self.four_step_twist = (self.rou_u64.reshape(rows, cols).T.copy(),
+                                self.rou_shoup.reshape(rows, cols).T.copy())
+        self.four_step_untwist = (self.scaled_rou_inv_u64.reshape(cols, rows),
+                                  self.scaled_rou_inv_shoup.reshape(cols, rows))
+
+        # Entry i of the forward output is A[rev(i)], where A[k1 + rows * k2] is
+        # entry (k1, k2) of the final (rows, cols) matrix.
+        rev = self.bit_reverse_index
+        self.four_step_output_index = (rev % rows) * cols + rev // rows
+        # Entry (j2, j1) of the inverse input matrix is A[j1 * cols + j2].
+        positions = np.arange(rows) * cols + np.arange(cols).reshape(-1, 1)
+        self.four_step_input_index = rev[positions]
+
+    def psi_powers(self, exponents, psi_powers, psi_powers_shoup):
+        """Looks up psi^e for exponents e in [0, 2d), using psi^(e + d) = -psi^e.
+
+        Args:
+            exponents (np.ndarray): Exponents of psi (or its inverse).
+            psi_powers (np.ndarray): psi^i for i < d.
+            psi_powers_shoup (np.ndarray): Shoup companions of psi_powers.
+
+        Returns:
+            Tuple (powers, Shoup companions) shaped like exponents.
+        """
+        upper = exponents >= self.degree
+        index = np.where(upper, exponents - self.degree, exponents)
+        powers = np.where(upper, self.modulus_u64 - psi_powers[index], psi_powers[index])
+        # floor((q - w) * 2^64 / q) = 2^64 - 1 - floor(w * 2^64 / q) for 0 < w < q.
+        companions = np.where(upper, ~psi_powers_shoup[index], psi_powers_shoup[index])
+        return powers, companions
+
+    def precompute_psi_stages(self, psi_rev, psi_rev_shoup):
+        """Slices bit-reversed psi powers into the twiddles of each negacyclic stage.
+
+        Stage with m blocks uses psi_rev[m:2m], one twiddle per block.
+
+        Args:
+            psi_rev (np.ndarray): Powers of psi (or its inverse) in bit-reversed order.
+            psi_rev_shoup (np.ndarray): Shoup companions of psi_rev.
+
+        Returns:
+            Dict from number of blocks to (twiddles, Shoup companions) column arrays.
+        """
+        stages = {}
+        num_blocks = 1
+        while num_blocks < self.degree:
+            stages[num_blocks] = (psi_rev[num_blocks:2 * num_blocks].reshape(-1, 1),
+                                  psi_rev_shoup[num_blocks:2 * num_blocks].reshape(-1, 1))
+            num_blocks <<= 1
+        return stages
+
+    def precompute_stages(self, rou, rou_shoup):
+        """Gathers the twiddle factors used by each butterfly stage of ntt.
+
+        Stage logm uses rou[i << (1 + log d - logm)], a strided slice of rou.
+
+        Args:
+            rou (np.ndarray): Powers of the root of unity.
+            rou_shoup (np.ndarray): Shoup companions of rou.
+
+        Returns:
+            List of (twiddles, Shoup companions) arrays, one per stage.
+        """
+        stages = []
+        log_num_coeffs = int(log(self.degree, 2))
+        for logm in range(1, log_num_coeffs + 1):
+            step = 1 << (1 + log_num_coeffs - logm)
+            stages.append((rou[::step].copy(), rou_shoup[::step].copy()))
+        return stages
+
+    def ntt_array(self, values, stages, out=None):
+        """Runs the iterated NTT on a uint64 array with entries in [0, q).
+
+        Args:
+            values (np.ndarray): Residues to transform. Leading axes are
+                batch axes; the last one must have length d.
+            stages (list): Twiddle factors from precompute_stages.
+            out (np.ndarray): Array of the same shape to write the result to,
+                other than values. A new array if None.
+
+        Returns:
+            Array of transformed residues in [0, q).
+        """
+        q = self.modulus_u64
+        result = np.take(values, self.bit_reverse_index, axis=-1, out=out)
+        batch_shape = result.shape[:-1]
+        for twiddles, twiddles_shoup in stages:
+            blocks = result.reshape(batch_shape + (-1, 2, len(twiddles)))
+            even = blocks[..., 0, :]
+            omega_factor = mul_shoup(blocks[..., 1, :], twiddles, twiddles_shoup, q)
+            butterfly_minus = reduce_once(even + (q - omega_factor), q)
+            blocks[..., 0, :] = reduce_once(even + omega_factor, q)
+            blocks[..., 1, :] = butterfly_minus
+        return result
+
+    def ftt_fwd(self, coeffs):
+        """Runs forward FTT on the given coefficients.
+
+        Args:
+            coeffs (list): List of coefficients to transform. Must be the
+                length of the polynomial degree.
+
+        Returns:
+            List of transformed coefficients.
+        """
+        assert len(coeffs) == self.degree, f"ftt_fwd: input length {len(coeffs)} does not match context degree {self.degree}"
+        ftt_input = mul_shoup(to_residues(coeffs, self.coeff_modulus), self.rou_u64,
+                              self.rou_shoup, self.modulus_u64)
+        result = self.ntt_array(ftt_input, self.fwd_stages, out=self.scratch.get('ftt', self.degree))
+        return result.tolist()
+
+    def ftt_inv(self, coeffs):
+        """Runs inverse FTT on the given coefficients.
+
+        Args:
+            coeffs (list): List of coefficients to transform. Must be the
+                length of the polynomial degree.
+
+        Returns:
+            List of inversely transformed coefficients.
+        """
+        assert len(coeffs) == self.degree, "ntt_inv: input length does not match context degree"
+        to_scale_down = self.ntt_array(to_residues(coeffs, self.coeff_modulus), self.inv_stages,
+                                       out=self.scratch.get('ftt', self.degree))
+        result = mul_shoup(to_scale_down, self.scaled_rou_inv_u64, self.scaled_rou_inv_shoup,
+                           self.modulus_u64)
+        return result.tolist()
+
+    def negacyclic_fwd_array(self, values, out=None):
+        """Runs the merged negacyclic NTT on a uint64 array with entries in [0, 4q).
+
+        Args:
+            values (np.ndarray): Residues to transform. Not modified, unless
+                it is also given as out.
+            out (np.ndarray): Array of length d to write the result to. A new
+                array if None.
+
+        Returns:
+            Array of transformed residues in [0, q), in bit-reversed order.
+        """
+        if self.four_step_shape:
+            return self.copy_out(self.four_step_fwd_array(values), out)
+        q = self.modulus_u64
+        two_q = q + q
+        result = self.copy_out(values, out)
+        gap = self.degree
+        num_blocks = 1
+        while num_blocks < self.degree:
+            gap >>= 1
+            psi, psi_shoup = self.psi_stages[num_blocks]
+            blocks = result.reshape(num_blocks, 2, gap)
+            even = reduce_once(blocks[:, 0, :], two_q)
+            omega_factor = mul_shoup_lazy(blocks[:, 1, :], psi, psi_shoup, q)
+            blocks[:, 1, :] = even + (two_q - omega_factor)
+            blocks[:, 0, :] = even + omega_factor
+            num_blocks <<= 1
+        np.minimum(result, result - two_q, out=result)
+        return np.minimum(result, result - q, out=result)
+
+    def negacyclic_inv_array(self, values, out=None):
+        """Runs the merged inverse negacyclic NTT on a uint64 array with entries in [0, 2q).
+
+        Args:
+            values (np.ndarray): Residues in bit-reversed order. Not modified,
+                unless it is also given as out.
+            out (np.ndarray): Array of length d to write the result to. A new
+                array if None.
+
+        Returns:
+            Array of coefficients in [0, q).
+        """
+        if self.four_step_shape:
+            return self.copy_out(self.four_step_inv_array(values), out)
+        q = self.modulus_u64
+        two_q = q + q
+        result = self.copy_out(values, out)
+        gap = 1
+        num_blocks = self.degree >> 1
+        while num_blocks >= 1:
+            psi, psi_shoup = self.psi_inv_stages[num_blocks]
+            blocks = result.reshape(num_blocks, 2, gap)
+            even = blocks[:, 0, :]
+            odd = blocks[:, 1, :]
+            diff = even + (two_q - odd)
+            blocks[:, 0, :] = reduce_once(even + odd, two_q)
+            blocks[:, 1, :] = mul_shoup_lazy(diff, psi, psi_shoup, q)
+            gap <<= 1
+            num_blocks >>= 1
+        scaled = mul_shoup_lazy(result, self.poly_degree_inv_u64, self.poly_degree_inv_shoup, q)
+        return np.minimum(scaled, scaled - q, out=result)
+
+    @staticmethod
+    def copy_out(values, out):
+        """Copies values into out, or into a new array if out is None, and returns it.
+        """
+        if out is None:
+            return values.copy()
+        np.copyto(out, values)
+        return out
+
+    def four_step_fwd_array(self, values):
+        """Runs the negacyclic NTT with the four-step algorithm.
+
+        Coefficient j is twisted by psi^j, which turns the negacyclic transform
+        into a cyclic one with w = psi^2. Viewing the input as a (rows, cols)
+        matrix, we run cyclic transforms of length rows down the columns,
+        multiply by the twiddles w^(k1 * j2), and run transforms of length cols
+        along the rows. Each batch of short transforms works on contiguous
+        rows of about sqrt(d) entries, which stay in cache. The output matches
+        the merged algorithm, in bit-reversed order.
+
+        Args:
+            values (np.ndarray): Residues in [0, 4q). Not modified.
+
+        Returns:
+            Array of transformed residues in [0, q), in bit-reversed order.
+        """
+        q = self.modulus_u64
+        (rows, cols) = self.four_step_shape
+        # Transposed to (cols, rows), so that each column transform is a contiguous row.
+        twisted = mul_shoup(values.reshape(rows, cols).T, *self.four_step_twist, q)
+        columns = self.column_ntt.ntt_array(twisted, self.column_ntt.fwd_stages)
+        columns = mul_shoup(columns, *self.four_step_twiddles, q)
+        result = self.row_ntt.ntt_array(np.ascontiguousarray(columns.T), self.row_ntt.fwd_stages)
+        return result.reshape(-1)[self.four_step_output_index]
+
+    def four_step_inv_array(self, values):
+        """Runs the inverse negacyclic NTT with the four-step algorithm.
+
+        Args:
+            values (np.ndarray): Residues in [0, 2q), in bit-reversed order. Not modified.
+
+        Returns:
+            Array of coefficients in [0, q).
+        """
+        q = self.modulus_u64
+        columns = reduce_once(values[self.four_step_input_index], q)
+        columns = self.column_ntt.ntt_array(columns, self.column_ntt.inv_stages)
+        columns = mul_shoup(columns, *self.four_step_twiddles_inv, q)
+        result = self.row_ntt.ntt_array(np.ascontiguousarray(columns.T), self.row_ntt.inv_stages)
+        # Entry (k1, k2) is coefficient k1 + rows * k2, before scaling and untwisting.
+        return mul_shoup(result.T, *self.four_step_untwist, q).reshape(-1)
+
+    def pointwise_multiply_array(self, a, b):
+        """Multiplies two arrays of residues entrywise modulo q.
+
+        Args:
+            a (np.ndarray): Residues in [0, 4q).
+            b (np.ndarray): Residues in [0, q).
+
+        Returns:
+            Array of products in [0, q).
+        """
+        return mul_mod(a, b, self.coeff_modulus, self.montgomery)
+
+    def negacyclic_fwd(self, coeffs):
+        """Runs the merged negacyclic NTT on the given coefficients.
+
+        Args:
+            coeffs (list): List of coefficients to transform. Must be the
+                length of the polynomial degree.
+
+        Returns:
+            List of transformed coefficients in bit-reversed order.
+        """
+        assert len(coeffs) == self.degree, "negacyclic_fwd: input length does not match context degree"
+        return self.negacyclic_fwd_array(to_residues(coeffs, self.coeff_modulus)).tolist()
+
+    def negacyclic_inv(self, values):
+        """Runs the merged inverse negacyclic NTT on values from negacyclic_fwd.
+
+        Args:
+            values (list): List of values in bit-reversed order.
+
+        Returns:
+            List of coefficients in [0, q).
+        """
+        assert len(values) == self.degree, "negacyclic_inv: input length does not match context degree"
+        return self.negacyclic_inv_array(to_residues(values, self.coeff_modulus)).tolist()
+
+    def negacyclic_multiply(self, coeffs1, coeffs2):
+        """Multiplies two polynomials modulo (x^d + 1, q) with the negacyclic NTT.
+
+        Args:
+            coeffs1 (list): Coefficients of the first polynomial.
+            coeffs2 (list): Coefficients of the second polynomial.
+
+        Returns:
+            List of product coefficients in [0, q).
+        """
+        a = to_residues(coeffs1, self.coeff_modulus)
+        b = to_residues(coeffs2, self.coeff_modulus)
+        self.negacyclic_fwd_array(a, out=a)
+        self.negacyclic_fwd_array(b, out=b)
+        prod = self.pointwise_multiply_array(a, b)
+        return self.negacyclic_inv_array(prod, out=prod).tolist()
+
 
 class FFTContext:
     """An instance of Fast Fourier Transform (FFT) parameters.
@@ -204,10 +706,7 @@ class FFTContext:
 
         # Compute precomputed array of reversed bits for iterated FFT.
         num_slots = self.fft_length // 4
-        self.reversed_bits = [0] * num_slots
-        width = int(log(num_slots, 2))
-        for i in range(num_slots):
-            self.reversed_bits[i] = reverse_bits(i, width) % num_slots
+        self.reversed_bits = reversed_bits_table(num_slots)
 
         # Compute rotation group for EMB with powers of 5.
         self.rot_group = [1] * num_slots
@@ -371,4 +870,81 @@ class FFTContext:
         for i in range(num_coeffs):
             to_scale_down[i] /= num_coeffs # type: ignore
 
-        return to_scale_down
\ No newline at end of file
+        return to_scale_down
+
+
+class NumpyFFTContext(FFTContext):
+    """An FFTContext running its transforms with numpy.fft.
+
+    Results agree with FFTContext up to floating-point rounding.
+    """
+    def fft_fwd(self, coeffs):
+        """Runs forward FFT on the given values.
+
+        The forward transform evaluates at positive powers of the root of
+        unity, which is numpy's inverse transform scaled by the length.
+
+        Args:
+            coeffs (list): List of complex numbers to transform.
+
+        Returns:
+            List of transformed coefficients.
+        """
+        return (np.fft.ifft(np.asarray(coeffs, dtype=np.complex128)) * len(coeffs)).tolist()
+
+    def fft_inv(self, coeffs):
+        """Runs inverse FFT on the given values.
+
+        Args:
+            coeffs (list): List of complex numbers to transform.
+
+        Returns:
+            List of transformed coefficients.
+        """
+        return (np.fft.fft(np.asarray(coeffs, dtype=np.complex128)) / len(coeffs)).tolist()
+
+    def embedding_indices(self, num_coeffs):
+        """Returns the data to express the embedding of length m as an FFT.
+
+        Slot k holds the evaluation at z^(5^k mod 4m) for a primitive 4m-th
+        root of unity z. As 5^k = 1 + 4t (mod 4m), where t runs over [0, m),
+        this is the length-m DFT of c_j * z^j at index t.
+
+        Returns:
+            Tuple (t, twist) of the DFT index of each slot and the powers z^j.
+        """
+        order = 4 * num_coeffs
+        exponents = np.array(self.rot_group[:num_coeffs]) % order
+        twist = np.exp(2j * pi * np.arange(num_coeffs) / order)
+        return (exponents - 1) // 4, twist
+
+    def embedding(self, coeffs):
+        """Computes a variant of the canonical embedding on the given coefficients.
+
+        Args:
+            coeffs (list): List of complex numbers to transform.
+
+        Returns:
+            List of transformed coefficients.
+        """
+        self.check_embedding_input(coeffs)
+        num_coeffs = len(coeffs)
+        (index, twist) = self.embedding_indices(num_coeffs)
+        values = np.fft.ifft(np.asarray(coeffs, dtype=np.complex128) * twist) * num_coeffs
+        return values[index].tolist()
+
+    def embedding_inv(self, coeffs):
+        """Computes the inverse variant of the canonical embedding.
+
+        Args:
+            values (list): List of complex numbers to transform.
+
+        Returns:
+            List of transformed coefficients.
+        """
+        self.check_embedding_input(coeffs)
+        num_coeffs = len(coeffs)
+        (index, twist) = self.embedding_indices(num_coeffs)
+        spectrum = np.zeros(num_coeffs, dtype=np.complex128)
+        spectrum[index] = coeffs
+        return (np.fft.fft(spectrum) / (num_coeffs * twist)).tolist()
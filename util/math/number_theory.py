@@ -17,38 +17,67 @@ def mod_inv(val: int, modulus: int):
 def find_generator(modulus: int):
     return sympy.ntheory.primitive_root(modulus)
 
+def prime_factors(number: int) -> list[int]:
+    """Returns the distinct prime factors of a small number by trial division.
+    """
+    factors = []
+    factor = 2
+    while factor * factor <= number:
+        if number % factor == 0:
+            factors.append(factor)
+            while number % factor == 0:
+                number //= factor
+        factor += 1
+    if number > 1:
+        factors.append(number)
+    return factors
+
 def root_of_unity(order: int, modulus: int):
-    """Computes the nth root of unity.
-    result = g^(order / modulus) mod modulus.
+    """Computes a primitive nth root of unity, where n = order.
+    result = x^((modulus - 1) / order) mod modulus for the smallest x of full order.
+
+    Since p - 1 = k * order, only the factorization of the (small) order is
+    needed: the candidate has order exactly n iff w^(n / f) != 1 for every prime
+    factor f of n. This avoids factoring p - 1 to find a generator.
     """
     if ((modulus - 1) % order) != 0:
         raise ValueError('Order is not a factor of modulus - 1')
-    
-    generator = find_generator(modulus)
-    if generator is None:
-        raise ValueError('Generator not found')
-    
-    result = mod_exp(generator, (modulus - 1) // order, modulus)
-    
-    if result == 1:
-        return root_of_unity(order, modulus)
-    
-    return result
+
+    cofactor = (modulus - 1) // order
+    factors = prime_factors(order)
+    for x in range(2, modulus):
+        result = mod_exp(x, cofactor, modulus)
+        if all(mod_exp(result, order // f, modulus) != 1 for f in factors):
+            return result
+
+    raise ValueError('Root of unity not found')
+
+# Testing these bases is a deterministic Miller-Rabin test for all n < 3.3 * 10^24.
+DETERMINISTIC_BASES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)
+DETERMINISTIC_LIMIT = 3317044064679887385961981
 
 def is_prime(number: int, num_trials: int = 200) -> bool:
     """Checks if a number is prime.
     Millar-Rabin primality test.
+
+    Deterministic for numbers below DETERMINISTIC_LIMIT (which includes every
+    64-bit candidate); larger numbers use num_trials random bases.
     """
     if number < 2: return False
     if number != 2 and number % 2 == 0: return False
+    if number in DETERMINISTIC_BASES: return True
     
     # Find largest odd factor of n - 1
     exp = number - 1
     while exp % 2 == 0:
         exp //= 2
+
+    if number < DETERMINISTIC_LIMIT:
+        bases = DETERMINISTIC_BASES
+    else:
+        bases = [int(random.SystemRandom().randrange(1, number)) for _ in range(num_trials)]
         
-    for _ in range(num_trials):
-        rand = int(random.SystemRandom().randrange(1, number))
+    for rand in bases:
         new_exp = exp
         power = pow(rand, new_exp, number)
         while new_exp != number - 1 and power != 1 and power != number - 1:
@@ -0,0 +1,65 @@
+"""Per-thread pools of preallocated NumPy arrays for transform temporaries.
+
+Transforms and tensor products need arrays of degree x limbs entries that only
+live for the duration of one call. Allocating them afresh each time costs a
+page-faulting allocation per call at large degrees. A ScratchPool hands out
+the same arrays on every call instead. Contexts are shared between threads
+(see util.math.context_registry), so each thread gets its own arrays.
+
+An array from a pool is only valid until the next request for the same name
+on the same thread, so it must never be returned to callers of the context.
+"""
+
+import threading
+
+import numpy as np
+
+class ScratchPool:
+    """A cache of arrays keyed by name, shape and dtype, one cache per thread.
+    """
+
+    def __init__(self):
+        self.local = threading.local()
+
+    def __reduce__(self):
+        # Contexts may be sent to other processes; their pools start out empty there.
+        return (ScratchPool, ())
+
+    def buffers(self) -> dict:
+        """Returns the arrays of the calling thread.
+        """
+        buffers = getattr(self.local, 'buffers', None)
+        if buffers is None:
+            buffers = self.local.buffers = {}
+        return buffers
+
+    def get(self, name: str, shape, dtype=np.uint64) -> np.ndarray:
+        """Returns an uninitialized array for the given use, allocated at most once per thread.
+
+        Args:
+            name (str): Name of the temporary, distinguishing arrays of the
+                same shape that are alive at the same time.
+            shape (tuple or int): Shape of the array.
+            dtype: Data type of the array.
+
+        Returns:
+            An array of the given shape, with arbitrary contents.
+        """
+        shape = (shape,) if isinstance(shape, int) else tuple(shape)
+        key = (name, shape, np.dtype(dtype))
+        buffers = self.buffers()
+        array = buffers.get(key)
+        if array is None:
+            array = buffers[key] = np.empty(shape, dtype=dtype)
+        return array
+
+    def clear(self):
+        """Releases the arrays of the calling thread.
+        """
+        self.buffers().clear()
+
+    def stats(self) -> dict:
+        """Returns the number of arrays and bytes held for the calling thread.
+        """
+        buffers = self.buffers()
+        return {'arrays': len(buffers), 'nbytes': sum(a.nbytes for a in buffers.values())}
@@ -0,0 +1,193 @@
+"""A runtime auto-tuner for polynomial multiplication.
+
+Polynomial.multiply has several exact strategies whose relative speed depends
+on the degree, the size of the modulus, the shape of the operands and the
+machine. The tuner times every strategy that applies to a kind of product the
+first time it is requested, and dispatches later products of the same kind to
+the fastest one. The resulting crossover table is cached on disk, so the
+calibration runs once per machine.
+
+Calibrating a kind takes seconds at large degrees, so the tuner is opt-in: set
+FHE_PY_AUTOTUNE=1 to enable it, and FHE_PY_TUNING_CACHE to move the cache
+file. By default, Polynomial.multiply uses the static heuristics of
+Polynomial.default_strategy.
+"""
+
+import json
+import os
+import random
+import threading
+import time
+
+import util.math.number_theory as nbtheory
+from util.math.modular import MAX_MODULUS_BITS
+
+CACHE_VERSION = 1
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'fhe_py', 'multiply_tuning.json')
+
+# Strategies of Polynomial.multiply, by the name of the method implementing them.
+STRATEGIES = {
+    'schoolbook': 'simple_multiply',
+    'ternary': 'ternary_multiply',
+    'ntt': 'prime_ntt_multiply',
+    'aux_ntt': 'aux_multiply',
+    'kronecker': 'kronecker_multiply',
+    'fft': 'exact_fft_multiply',
+}
+
+# The schoolbook loop takes seconds from here on and is never the fastest.
+SCHOOLBOOK_MAX_DEGREE = 256
+TIMING_REPEATS = 3
+
+def is_ntt_prime(poly_degree: int, coeff_modulus: int) -> bool:
+    """Checks whether q is a prime supporting the vectorized negacyclic NTT of size d.
+    """
+    return poly_degree & (poly_degree - 1) == 0 and coeff_modulus.bit_length() <= MAX_MODULUS_BITS \
+        and coeff_modulus % (2 * poly_degree) == 1 and nbtheory.is_prime(coeff_modulus)
+
+class MultiplyTuner:
+    """Chooses the fastest multiplication strategy for each kind of product.
+
+    A kind of product is described by the degree, the bit length of the
+    modulus rounded up to a power of two, and whether an operand is ternary
+    and the modulus is an NTT-friendly prime.
+
+    Attributes:
+        cache_path (str): JSON file holding the crossover table.
+        table (dict): Map from product kinds to strategy names.
+    """
+
+    def __init__(self, cache_path=None):
+        self.cache_path = cache_path or os.environ.get('FHE_PY_TUNING_CACHE', DEFAULT_CACHE_PATH)
+        self.lock = threading.RLock()
+        self.table = None
+        self.ntt_primes = {}
+
+    def product_kind(self, a, b, coeff_modulus):
+        """Describes a product of polynomials a and b modulo coeff_modulus.
+
+        Returns:
+            Tuple (key, strategies) of the cache key and the names of the
+            strategies that apply.
+        """
+        degree = a.degree
+        is_ternary = a.is_ternary() or b.is_ternary()
+        if coeff_modulus:
+            bits = coeff_modulus.bit_length()
+        else:
+            bits = max(abs(c).bit_length() for c in a.coeffs + b.coeffs)
+        bits = 1 << max(bits - 1, 15).bit_length()
+        ntt_prime = False
+        if coeff_modulus:
+            if coeff_modulus not in self.ntt_primes:
+                self.ntt_primes[coeff_modulus] = is_ntt_prime(degree, coeff_modulus)
+            ntt_prime = self.ntt_primes[coeff_modulus]
+
+        strategies = ['kronecker', 'fft']
+        if degree <= SCHOOLBOOK_MAX_DEGREE:
+            strategies.append('schoolbook')
+        if is_ternary:
+            strategies.append('ternary')
+        if ntt_prime:
+            strategies.append('ntt')
+        if coeff_modulus and degree & (degree - 1) == 0:
+            strategies.append('aux_ntt')
+        key = '%d/%d/%s/%s/%s' % (degree, bits, 'mod' if coeff_modulus else 'int',
+                                  'ternary' if is_ternary else 'dense', 'prime' if ntt_prime else 'any')
+        return key, strategies
+
+    def choose(self, a, b, coeff_modulus=None) -> str:
+        """Returns the fastest strategy for multiplying a and b.
+
+        The first product of a kind not seen before is calibrated on the spot,
+        with random operands of the same shape, and then the table is saved.
+        Calibration runs outside the lock, so products of other threads are
+        not held up. If two threads calibrate the same kind at once, the first
+        result to be stored wins.
+        """
+        key, strategies = self.product_kind(a, b, coeff_modulus)
+        with self.lock:
+            if self.table is None:
+                self.table = self.load()
+            strategy = self.table.get(key)
+        if strategy in strategies:
+            return strategy
+        calibrated = self.calibrate(a, b, coeff_modulus, strategies)
+        with self.lock:
+            strategy = self.table.get(key)
+            if strategy not in strategies:
+                strategy = self.table[key] = calibrated
+                self.save()
+        return strategy
+
+    def calibrate(self, a, b, coeff_modulus, strategies) -> str:
+        """Times each strategy on random operands shaped like a and b.
+
+        Each strategy runs once to build its contexts, then the best of
+        TIMING_REPEATS runs counts. Strategies whose first run is already
+        slower than the best repeated time found so far are not repeated.
+
+        Returns:
+            Name of the fastest strategy.
+        """
+        degree = a.degree
+        bound = coeff_modulus or 1 << max(abs(c).bit_length() for c in a.coeffs + b.coeffs)
+        dense = type(a)(degree, [random.randrange(bound) for _ in range(degree)])
+        if a.is_ternary() or b.is_ternary():
+            other = type(a)(degree, [random.choice((-1, 0, 0, 1)) for _ in range(degree)])
+        else:
+            other = type(a)(degree, [random.randrange(bound) for _ in range(degree)])
+
+        best = (float('inf'), 'kronecker')
+        for name in strategies:
+            method = getattr(dense, STRATEGIES[name])
+            start = time.perf_counter()
+            method(other, coeff_modulus)
+            elapsed = time.perf_counter() - start
+            if elapsed < best[0]:
+                for _ in range(TIMING_REPEATS):
+                    start = time.perf_counter()
+                    method(other, coeff_modulus)
+                    elapsed = min(elapsed, time.perf_counter() - start)
+            best = min(best, (elapsed, name))
+        return best[1]
+
+    def load(self) -> dict:
+        """Reads the crossover table from the cache file, if it is usable.
+        """
+        try:
+            with open(self.cache_path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict) or data.get('version') != CACHE_VERSION:
+            return {}
+        return dict(data.get('entries', {}))
+
+    def save(self):
+        """Writes the crossover table to the cache file.
+
+        The file is replaced atomically, and a cache that cannot be written
+        only costs a calibration in the next process.
+        """
+        try:
+            os.makedirs(os.path.dirname(self.cache_path) or '.', exist_ok=True)
+            tmp_path = '%s.%d.tmp' % (self.cache_path, os.getpid())
+            with open(tmp_path, 'w') as f:
+                json.dump({'version': CACHE_VERSION, 'entries': self.table}, f, indent=1, sort_keys=True)
+            os.replace(tmp_path, self.cache_path)
+        except OSError:
+            pass
+
+    def clear(self):
+        """Forgets every calibration, in memory and on disk.
+        """
+        with self.lock:
+            self.table = {}
+            self.save()
+
+
+tuner = MultiplyTuner()
+
+def autotune_enabled() -> bool:
+    return os.environ.get('FHE_PY_AUTOTUNE', '0') != '0'
@@ -0,0 +1,62 @@
+"""
+Evaluation-domain Polynomial Module
+"""
+from __future__ import annotations
+
+import numpy as np
+
+from util.math.crt import CRTContext
+from util.math.galois import get_galois_tables
+from util.polynomial import Polynomial
+
+class NTTPolynomial:
+    """A polynomial in the ring R_Q held in evaluation (NTT) form.
+
+    R_Q: quotient ring Z_Q[x]/(x^d + 1), where Q is the product of the
+    primes of a CRTContext.
+
+    Instead of coefficients, we keep the negacyclic NTT of the polynomial
+    modulo each prime, as a (num_primes, d) array of uint64 residues. Sums and
+    products are computed pointwise without leaving this form, and the integer
+    coefficients are recovered with to_polynomial. Results are exact as long as
+    the true coefficients stay below Q / 2 in absolute value.
+    """
+    __slots__ = ('crt', 'degree', 'values')
+
+    def __init__(self, crt: CRTContext, values: np.ndarray):
+        assert values.shape == (len(crt.primes), crt.poly_degree), \
+            'NTT values shape %s does not match CRT context' % (values.shape,)
+        self.crt = crt
+        self.degree = crt.poly_degree
+        self.values = values
+
+    @classmethod
+    def from_polynomial(cls, poly: Polynomial, crt: CRTContext) -> NTTPolynomial:
+        """Transforms a coefficient-form polynomial to NTT form.
+        """
+        assert poly.degree == crt.poly_degree, 'Poly size is not same'
+        return cls(crt, crt.ntt_fwd(poly.coeffs))
+
+    def to_polynomial(self) -> Polynomial:
+        """Transforms back to coefficients, centered in (-Q/2, Q/2].
+        """
+        return Polynomial(self.degree, self.crt.ntt_inv(self.values, centered=True))
+
+    def add(self, poly: NTTPolynomial) -> NTTPolynomial:
+        assert self.crt is poly.crt, 'CRT contexts are not same'
+        return NTTPolynomial(self.crt, self.crt.rns_add(self.values, poly.values))
+
+    def subtract(self, poly: NTTPolynomial) -> NTTPolynomial:
+        assert self.crt is poly.crt, 'CRT contexts are not same'
+        return NTTPolynomial(self.crt, self.crt.rns_subtract(self.values, poly.values))
+
+    def automorphism(self, galois_elt: int) -> NTTPolynomial:
+        """Applies m(X) -> m(X^k) for an odd k, as one permutation of the NTT values.
+        """
+        return NTTPolynomial(self.crt, get_galois_tables(self.degree, galois_elt).apply_ntt(self.values))
+
+    def multiply(self, poly: NTTPolynomial) -> NTTPolynomial:
+        """Multiplies two polynomials pointwise in the evaluation domain.
+        """
+        assert self.crt is poly.crt, 'CRT contexts are not same'
+        return NTTPolynomial(self.crt, self.crt.rns_multiply(self.values, poly.values))
@@ -0,0 +1,83 @@
+"""
+Packed Polynomial Module
+"""
+from __future__ import annotations
+
+from typing import Optional
+
+import numpy as np
+
+from util.polynomial import Polynomial
+
+class PackedPolynomial:
+    """A polynomial in the ring R_q stored compactly for keeping in memory.
+
+    R_q: quotient ring Z_q[x]/(x^d + 1).
+
+    A Polynomial keeps a list of Python integers, each of which costs 28 bytes
+    plus 4 bytes per 30 bits, and another 8 bytes for the list entry. Here the
+    residues in [0, q) are stored as fixed-width little-endian integers of
+    ceil(log2(q) / 8) bytes, back to back in a single bytes object. This
+    representation only stores values. Convert back with to_polynomial before
+    doing arithmetic.
+    """
+    __slots__ = ('degree', 'modulus', 'width', 'data')
+
+    def __init__(self, degree: int, modulus: int, data: bytes):
+        self.degree = degree
+        self.modulus = modulus
+        self.width = self.packed_width(modulus)
+        assert len(data) == degree * self.width, 'Packed size %d is not equal to %d' % (len(data), degree * self.width)
+        self.data = data
+
+    @staticmethod
+    def packed_width(modulus: int) -> int:
+        """Returns the number of bytes per residue modulo q.
+        """
+        return max(((modulus - 1).bit_length() + 7) // 8, 1)
+
+    @classmethod
+    def from_polynomial(cls, poly: Polynomial, modulus: int) -> PackedPolynomial:
+        """Packs the coefficients of a polynomial reduced modulo q.
+        """
+        width = cls.packed_width(modulus)
+        residues = poly.mod(modulus).coeffs
+        if width <= 8:
+            words = np.array(residues, dtype='<u8').view(np.uint8).reshape(-1, 8)
+            data = words[:, :width].tobytes()
+        else:
+            data = b''.join(c.to_bytes(width, 'little') for c in residues)
+        return cls(poly.degree, modulus, data)
+
+    def to_polynomial(self, centered: bool = False) -> Polynomial:
+        """Unpacks the residues, in [0, q) or, if centered, in (-q/2, q/2].
+        """
+        width = self.width
+        if width <= 8:
+            words = np.zeros((self.degree, 8), dtype=np.uint8)
+            words[:, :width] = np.frombuffer(self.data, dtype=np.uint8).reshape(-1, width)
+            coeffs = words.view('<u8').ravel().tolist()
+        else:
+            data = self.data
+            coeffs = [int.from_bytes(data[i:i + width], 'little') for i in range(0, len(data), width)]
+        poly = Polynomial(self.degree, coeffs)
+        return poly.mod_small(self.modulus) if centered else poly
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.data)
+
+def pack(poly, modulus: Optional[int]):
+    """Packs a Polynomial modulo q, passing already packed values through.
+    """
+    if isinstance(poly, PackedPolynomial):
+        return poly
+    assert modulus, 'A modulus is required to pack a polynomial'
+    return PackedPolynomial.from_polynomial(poly, modulus)
+
+def unpack(poly) -> Polynomial:
+    """Unpacks a PackedPolynomial, passing Polynomials through.
+    """
+    if isinstance(poly, PackedPolynomial):
+        return poly.to_polynomial()
+    return poly
@@ -3,13 +3,34 @@ Polynomial Ring Module
 """
 from __future__ import annotations
 
+import numbers
 from typing import List, Optional, Sequence
 
-from util.math.crt import CRTContext
-from util.math.ntt import FFTContext, NTTContext
+import numpy as np
+
+from util.math.backend import get_backend
+from util.math.context_registry import get_fft_context, get_ntt_context
+from util.math.crt import CRTContext, get_crt_context
+from util.math.galois import conjugation_element, galois_element, get_galois_tables
+from util.math.ntt import NTTContext
+from util.multiply_tuner import STRATEGIES, autotune_enabled, tuner
 
 Vector = Sequence[int | float]
 
+# Without the auto-tuner, products modulo q of integer polynomials of at least
+# this degree are computed with NTTs over auxiliary primes, and products of
+# degree at least KRONECKER_MIN_DEGREE below it with Kronecker substitution.
+# Smaller products use the schoolbook loop.
+AUX_NTT_MIN_DEGREE = 512
+AUX_PRIME_SIZE = 59
+KRONECKER_MIN_DEGREE = 16
+
+# Bits of the float64 mantissa reserved for rounding errors of the FFT in
+# exact_fft_multiply. The largest limb limb_bits is chosen so that limb
+# products summed over the transform stay below 2^(53 - FFT_ERROR_BITS).
+FFT_ERROR_BITS = 11
+FFT_MAX_LIMB_BITS = 16
+
 class Polynomial:
     """A polynomial in the ring R_a
     R: quotient ring Z[x]/f(x)
@@ -18,7 +39,12 @@ class Polynomial:
     This polynomial keeps track of the ring degree d,
     the coefficient modulus a,
     and the coefficients in an array.
+
+    Coefficient-wise arithmetic runs on the backend of util.math.backend.
+    For compact storage, see util.packed_polynomial and util.rns_polynomial.
     """
+    __slots__ = ('degree', 'coeffs')
+
     def __init__(self, degree: int, coeffs: Vector):
         self.degree = degree
         assert len(coeffs) == degree, 'Polynomial size %d is not equal to %d' %(len(coeffs), degree)
@@ -26,18 +52,82 @@ class Polynomial:
 
     def add(self, poly: Polynomial, coeff_modulus: Optional[int] = None) -> Polynomial:
         assert self.degree == poly.degree, 'Poly size is not same'
-        new_coeffs = [self.coeffs[i] + poly.coeffs[i] for i in range(self.degree)]
-        
-        if coeff_modulus:
-            new_coeffs = [c % coeff_modulus for c in new_coeffs]
-            
-        return Polynomial(self.degree, new_coeffs)
-            
+        return Polynomial(self.degree, get_backend().add(self.coeffs, poly.coeffs, coeff_modulus))
 
     def subtract(self, poly: Polynomial, coeff_modulus: Optional[int] = None) -> Polynomial:
-        # inverse the polynomial
-        poly = Polynomial(poly.degree, [-x for x in poly.coeffs])
-        return self.add(poly, coeff_modulus)
+        assert self.degree == poly.degree, 'Poly size is not same'
+        return Polynomial(self.degree, get_backend().subtract(self.coeffs, poly.coeffs, coeff_modulus))
+
+    def iadd(self, poly: Polynomial, coeff_modulus: Optional[int] = None) -> Polynomial:
+        """Adds poly to this polynomial in place. Returns self.
+
+        The coefficient list is overwritten, so every holder of it sees the sum.
+        """
+        assert self.degree == poly.degree, 'Poly size is not same'
+        self.coeffs[:] = get_backend().add(self.coeffs, poly.coeffs, coeff_modulus)
+        return self
+
+    def isub(self, poly: Polynomial, coeff_modulus: Optional[int] = None) -> Polynomial:
+        """Subtracts poly from this polynomial in place. Returns self.
+        """
+        assert self.degree == poly.degree, 'Poly size is not same'
+        self.coeffs[:] = get_backend().subtract(self.coeffs, poly.coeffs, coeff_modulus)
+        return self
+
+    def imul_scalar(self, scalar: int, coeff_modulus: Optional[int] = None) -> Polynomial:
+        """Multiplies this polynomial by a scalar in place. Returns self.
+        """
+        self.coeffs[:] = get_backend().scalar_multiply(self.coeffs, scalar, coeff_modulus)
+        return self
+
+    def ireduce(self, coeff_modulus: int, centered: bool = False) -> Polynomial:
+        """Reduces the coefficients in place, to (-q/2, q/2] if centered, else to [0, q). Returns self.
+        """
+        backend = get_backend()
+        if centered:
+            self.coeffs[:] = backend.mod_small(self.coeffs, coeff_modulus)
+        else:
+            self.coeffs[:] = backend.mod(self.coeffs, coeff_modulus)
+        return self
+
+    def add_reduce(self, poly: Polynomial, coeff_modulus: int, centered: bool = False) -> Polynomial:
+        """Adds two polynomials and reduces the sum modulo q in a single pass.
+
+        Equivalent to add(poly, q), followed by mod_small(q) if centered.
+        """
+        assert self.degree == poly.degree, 'Poly size is not same'
+        return Polynomial(self.degree, get_backend().add_reduce(self.coeffs, poly.coeffs, coeff_modulus, centered))
+
+    def multiply_add(self, poly: Polynomial, addend: Polynomial, coeff_modulus: int,
+                     centered: bool = False) -> Polynomial:
+        """Computes self * poly + addend modulo q.
+
+        The sum is reduced together with the addition, in add_reduce.
+        """
+        return self.multiply(poly, coeff_modulus).add_reduce(addend, coeff_modulus, centered)
+
+    def divide_round_reduce(self, divisor: int, coeff_modulus: int, addend: Optional[Polynomial] = None,
+                            center_modulus: Optional[int] = None) -> Polynomial:
+        """Divides by a scalar, rounding down, adds a polynomial and reduces modulo q in a single pass.
+
+        Equivalent to mod_small(center_modulus).divide(divisor).add(addend, q).mod_small(q),
+        where the first and third steps are skipped without center_modulus and addend.
+
+        Args:
+            divisor (int): Scalar to divide by.
+            coeff_modulus (int): Modulus q of the result.
+            addend (Polynomial): Polynomial to add after the division, if any.
+            center_modulus (int): Modulus to center the coefficients with before the division, if any.
+
+        Returns:
+            A Polynomial with coefficients in (-q/2, q/2].
+        """
+        addend_coeffs = None
+        if addend is not None:
+            assert self.degree == addend.degree, 'Poly size is not same'
+            addend_coeffs = addend.coeffs
+        return Polynomial(self.degree, get_backend().divide_round_reduce(
+            self.coeffs, divisor, coeff_modulus, addend_coeffs, center_modulus))
 
     def multiply(
         self,
@@ -45,37 +135,187 @@ class Polynomial:
         coeff_modulus: Optional[int] = None,
         ntt: Optional[NTTContext] = None,
         crt: Optional[CRTContext] = None,
+        strategy: Optional[str] = None,
     ) -> Polynomial:
+        """Multiplies two polynomials, optionally modulo coeff_modulus.
+
+        A given CRT or NTT context is used as is. Otherwise integer polynomials
+        of equal degree are multiplied with the named strategy (a key of
+        util.multiply_tuner.STRATEGIES) or, by default, with the one picked by
+        default_strategy, or by the auto-tuner if FHE_PY_AUTOTUNE=1. The
+        reference backend always uses the schoolbook loop. All strategies give
+        the same result.
+        """
         if crt: return self.crt_multiply(poly, crt)
         
         if ntt:
-            a = ntt.ftt_fwd(self.coeffs)
-            b = ntt.ftt_fwd(poly.coeffs)
-            ab = [a[i] * b[i] for i in range(self.degree)]
-            prod = ntt.ftt_inv(ab)
+            prod = ntt.negacyclic_multiply(self.coeffs, poly.coeffs)
             return Polynomial(self.degree, prod)
-        
-        return self.simple_multiply(poly, coeff_modulus)
+
+        if self.degree != poly.degree or not (self.has_integer_coeffs() and poly.has_integer_coeffs()):
+            return self.simple_multiply(poly, coeff_modulus)
+
+        if strategy is None:
+            strategy = get_backend().multiply_strategy
+        if strategy is None:
+            if autotune_enabled():
+                strategy = tuner.choose(self, poly, coeff_modulus)
+            else:
+                strategy = self.default_strategy(poly, coeff_modulus)
+        return getattr(self, STRATEGIES[strategy])(poly, coeff_modulus)
+
+    def default_strategy(self, poly: Polynomial, coeff_modulus: Optional[int] = None) -> str:
+        """Picks a multiplication strategy with static heuristics, for use without the auto-tuner.
+        """
+        if coeff_modulus:
+            # Imported here, as TernaryPolynomial builds on Polynomial.
+            from util.ternary_polynomial import TernaryPolynomial
+            for sparse in (poly, self):
+                if sparse.is_ternary():
+                    ternary = TernaryPolynomial.from_polynomial(sparse)
+                    # Shift-and-add beats both the schoolbook loop and Kronecker substitution.
+                    if not self.supports_aux_multiply(poly) or ternary.prefers_shift_add(coeff_modulus):
+                        return 'ternary'
+                    break
+
+            if self.supports_aux_multiply(poly):
+                return 'aux_ntt'
+
+        if self.supports_kronecker_multiply(poly):
+            return 'kronecker'
+        return 'schoolbook'
+
+    def is_ternary(self) -> bool:
+        """Checks whether all coefficients are in {-1, 0, 1}.
+        """
+        return all(c in (-1, 0, 1) for c in self.coeffs)
+
+    def ternary_multiply(self, poly: Polynomial, coeff_modulus: Optional[int] = None) -> Polynomial:
+        """Multiplies by poly with sparse shift-and-add. One of the two polynomials must be ternary.
+        """
+        from util.ternary_polynomial import TernaryPolynomial
+        (dense, sparse) = (self, poly) if poly.is_ternary() else (poly, self)
+        return TernaryPolynomial.from_polynomial(sparse).multiply(dense, coeff_modulus)
+
+    def prime_ntt_multiply(self, poly: Polynomial, coeff_modulus: int) -> Polynomial:
+        """Multiplies two polynomials modulo an NTT-friendly prime q = 1 (mod 2d) with the shared NTTContext.
+        """
+        ntt = get_ntt_context(self.degree, coeff_modulus)
+        return Polynomial(self.degree, ntt.negacyclic_multiply(self.coeffs, poly.coeffs))
+
+    def has_integer_coeffs(self) -> bool:
+        return all(isinstance(c, numbers.Integral) for c in self.coeffs)
+
+    def supports_aux_multiply(self, poly: Polynomial) -> bool:
+        """Checks whether aux_multiply applies: integer coefficients, equal
+        power-of-two degrees, and a degree large enough to beat kronecker_multiply.
+        """
+        degree = self.degree
+        return degree == poly.degree and degree >= AUX_NTT_MIN_DEGREE and degree & (degree - 1) == 0 \
+            and self.has_integer_coeffs() and poly.has_integer_coeffs()
+
+    def supports_kronecker_multiply(self, poly: Polynomial) -> bool:
+        """Checks whether kronecker_multiply applies: integer coefficients, equal
+        degrees, and a degree large enough to beat simple_multiply.
+        """
+        return self.degree == poly.degree and self.degree >= KRONECKER_MIN_DEGREE \
+            and self.has_integer_coeffs() and poly.has_integer_coeffs()
+
+    def aux_multiply(self, poly: Polynomial, coeff_modulus: int) -> Polynomial:
+        """Multiplies two polynomials modulo any coefficient modulus using auxiliary NTT primes.
+
+        The coefficient modulus need not be NTT-friendly. Both inputs are centered
+        modulo q, so every coefficient of their exact product is at most
+        d * (q/2)^2 in absolute value. We pick enough auxiliary primes to hold
+        that product, multiply in their CRT basis, and reduce the result modulo q.
+
+        Args:
+            poly (Polynomial): Polynomial to multiply by.
+            coeff_modulus (int): Modulus q of the result.
+
+        Returns:
+            A Polynomial whose coefficients are in [0, q).
+        """
+        bound = self.degree * (coeff_modulus // 2 + 1) ** 2
+        num_primes = (bound.bit_length() + 1) // AUX_PRIME_SIZE + 1
+        crt = get_crt_context(num_primes, AUX_PRIME_SIZE, self.degree)
+        prod = self.mod_small(coeff_modulus).crt_multiply(poly.mod_small(coeff_modulus), crt)
+        return Polynomial(self.degree, [c % coeff_modulus for c in prod.coeffs])
     
     def crt_multiply(self, poly: Polynomial, crt: CRTContext) -> Polynomial:
+        if crt.vectorized:
+            # Both inputs are transformed in place in the scratch arrays of the context.
+            inputs = crt.scratch.get('multiply_inputs', (2, len(crt.primes), self.degree))
+            prod = crt.rns_multiply(crt.ntt_fwd(self.coeffs, out=inputs[0]), crt.ntt_fwd(poly.coeffs, out=inputs[1]))
+            return Polynomial(self.degree, crt.ntt_inv(prod, centered=True))
+
         poly_prods = []
         for i in range(len(crt.primes)):
             prod = self.multiply(poly, crt.primes[i], ntt=crt.ntts[i])
             poly_prods.append(prod)
             
-        final_coeffs = [0] * self.degree
-        for i in range(self.degree):
-            values = [p.coeffs[i] for p in poly_prods]
-            final_coeffs[i] = crt.reconstruct(values)
-            
-        return Polynomial(self.degree, final_coeffs).mod_small(crt.modulus)
+        final_coeffs = crt.reconstruct_batch([p.coeffs for p in poly_prods], centered=True)
+        return Polynomial(self.degree, final_coeffs)
     
+    def kronecker_multiply(self, poly: Polynomial, coeff_modulus: Optional[int] = None) -> Polynomial:
+        """Multiplies two polynomials with Kronecker substitution.
+
+        Each polynomial is packed into one integer with coefficient i in bit
+        slot i of width w, i.e. evaluated at x = 2^w, so that one big integer
+        product (computed by CPython with Karatsuba) yields all coefficients of
+        the linear convolution. Signed coefficients pack as a difference of the
+        packed positive and negative parts. Adding 2^(w-1) to every slot of the
+        product makes all slots non-negative, so they can be read back without
+        carries; the upper half is then folded onto the lower one, since
+        x^d = -1.
+
+        Args:
+            poly (Polynomial): Polynomial to multiply by.
+            coeff_modulus (int): Modulus q of the result, if any. Inputs are
+                centered modulo q first.
+
+        Returns:
+            A Polynomial which is the product, with coefficients in [0, q)
+            when a modulus is given.
+        """
+        assert self.degree == poly.degree, 'Poly size is not same'
+        degree = self.degree
+        (a, b) = (self, poly)
+        if coeff_modulus:
+            (a, b) = (self.mod_small(coeff_modulus), poly.mod_small(coeff_modulus))
+        (max_a, max_b) = (max(abs(c) for c in a.coeffs), max(abs(c) for c in b.coeffs))
+        # Slots must hold the inputs as well as the convolution.
+        bound = max(degree * max_a * max_b, max_a, max_b)
+        slot_bytes = (bound.bit_length() + 2 + 7) // 8
+        num_slots = 2 * degree - 1
+
+        def pack(coeffs):
+            positive = b''.join(max(c, 0).to_bytes(slot_bytes, 'little') for c in coeffs)
+            negative = b''.join(max(-c, 0).to_bytes(slot_bytes, 'little') for c in coeffs)
+            return int.from_bytes(positive, 'little') - int.from_bytes(negative, 'little')
+
+        half = 1 << (8 * slot_bytes - 1)
+        bias = int.from_bytes(half.to_bytes(slot_bytes, 'little') * num_slots, 'little')
+        packed = (pack(a.coeffs) * pack(b.coeffs) + bias).to_bytes(slot_bytes * num_slots, 'little')
+        conv = [int.from_bytes(packed[i:i + slot_bytes], 'little') - half
+                for i in range(0, slot_bytes * num_slots, slot_bytes)]
+        conv.append(0)
+        new_coeffs = [conv[i] - conv[i + degree] for i in range(degree)]
+        if coeff_modulus:
+            new_coeffs = [c % coeff_modulus for c in new_coeffs]
+        return Polynomial(degree, new_coeffs)
+
     def fft_multiply(self, poly: Polynomial, round=True) -> Polynomial:
         """Multiplies two polynomials using FFT.
+
+        Integer polynomials with rounding requested take the exact
+        exact_fft_multiply path.
         """
         assert isinstance(poly, Polynomial)
+        if round and self.degree == poly.degree and self.has_integer_coeffs() and poly.has_integer_coeffs():
+            return self.exact_fft_multiply(poly)
         
-        fft = FFTContext(self.degree * 8)
+        fft = get_fft_context(self.degree * 8)
         a = fft.fft_fwd(self.coeffs + [0] * self.degree) # type: ignore
         b = fft.fft_fwd(poly.coeffs + [0] * self.degree) # type: ignore
         ab = [a[i] * b[i] for i in range(self.degree * 2)]
@@ -94,6 +334,71 @@ class Polynomial:
         else:
             return Polynomial(self.degree, poly_prod)
         
+    def exact_fft_multiply(self, poly: Polynomial, coeff_modulus: Optional[int] = None) -> Polynomial:
+        """Multiplies two integer polynomials exactly with floating-point FFTs.
+
+        Coefficients are split into balanced limbs of at most FFT_MAX_LIMB_BITS
+        bits, so that every limb product fits the float64 mantissa. All limbs
+        are transformed in one batched numpy.fft call. The negacyclic product
+        of length d comes from a cyclic one by weighting coefficient j with
+        w^j, where w = exp(i * pi / d), so no zero padding is needed. Products
+        of limb polynomials are summed per limb position in the frequency
+        domain, and the rounded results are recombined with carries.
+
+        Args:
+            poly (Polynomial): Polynomial to multiply by.
+            coeff_modulus (int): Modulus q of the result, if any. Inputs are
+                centered modulo q first.
+
+        Returns:
+            A Polynomial which is the product, with coefficients in [0, q)
+            when a modulus is given.
+        """
+        assert self.degree == poly.degree, 'Poly size is not same'
+        degree = self.degree
+        (a, b) = (self, poly)
+        if coeff_modulus:
+            (a, b) = (self.mod_small(coeff_modulus), poly.mod_small(coeff_modulus))
+        max_bits = max(abs(c).bit_length() for c in a.coeffs + b.coeffs)
+
+        limb_bits = FFT_MAX_LIMB_BITS
+        while True:
+            num_limbs = max_bits // limb_bits + 2
+            growth = (degree * num_limbs).bit_length()
+            if 2 * limb_bits - 2 + growth <= 53 - FFT_ERROR_BITS or limb_bits == 1:
+                break
+            limb_bits -= 1
+
+        def split(coeffs):
+            # Balanced limbs in [-2^(b-1), 2^(b-1)); arithmetic shifts keep the sign.
+            dtype = np.int64 if max_bits < 62 else object
+            rest = np.array(coeffs, dtype=dtype)
+            limbs = np.empty((num_limbs, degree), dtype=np.float64)
+            (half, mask) = (1 << (limb_bits - 1), (1 << limb_bits) - 1)
+            for i in range(num_limbs):
+                limb = ((rest + half) & mask) - half
+                limbs[i] = limb
+                rest = (rest - limb) >> limb_bits
+            return limbs
+
+        weights = np.exp(1j * np.pi * np.arange(degree) / degree)
+        (fa, fb) = np.fft.fft(np.stack((split(a.coeffs), split(b.coeffs))) * weights, axis=-1)
+        conv = np.empty((2 * num_limbs - 1, degree), dtype=np.complex128)
+        for s in range(2 * num_limbs - 1):
+            lo = max(0, s - num_limbs + 1)
+            hi = min(s, num_limbs - 1)
+            conv[s] = (fa[lo:hi + 1] * fb[s - hi:s - lo + 1][::-1]).sum(axis=0)
+        conv = np.fft.ifft(conv, axis=-1) * weights.conj()
+        limb_prods = np.rint(conv.real).astype(np.int64)
+
+        result = limb_prods[-1].astype(object)
+        for s in range(2 * num_limbs - 3, -1, -1):
+            result = (result << limb_bits) + limb_prods[s].astype(object)
+        new_coeffs = result.tolist()
+        if coeff_modulus:
+            new_coeffs = [c % coeff_modulus for c in new_coeffs]
+        return Polynomial(degree, new_coeffs)
+
     def simple_multiply(self, poly: Polynomial, coeff_modulus: Optional[int] = None) -> Polynomial:
         deg = min(poly.degree, self.degree)
         new_coeffs: List[float] = [0] * deg
@@ -116,25 +421,15 @@ class Polynomial:
     def scalar_multiply(self, scalar: float, coeff_modulus: Optional[int] = None) -> Polynomial:
         """Multiplies polynomial by a scalar.
         """
-        if coeff_modulus:
-            new_coeffs = [(c * scalar) % coeff_modulus for c in self.coeffs]
-        else:
-            new_coeffs = [c * scalar for c in self.coeffs]
-        return Polynomial(self.degree, new_coeffs)
+        return Polynomial(self.degree, get_backend().scalar_multiply(self.coeffs, scalar, coeff_modulus))
         
     def divide(self, scalar: int, coeff_modulus: Optional[int] = None) -> Polynomial:
         """Divides polynomial by a scalar.
         """
-        new_coeffs = [(c // scalar) for c in self.coeffs if coeff_modulus]
-        
-        if coeff_modulus:
-            new_coeffs = [c % coeff_modulus for c in new_coeffs]
-            
-        return Polynomial(self.degree, new_coeffs)
+        return Polynomial(self.degree, get_backend().divide(self.coeffs, scalar, coeff_modulus))
 
     def mod(self, coeff_modulus: int) -> Polynomial:
-        new_coeffs = [c % coeff_modulus for c in self.coeffs]
-        return Polynomial(self.degree, new_coeffs)
+        return Polynomial(self.degree, get_backend().mod(self.coeffs, coeff_modulus))
     
     def mod_small(self, coeff_modulus: int) -> Polynomial:
         """Turns all coefficients in the given coefficient modulus
@@ -150,15 +445,7 @@ class Polynomial:
         Returns:
             A Polynomial whose coefficients are modulo coeff_modulus.
         """
-        try:
-            new_coeffs = [c % coeff_modulus for c in self.coeffs]
-            new_coeffs = [c - coeff_modulus if c > coeff_modulus // 2 else c for c in new_coeffs]
-        except:
-            print(self.coeffs)
-            print(coeff_modulus)
-            new_coeffs = [c % coeff_modulus for c in self.coeffs]
-            new_coeffs = [c - coeff_modulus if c > coeff_modulus // 2 else c for c in new_coeffs]
-        return Polynomial(self.degree, new_coeffs)
+        return Polynomial(self.degree, get_backend().mod_small(self.coeffs, coeff_modulus))
         
     def rotate(self, r: int) -> Polynomial:
         """Rotates plaintext polynomial by r steps.
@@ -167,6 +454,8 @@ class Polynomial:
         
         Applying the transformation m(X) -> m(X^k) where k = 5^r in the ciphertext polynomial.
         """
+        if self.degree & (self.degree - 1) == 0:
+            return self.automorphism(galois_element(r, self.degree))
         k = 5 ** r
         new_coeffs = [0.] * self.degree
         for i in range(self.degree):
@@ -183,13 +472,38 @@ class Polynomial:
         
         Applying the transformation m(X) -> m(X^{-1}).
         """
+        if self.degree & (self.degree - 1) == 0:
+            return self.automorphism(conjugation_element(self.degree))
         new_coeffs = [0.] * self.degree
         new_coeffs[0] = self.coeffs[0]
         for i in range(1, self.degree):
             new_coeffs[i] = -self.coeffs[self.degree - i]
             
         return Polynomial(self.degree, new_coeffs)
+
+    def automorphism(self, galois_elt: int) -> Polynomial:
+        """Applies m(X) -> m(X^k) for an odd k, with the cached permutation table of (d, k).
+
+        The degree must be a power of two.
+        """
+        return Polynomial(self.degree, get_galois_tables(self.degree, galois_elt).apply(self.coeffs))
     
+    def signed_decompose(self, base: int, num_levels: int) -> list[Polynomial]:
+        """Decomposes integer coefficients into balanced digits.
+        base (B): base to decompose coefficients into, even.
+        num_levels: number of digits, with |f(x)| < B^num_levels / 2.
+        [f_0(x), f_1(x), ..., f_(num_levels-1)(x)] with f(x) = sum_i f_i(x) * B^i and coefficients in [-B/2, B/2)
+        """
+        half = base // 2
+        coeffs = self.coeffs
+        decomposed = []
+        for _ in range(num_levels):
+            digits = [(c + half) % base - half for c in coeffs]
+            decomposed.append(Polynomial(self.degree, digits))
+            coeffs = [(c - d) // base for c, d in zip(coeffs, digits)]
+        assert not any(coeffs), 'Coefficients do not fit in %d digits of base %d' % (num_levels, base)
+        return decomposed
+
     def base_decompose(self, base: int, num_levels: int) -> list[Polynomial]:
         """Decomposes the polynomial into base.
         base (T): base to decompose coefficients into.
@@ -209,18 +523,12 @@ class Polynomial:
     def round(self) -> Polynomial:
         """Rounds all coefficients to nearest integer.
         """
-        if type(self.coeffs[0]) == complex:
-            new_coeffs = [round(c.real) for c in self.coeffs]
-        else:
-            new_coeffs = [round(c) for c in self.coeffs]
-            
-        return Polynomial(self.degree, new_coeffs)
+        return Polynomial(self.degree, get_backend().round(self.coeffs))
             
     def floor(self) -> Polynomial:
         """Rounds all coefficients down to the nearest integer.
         """
-        new_coeffs = [int(c) for c in self.coeffs]  
-        return Polynomial(self.degree, new_coeffs)
+        return Polynomial(self.degree, get_backend().floor(self.coeffs))
         
     def __str__(self) -> str:
         """Represents polynomial as a readable string.
@@ -1,37 +1,192 @@
+"""Samplers for keys, errors and encryption randomness.
+
+Samples are drawn in bulk from a SHAKE-128 stream and mapped to the target
+distributions with vectorized NumPy operations, instead of one call to the
+Mersenne Twister per coefficient. Each sampler of polynomial coefficients
+returns a list of integers, or, if given a CRTContext, the array of residues
+of the samples modulo every prime, ready for NTTPolynomial or RNSPolynomial.
+"""
+import hashlib
+import itertools
+import math
+import os
 import random
-from typing import List
+from typing import List, Optional
+
+import numpy as np
+
+DEFAULT_SIGMA = 3.2
+
+class RandomSource:
+    """A seeded cryptographically secure stream of random bytes.
+
+    Block i of the stream is SHAKE-128(seed || i), of any requested length,
+    so the same seed always yields the same samples.
+    """
+
+    def __init__(self, seed: Optional[bytes] = None):
+        self.seed = os.urandom(32) if seed is None else seed
+        self.counter = itertools.count()
+
+    def read(self, num_bytes: int) -> bytes:
+        """Returns the next num_bytes random bytes.
+        """
+        block = next(self.counter).to_bytes(8, 'little')
+        return hashlib.shake_128(self.seed + block).digest(num_bytes)
+
+    def uint64(self, num: int) -> np.ndarray:
+        """Returns an array of num uniform 64-bit words.
+        """
+        return np.frombuffer(self.read(8 * num), dtype='<u8').astype(np.uint64)
+
+_default_source = RandomSource()
+
+def _reseed_default_source():
+    global _default_source
+    _default_source = RandomSource()
+
+# Forked workers must not replay the samples of their parent.
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reseed_default_source)
+
+def seed_sampling(seed: Optional[bytes] = None):
+    """Reseeds the default source, from fresh OS randomness if seed is None.
+    """
+    global _default_source
+    _default_source = RandomSource(seed)
+
+def get_source(source: Optional[RandomSource] = None) -> RandomSource:
+    return _default_source if source is None else source
+
+def _num_draws(num: int, bound: int, bits: int) -> int:
+    """Returns how many candidates of the given bit length to draw for num samples below bound.
+
+    Candidates are accepted with probability bound / 2^bits, at least 1/2;
+    a small margin makes a second round rare.
+    """
+    return (num << bits) // bound * 21 // 20 + 16
+
+def uniform_array(bound: int, num: int, source: Optional[RandomSource] = None) -> np.ndarray:
+    """Samples a uint64 array of num values from [0, bound), for bound <= 2^64.
 
-def sample_uniform(min: int, max: int, num: int) -> List[int]:    
+    Each value is the top bits of a 64-bit word, rejected when not below
+    bound, so fewer than half the words are rejected on average.
+    """
+    assert 0 < bound <= 1 << 64, 'Bound %d does not fit in 64 bits' % bound
+    if bound == 1:
+        return np.zeros(num, dtype=np.uint64)
+    source = get_source(source)
+    bits = (bound - 1).bit_length()
+    shift = np.uint64(64 - bits)
+    result = np.empty(num, dtype=np.uint64)
+    filled = 0
+    while filled < num:
+        words = source.uint64(_num_draws(num - filled, bound, bits)) >> shift
+        accepted = words[words <= np.uint64(bound - 1)][:num - filled]
+        result[filled:filled + len(accepted)] = accepted
+        filled += len(accepted)
+    return result
+
+def sample_uniform(min: int, max: int, num: int, source: Optional[RandomSource] = None) -> List[int]:
     """Samples from a uniform distribution.
+
+    Values in [min, max), drawn by rejection sampling. Ranges wider than 64
+    bits, such as [0, big_modulus^2) for switching keys, are read as
+    fixed-width integers from one bulk draw of bytes.
+    """
+    bound = max - min
+    if bound <= 1 << 64:
+        values = uniform_array(bound, num, source).tolist()
+    else:
+        source = get_source(source)
+        bits = (bound - 1).bit_length()
+        width = (bits + 7) // 8
+        excess = 8 * width - bits
+        values = []
+        while len(values) < num:
+            draw = num - len(values)
+            data = memoryview(source.read(width * _num_draws(draw, bound, bits)))
+            candidates = [int.from_bytes(data[i:i + width], 'little') >> excess for i in range(0, len(data), width)]
+            values.extend(itertools.islice((v for v in candidates if v < bound), draw))
+    if min:
+        values = [v + min for v in values]
+    return values
+
+def sample_uniform_rns(crt, num: int, source: Optional[RandomSource] = None) -> np.ndarray:
+    """Samples values uniform modulo the product of the primes of a CRTContext, in RNS form.
+
+    By the Chinese Remainder Theorem, independent uniform residues modulo each
+    prime are a uniform value modulo their product.
+
+    Returns:
+        Array of shape (num_primes, num) of residues.
+    """
+    return np.array([uniform_array(p, num, source) for p in crt.primes])
+
+def _emit(values: np.ndarray, crt):
+    """Returns signed samples as a list, or as residues modulo every prime of crt.
     """
-    return [random.randrange(min, max) for _ in range(num)]
+    if crt is None:
+        return values.tolist()
+    return crt.to_rns(values.tolist())
 
-def sample_triangle(num: int) -> List[int]:
+def sample_triangle(num: int, source: Optional[RandomSource] = None, crt=None):
     """Samples from a discrete triangle distribution.
     Samples values from [-1, 0, 1] with probabilities [0.25, 0.5, 0.25] respectively.
     """
-    sample = [0] * num
-    for i in range(num):
-        r = random.randrange(0, 4)
-        if r == 0: sample[i] = -1
-        elif r == 1: sample[i] = 1
-        else: sample[i] = 0
-        
-    return sample
+    r = np.frombuffer(get_source(source).read(num), dtype=np.uint8) & 3
+    values = np.where(r == 0, -1, np.where(r == 1, 1, 0)).astype(np.int64)
+    return _emit(values, crt)
 
-def sample_hamming_weight_vector(length: int, weight: int) -> List[int]:
+def sample_hamming_weight_vector(length: int, weight: int, source: Optional[RandomSource] = None, crt=None):
     """Samples from a Hamming weight distribution.
     from the set [-1, 0, 1] s.t. the resulting vector has exactly h nonzero values.
+
+    The positions are those of the smallest h of length random 64-bit keys,
+    a uniformly random subset, and each gets a random sign.
+    """
+    source = get_source(source)
+    samples = np.zeros(length, dtype=np.int64)
+    if weight:
+        positions = np.argpartition(source.uint64(length), weight - 1)[:weight]
+        signs = np.frombuffer(source.read(weight), dtype=np.uint8) & 1
+        samples[positions] = 1 - 2 * signs.astype(np.int64)
+    return _emit(samples, crt)
+
+_cdt_tables = {}
+
+def gaussian_cdt(sigma: float, tail: int = 12):
+    """Returns the cumulative distribution table of the discrete Gaussian.
+
+    Entry i is floor(2^63 * P(X <= i - t)) for X with P(X = x) proportional
+    to exp(-x^2 / (2 sigma^2)) on [-t, t], where t = ceil(tail * sigma). The
+    probabilities are computed in double precision.
+
+    Returns:
+        Tuple (table, t) of a uint64 array of 2t + 1 entries and the tail cut.
+    """
+    key = (sigma, tail)
+    if key not in _cdt_tables:
+        t = math.ceil(tail * sigma)
+        rho = [math.exp(-x * x / (2 * sigma * sigma)) for x in range(-t, t + 1)]
+        total = math.fsum(rho)
+        cumulative = itertools.accumulate(rho)
+        table = np.array([min(int(c / total * 2**63), 2**63) for c in cumulative], dtype=np.uint64)
+        table[-1] = 2**63
+        _cdt_tables[key] = (table, t)
+    return _cdt_tables[key]
+
+def sample_discrete_gaussian(num: int, sigma: float = DEFAULT_SIGMA, source: Optional[RandomSource] = None,
+                             crt=None):
+    """Samples from a discrete Gaussian distribution with a cumulative distribution table.
+
+    Each sample is the first table entry above a uniform 63-bit value, found
+    for all samples at once with a binary search over the table.
     """
-    samples = [0] * length
-    total_weight = 0
-    while total_weight < weight:
-        index = random.randrange(0, length)
-        if samples[index] == 0:
-            samples[index] = random.choice([-1, 1])
-            total_weight += 1
-            
-    return samples
+    table, t = gaussian_cdt(sigma)
+    u = get_source(source).uint64(num) >> np.uint64(1)
+    values = np.searchsorted(table, u, side='right').astype(np.int64) - t
+    return _emit(values, crt)
 
 def sample_random_complex_vector(length: int) -> List[complex]:
     """Samples a random complex vector.
@@ -41,4 +196,4 @@ def sample_random_complex_vector(length: int) -> List[complex]:
 def sample_random_real_vector(length: int) -> List[float]:
     """Samples a random real vector.
     """
-    return [random.random() for _ in range(length)]
\ No newline at end of file
+    return [random.random() for _ in range(length)]
@@ -0,0 +1,74 @@
+"""
+Double-CRT Polynomial Module
+"""
+from __future__ import annotations
+
+import numpy as np
+
+from util.math.crt import CRTContext
+from util.ntt_polynomial import NTTPolynomial
+from util.polynomial import Polynomial
+
+class RNSPolynomial:
+    """A polynomial in the ring R_Q held in residue number system (RNS) form.
+
+    R_Q: quotient ring Z_Q[x]/(x^d + 1), where Q is the product of the
+    primes of a CRTContext.
+
+    Coefficients are kept modulo each prime as a (num_primes, d) array of uint64
+    residues (limbs). Additions, negations and scalar products act limb-wise,
+    and products go through the negacyclic NTT of each limb, so no big integer
+    is built until to_polynomial is called. Results are exact as long as the
+    true coefficients stay below Q / 2 in absolute value.
+    """
+    __slots__ = ('crt', 'degree', 'values')
+
+    def __init__(self, crt: CRTContext, values: np.ndarray):
+        assert values.shape == (len(crt.primes), crt.poly_degree), \
+            'RNS values shape %s does not match CRT context' % (values.shape,)
+        self.crt = crt
+        self.degree = crt.poly_degree
+        self.values = values
+
+    @classmethod
+    def from_polynomial(cls, poly: Polynomial, crt: CRTContext) -> RNSPolynomial:
+        """Splits the coefficients of a polynomial into residues.
+        """
+        assert poly.degree == crt.poly_degree, 'Poly size is not same'
+        return cls(crt, crt.to_rns(poly.coeffs))
+
+    @classmethod
+    def from_ntt(cls, poly: NTTPolynomial) -> RNSPolynomial:
+        """Transforms an evaluation-form polynomial back to coefficient residues.
+        """
+        return cls(poly.crt, poly.crt.rns_ntt_inv(poly.values))
+
+    def to_ntt(self) -> NTTPolynomial:
+        """Transforms the residues to evaluation form.
+        """
+        return NTTPolynomial(self.crt, self.crt.rns_ntt_fwd(self.values))
+
+    def to_polynomial(self) -> Polynomial:
+        """Reconstructs the integer coefficients, centered in (-Q/2, Q/2].
+        """
+        return Polynomial(self.degree, self.crt.from_rns(self.values, centered=True))
+
+    def add(self, poly: RNSPolynomial) -> RNSPolynomial:
+        assert self.crt is poly.crt, 'CRT contexts are not same'
+        return RNSPolynomial(self.crt, self.crt.rns_add(self.values, poly.values))
+
+    def subtract(self, poly: RNSPolynomial) -> RNSPolynomial:
+        assert self.crt is poly.crt, 'CRT contexts are not same'
+        return RNSPolynomial(self.crt, self.crt.rns_subtract(self.values, poly.values))
+
+    def negate(self) -> RNSPolynomial:
+        return RNSPolynomial(self.crt, self.crt.rns_negate(self.values))
+
+    def multiply(self, poly: RNSPolynomial) -> RNSPolynomial:
+        """Multiplies two polynomials in R_Q through the NTT of each limb.
+        """
+        assert self.crt is poly.crt, 'CRT contexts are not same'
+        return RNSPolynomial.from_ntt(self.to_ntt().multiply(poly.to_ntt()))
+
+    def scalar_multiply(self, scalar: int) -> RNSPolynomial:
+        return RNSPolynomial(self.crt, self.crt.rns_scalar_multiply(self.values, scalar))
@@ -0,0 +1,132 @@
+"""
+Sparse Ternary Polynomial Module
+"""
+from __future__ import annotations
+
+import numbers
+from typing import List, Optional
+
+import numpy as np
+
+from util.polynomial import Polynomial
+
+class TernaryPolynomial:
+    """A polynomial in the ring Z[x]/(x^d + 1) with coefficients in {-1, 0, 1}.
+
+    Secret keys, errors and encryption randomness are of this form. Only the
+    positions of the +1 and -1 coefficients are kept, so a product with a
+    dense polynomial a is the sum of h negacyclic shifts x^i * a, where h is
+    the number of nonzero coefficients.
+    """
+    __slots__ = ('degree', 'plus', 'minus')
+
+    def __init__(self, degree: int, plus: List[int], minus: List[int]):
+        self.degree = degree
+        self.plus = plus
+        self.minus = minus
+
+    @classmethod
+    def from_polynomial(cls, poly: Polynomial) -> TernaryPolynomial:
+        """Collects the +1 and -1 positions of a ternary polynomial.
+
+        Raises:
+            ValueError: If some coefficient is not in {-1, 0, 1}.
+        """
+        plus = []
+        minus = []
+        for i, c in enumerate(poly.coeffs):
+            if c == 1:
+                plus.append(i)
+            elif c == -1:
+                minus.append(i)
+            elif c != 0:
+                raise ValueError("Coefficient %s at index %d is not ternary" % (c, i))
+        return cls(poly.degree, plus, minus)
+
+    @staticmethod
+    def is_ternary(poly: Polynomial) -> bool:
+        """Checks whether all coefficients of a polynomial are in {-1, 0, 1}.
+        """
+        return poly.is_ternary()
+
+    @property
+    def hamming_weight(self) -> int:
+        return len(self.plus) + len(self.minus)
+
+    def prefers_shift_add(self, coeff_modulus: int) -> bool:
+        """Estimates whether multiply beats Polynomial.aux_multiply modulo q.
+
+        The cost model was fitted on timings of both paths: shift-and-add costs
+        about 1 ns per coefficient and shift on int64 arrays and 30 ns plus
+        1.5 ns per 64-bit word on Python integers, while the auxiliary-prime
+        NTT costs about 1.5 us plus 30 ns per prime, per coefficient and prime.
+
+        Args:
+            coeff_modulus (int): Modulus q of the product.
+        """
+        bits = coeff_modulus.bit_length()
+        if bits <= 61:
+            shift_add_cost = 1
+        else:
+            shift_add_cost = 30 + 1.5 * (bits // 64 + 1)
+        shift_add_cost *= self.hamming_weight * self.degree
+        num_primes = (2 * bits + self.degree.bit_length()) // 59 + 1
+        ntt_cost = self.degree * num_primes * (1500 + 30 * num_primes)
+        return shift_add_cost < ntt_cost
+
+    def to_polynomial(self) -> Polynomial:
+        coeffs = [0] * self.degree
+        for i in self.plus:
+            coeffs[i] = 1
+        for i in self.minus:
+            coeffs[i] = -1
+        return Polynomial(self.degree, coeffs)
+
+    def multiply(self, poly: Polynomial, coeff_modulus: Optional[int] = None) -> Polynomial:
+        """Multiplies a dense polynomial by this one with negacyclic shift-and-add.
+
+        Each shift is a slice of the dense coefficients followed by their
+        negation, added to the accumulator in one vectorized step. With a
+        modulus below 2^61 the work is done on int64 arrays, reducing the
+        accumulator whenever further additions could overflow; otherwise on
+        arrays of Python objects.
+
+        Args:
+            poly (Polynomial): Dense polynomial to multiply by.
+            coeff_modulus (int): Modulus q of the result, if any.
+
+        Returns:
+            A Polynomial which is the product, with coefficients in [0, q)
+            when a modulus is given.
+        """
+        assert self.degree == poly.degree, 'Poly size is not same'
+        n = self.degree
+        if coeff_modulus:
+            coeffs = [c % coeff_modulus for c in poly.coeffs]
+            magnitude = coeff_modulus
+        else:
+            coeffs = poly.coeffs
+            magnitude = max((abs(c) for c in coeffs), default=0) + 1
+        # Number of shifts that can be accumulated before int64 could overflow.
+        chunk = (1 << 62) // magnitude - 1
+        if coeff_modulus:
+            use_int64 = chunk > 0
+        else:
+            use_int64 = chunk >= self.hamming_weight
+        use_int64 = use_int64 and all(isinstance(c, numbers.Integral) for c in coeffs)
+        dtype = np.int64 if use_int64 else object
+        dense = np.array(coeffs, dtype=dtype)
+        # x^i * a is the window [n - i, 2n - i) of (-a, a).
+        extended = np.concatenate((-dense, dense))
+        acc = np.zeros(n, dtype=dtype)
+        terms = [(i, 1) for i in self.plus] + [(i, -1) for i in self.minus]
+        for count, (i, sign) in enumerate(terms, 1):
+            if sign > 0:
+                acc += extended[n - i:2 * n - i]
+            else:
+                acc -= extended[n - i:2 * n - i]
+            if use_int64 and coeff_modulus and count % chunk == 0:
+                acc %= coeff_modulus
+        if coeff_modulus:
+            acc %= coeff_modulus
+        return Polynomial(n, acc.tolist())